@@ -1,39 +1,76 @@
 import os
 import sys
-import logging
 import time
+import asyncio
+import itertools
+import logging
 import click
-import pandas as pd
-from multiprocessing import Pool
 
 # Local imports
 sys.path.append(os.path.join(os.path.dirname(__file__), ''))
 from utils.read_status import read_status
-from utils.run_benchmark import run_benchmark
+from utils.run_benchmark import run_benchmark_async, FAILED_EQUATION
 from utils.methods_handler import methods_handler
+from utils.datasets_handler import datasets_handler
+from utils.supervisor import USAGE_KEYS
+from utils.method_evaluator import PHASES, merge_params
+from utils.scheduler import read_resources, machine_capacity, iter_jobs, simulate_jobs
+from utils.result_cache import ResultCache, file_digest, dataset_digest, cache_key
+from utils.journal import Journal, completed_jobs
+from utils.result_sink import ResultSink
+from utils.job_queue import JobQueue
+from utils.sharding import finish_shard, parse_shard, shard_plan
+from utils.budget import split_budget, native_params
+from utils.runtime_history import RuntimeHistory, dataset_shape, log_plan
+from utils.repeats import repeat_seeds, cv_folds, seed_params, write_summary
+from utils.sweep import config_id
+from utils.dataset_reader import TARGET, dataset_format, dataset_stem, split_extension
+from utils.dataset_reader import decode_dataset, evict_decoded
+from utils.split_cache import SplitCache
+from utils.sampling import SAMPLERS, train_sample
 
 # Set log level
 logging.basicConfig(level=logging.INFO)
 
 PATH = os.path.dirname(os.path.abspath(__file__))
 
+# Location of the datasets decoded from compressed datasets or datasets with another target column
+DECODED_DIR = f"{PATH}/cache/datasets"
+
+# Size in bytes of the decoded datasets beyond which the least recently used ones are removed
+DECODED_SIZE = 10 * 1024 ** 3
 
-def evaluate_dataset(data_path: str, methods: str = "all") -> None:
+# Columns of the result table, the wall time and CPU times are in seconds and the peak resident memory in MB.
+# The method is the name of the method folder, and the method name is the name its procedure reports
+COLUMNS = ["dataset", "method", "method_name", "seed", "fold", "config", "sample", "status", "mse", "equation",
+           "wall_time"] + USAGE_KEYS + [f"phase_{phase}" for phase in PHASES] + ["cached"]
+
+
+def result_row(result: dict, **columns) -> dict:
     """
-    Evaluate the performance of the installed methods for a given dataset.
+    Build a row of the result table from the result of a method, where
+    the timings of the phases of the evaluation are flattened to phase columns
+    and the name of the method reported by its procedure is the method name.
 
     The function takes the following arguments:
-        data_path (string): The relative path to a csv file containing the dataset
-        methods (string): The methods to use to evaluate the dataset
+        result (dict): The result of the method
+        columns: Further columns of the row, including the method
     """
-    # Set basic variables
-    df = pd.DataFrame(columns=["method", "mse", "equation", "run_time"])
+    row = {key: value for key, value in result.items() if key not in ["method", "phases"]}
+    row["method_name"] = result.get("method")
+    row.update({f"phase_{phase}": seconds for phase, seconds in result.get("phases", {}).items()})
+    row.update(columns)
+    return row
 
-    # Check data_path
-    if ".csv" not in data_path:
-        raise TypeError("Data path must point to a .csv file.")
-    file_name = data_path.split("/")[-1]
 
+def installed_methods(methods: str = "all") -> list:
+    """
+    Select the methods to benchmark among the methods that are
+    installed according to the STATUS.md file.
+
+    The function takes the following arguments:
+        methods (string): The methods to use to evaluate the datasets
+    """
     # Set and verify selected methods
     selected_methods = methods_handler(methods)
 
@@ -62,85 +99,874 @@ def evaluate_dataset(data_path: str, methods: str = "all") -> None:
         else:
             logging.warning(f"Method {status['method']} is not installed and will be skipped.")
 
+    return methods_to_process
+
+
+def job_identifier(method: str, label: str, seed: int = None, fold: str = None, config_name: str = None) -> str:
+    """
+    Identify a job of a benchmark run as <method>/<dataset>, followed by /seed<seed>, /fold<i>of<K>
+    and /config<id> for the seed, fold and configuration of the job if it has one.
+
+    The function takes the following arguments:
+        method (string): The method of the job
+        label (string): The label of the dataset of the job
+        seed (int): The seed of the job, None for no seed
+        fold (string): The cross-validation fold of the job as i/K, None for a single split
+        config_name (string): The identifier of the configuration of the job, None for no configuration
+    """
+    job_id = f"{method}/{label}"
+    if seed is not None:
+        job_id += f"/seed{seed}"
+    if fold is not None:
+        job_id += f"/fold{fold.replace('/', 'of')}"
+    if config_name is not None:
+        job_id += f"/config{config_name}"
+    return job_id
+
+
+def plan_jobs(methods_to_process: list, datasets: dict, name: str, ts: str, done=(), result_cache: ResultCache = None,
+              digests: dict = None, time_limit: float = None, memory_limit: float = None, scratch_dir: str = None,
+              warm: bool = False, profile: str = None, log_size: float = 10, selected=None,
+              history: RuntimeHistory = None, shapes: dict = None, shares: dict = None, seeds: list = None,
+              folds: list = None, configs: list = None, max_train_samples: int = None, sampler: str = None,
+              columns: list = None, downcast: bool = False):
+    """
+    Plan the jobs of a benchmark run, one for every method and dataset that is not done yet.
+    Every job is yielded as a dictionary with its identifier under the key "job". A job with a cached
+    result has its row of the result table under the key "row", and any other job has the keyword arguments
+    of run_benchmark under the key "args", its resource budget under the key "budget", and the cache key
+    and dataset digest under the keys "key" and "digest" if the results are cached. Every job to run also
+    has its method, the numbers of rows and features of its dataset and, if a runtime history is given,
+    its expected wall time in seconds under the keys "method", "rows", "features" and "expected".
+    If a method has a share of the budget of the run below its time limit, its time limit is reduced to the share and
+    its native time limit is set by parameters overriding those of the method, which are part of the cache key.
+    Every method and dataset is run once for every seed, where the seed seeds the split of the dataset and the
+    method, and the identifier of the job ends with /seed<seed> unless the seed is None. In cross-validation,
+    every seed is run once for every fold i/K, and the identifier of the job ends with /fold<i>of<K>.
+    The seed and fold of a job are under the keys "seed" and "fold".
+    If configurations of the parameters of the methods are given, e.g. by a sweep, every run is run once for
+    every configuration, whose parameters override those of the method, and the identifier of the job ends with
+    /config<id>, see config_id. The identifier of the configuration of a job is under the key "config".
+    If the training rows of a method are capped, see train_sample, the cap N:sampler is part of the cache key
+    and is under the key "sample". If downcast is true, the features of the methods declaring "float32" as true in
+    their resources are read as float32, and the type of the features of a job is under the key "dtype".
+
+    The function takes the following arguments:
+        methods_to_process (list): The methods to evaluate the datasets with
+        datasets (dict): A dictionary mapping a label of each dataset to its path
+        name (string): The name of the benchmark
+        ts (string): The timestamp of the run naming its artifacts and logs folders
+        done (container): The identifiers of the jobs completed in a previous run
+        result_cache (ResultCache): The cache to look up results in, None to run every job
+        digests (dict): A dictionary mapping a label of each dataset to the digest of its content
+        time_limit (float): The wall-clock limit of every job in seconds, default is the limit of the method
+        memory_limit (float): The resident memory limit of every job in GB, default is the limit of the method
+        scratch_dir (string): The directory in which each job gets a scratch directory
+        warm (bool): Whether to run the jobs in warm workers
+        profile (string): Profile every job with the cprofile or sample profiler
+        log_size (float): The size in MB at which the log of the output of a job is rotated
+        selected (container): The identifiers of the jobs to plan, default is all jobs
+        history (RuntimeHistory): The runtime history to predict the wall times of the jobs with
+        shapes (dict): A dictionary mapping a label of each dataset to its numbers of rows and features,
+                       by default the shapes are determined from the datasets
+        shares (dict): A dictionary mapping methods to their share of the budget of the run in seconds
+        seeds (list): The seeds of the runs of every method and dataset, default is a single run without a seed
+        folds (list): The cross-validation folds as i/K of every run, default is a single split without folds
+        configs (list): The configurations of the parameters of the methods, default is the parameters of the methods
+        max_train_samples (int): The cap of the training rows of every method, default is the cap of the method
+        sampler (string): The sampler of the capped training rows, default is the sampler of the method
+        columns (list): The feature columns to read, default is all columns but the target
+        downcast (bool): Whether to downcast the features to float32 for methods computing in single precision
+    """
+    shapes = dict(shapes or {})
+    for method in methods_to_process:
+        resources = read_resources(method)
+        method_time_limit = time_limit if time_limit is not None else resources.get("time_limit")
+        params = {}
+        share = (shares or {}).get(method)
+        if share is not None and (not method_time_limit or share < method_time_limit):
+            method_time_limit = share
+            params = native_params(resources, method_time_limit)
+        sample = train_sample(resources, max_train_samples, sampler)
+        dtype = "float32" if downcast and resources.get("float32", False) else None
+        for (label, data_path), seed, fold, config in itertools.product(datasets.items(), seeds or [None],
+                                                                        folds or [None], configs or [None]):
+            run = label
+            if seed is not None:
+                run += f" with seed {seed}"
+            if fold is not None:
+                run += f" in fold {fold}"
+            config_name = None
+            if config is not None:
+                config_name = config_id(config)
+                run += f" with configuration {config_name}"
+            job_id = job_identifier(method, label, seed, fold, config_name)
+            if selected is not None and job_id not in selected:
+                continue
+            if job_id in done:
+                logging.info(f"Skipping {method} on {run} completed in a previous run")
+                continue
+            run_params = merge_params(merge_params(params, config or {}), seed_params(resources, seed))
+            key = None
+            digest = None
+            if result_cache is not None:
+                digest = digests[label]
+                key = cache_key(method, digest, run_params, seed, fold, sample, columns, dtype)
+                entry = result_cache.get(key)
+                if entry is not None:
+                    logging.info(f"Using cached result for {method} on {run}")
+                    row = result_row(entry["result"], **entry.get("usage", {}), dataset=label, method=method,
+                                     seed=seed, fold=fold, config=config_name, sample=sample, status="ok",
+                                     wall_time=entry.get("wall_time"), cached=True)
+                    yield {"job": job_id, "row": row}
+                    continue
+            args = {
+                "method": method,
+                "data_path": data_path,
+                "file_name": label,
+                "scratch_dir": scratch_dir,
+                "warm": warm,
+                "time_limit": method_time_limit,
+                "memory_limit": memory_limit if memory_limit is not None else resources.get("memory_limit"),
+                "profile": profile,
+                "artifacts_dir": f"{PATH}/results/artifacts/{name}-{ts}/{job_id}",
+                "log_path": f"{PATH}/results/logs/{name}-{ts}/{job_id}.log",
+                "log_size": log_size,
+                "params": run_params or None,
+                "seed": seed,
+                "fold": fold,
+                "sample": sample,
+                "columns": columns,
+                "dtype": dtype
+            }
+            if label not in shapes:
+                shapes[label] = dataset_shape(data_path)
+            rows, features = shapes[label]
+            yield {
+                "job": job_id,
+                "args": args,
+                "budget": resources,
+                "key": key,
+                "digest": digest,
+                "method": method,
+                "seed": seed,
+                "fold": fold,
+                "config": config_name,
+                "sample": sample,
+                "dtype": dtype,
+                "rows": rows,
+                "features": features,
+                "expected": history.expected_time(method, rows, features, method_time_limit) if history else None
+            }
+
+
+def select_shard(methods_to_process: list, datasets: dict, name: str, shard: str, time_limit: float = None,
+                 history: RuntimeHistory = None, shapes: dict = None, seeds: list = None, folds: list = None) -> tuple:
+    """
+    Select the jobs of a shard of a benchmark, given as i/N for the i-th of N shards.
+    The jobs of every method and dataset are partitioned into shards of balanced expected
+    wall time, as predicted by the runtime history from past runs on datasets of similar size.
+    The partition is saved in the results folder by the first shard to start, such that every shard
+    of the run runs a disjoint set of jobs, and removed once every shard has completed, see shard_plan.
+    Returns the identifiers of the jobs of the shard and the path of the saved partition.
+
+    The function takes the following arguments:
+        methods_to_process (list): The methods to evaluate the datasets with
+        datasets (dict): A dictionary mapping a label of each dataset to its path
+        name (string): The name of the benchmark
+        shard (string): The shard to select as i/N
+        time_limit (float): The wall-clock limit of every job in seconds, default is the limit of the method
+        history (RuntimeHistory): The runtime history to predict the wall times of the jobs with
+        shapes (dict): A dictionary mapping a label of each dataset to its numbers of rows and features
+        seeds (list): The seeds of the runs of every method and dataset, default is a single run without a seed
+        folds (list): The cross-validation folds as i/K of every run, default is a single split without folds
+    """
+    index, count = parse_shard(shard)
+    history = history if history is not None else RuntimeHistory()
+    job_costs = {job["job"]: job["expected"] for job in plan_jobs(methods_to_process, datasets, name, "",
+                                                                  time_limit=time_limit, history=history,
+                                                                  shapes=shapes, seeds=seeds, folds=folds)}
+    plan = shard_plan(f"{PATH}/results", name, job_costs, count)
+    logging.info(f"Running shard {index} of {count} with {len(plan['shards'][index - 1])} jobs "
+                 f"and an expected cost of {plan['costs'][index - 1]:.0f} seconds, "
+                 f"the longest shard is expected to take {max(plan['costs']):.0f} seconds")
+    return set(plan["shards"][index - 1]), plan["path"]
+
+
+def budget_shares(methods_to_process: list, datasets: dict, name: str, budget: float, capacity: dict,
+                  time_limit: float = None, history: RuntimeHistory = None, shapes: dict = None,
+                  selected=None, done=(), seeds: list = None, folds: list = None) -> dict:
+    """
+    Split a wall-clock budget of a run across its methods. Every job may take at most the longest time
+    such that the jobs, started longest expected first, are predicted to complete within the budget
+    on this machine, where the wall times of the jobs are predicted by the runtime history. Methods
+    expected to complete sooner are not affected. The share is pushed into the native time limit of every
+    method that declares its time limit parameter as "time_limit_param" in its resources, and the
+    time limit of the jobs, which kills a job exceeding it, is reduced to the share as a backstop.
+    Returns a dictionary mapping every method to its share in seconds, or None if the run is expected to
+    complete within the budget anyway, in which case the time limits of the methods are kept.
+
+    The function takes the following arguments:
+        methods_to_process (list): The methods to evaluate the datasets with
+        datasets (dict): A dictionary mapping a label of each dataset to its path
+        name (string): The name of the benchmark
+        budget (float): The wall-clock budget of the run in seconds
+        capacity (dict): The capacity of the machine
+        time_limit (float): The wall-clock limit of every job in seconds, default is the limit of the method
+        history (RuntimeHistory): The runtime history to predict the wall times of the jobs with
+        shapes (dict): A dictionary mapping a label of each dataset to its numbers of rows and features
+        selected (container): The identifiers of the jobs of the run, default is all jobs
+        done (container): The identifiers of the jobs completed in a previous run, which are not run again
+        seeds (list): The seeds of the runs of every method and dataset, default is a single run without a seed
+        folds (list): The cross-validation folds as i/K of every run, default is a single split without folds
+    """
+    history = history if history is not None else RuntimeHistory()
+    jobs = list(plan_jobs(methods_to_process, datasets, name, "", done, time_limit=time_limit, selected=selected,
+                          history=history, shapes=shapes, seeds=seeds, folds=folds))
+    share = split_budget(budget, [job["expected"] for job in jobs], [job["budget"] for job in jobs], capacity)
+    if share is None:
+        logging.info(f"The run is expected to complete within the budget of {budget:.0f} seconds")
+        return None
+    logging.info(f"Every job may take up to {share:.0f} seconds to complete within the budget of {budget:.0f} seconds")
+    for method in methods_to_process:
+        expected = max((job["expected"] for job in jobs if job["method"] == method), default=0.0)
+        if expected > share and not read_resources(method).get("time_limit_param"):
+            logging.warning(f"Method {method} has no native time limit and is killed when its share runs out")
+    return {method: share for method in methods_to_process}
+
+
+def finish_job(method_result: dict, spec: dict, result_cache: ResultCache = None,
+               history: RuntimeHistory = None) -> dict:
+    """
+    Build the row of the result table of a job from the result of run_benchmark,
+    cache the result if the job succeeded and record its wall time in the runtime history.
+
+    The function takes the following arguments:
+        method_result (dict): The result of run_benchmark
+        spec (dict): The job as planned by plan_jobs
+        result_cache (ResultCache): The cache to save the result in, None to not cache it
+        history (RuntimeHistory): The runtime history to record the wall time in, None to not record it
+    """
+    method = method_result["method"]
+    dataset = method_result["dataset"]
+    status = method_result["status"]
+
+    logging.info(f"Saving output for: {method} on {dataset} with status {status}")
+    # The result of a failed evaluation only describes the failure
+    row = result_row(method_result["result"] if status == "ok" else {"equation": FAILED_EQUATION},
+                     **method_result["usage"], dataset=dataset, method=method, seed=spec.get("seed"),
+                     fold=spec.get("fold"), config=spec.get("config"), sample=spec.get("sample"), status=status,
+                     wall_time=method_result["wall_time"], cached=False)
+    if status == "failed":
+        logging.error(f"Method {method} failed on {dataset}")
+    if history is not None:
+        history.record(method, spec["rows"], spec["features"], method_result["wall_time"], status)
+
+    # Cache successful results
+    if result_cache is not None and status == "ok":
+        result_cache.put(spec["key"], {
+            "method": method,
+            "dataset_digest": spec["digest"],
+            "result": method_result["result"],
+            "wall_time": method_result["wall_time"],
+            "usage": method_result["usage"]
+        })
+    return row
+
+
+def share_splits(specs: list, datasets: dict, digests: dict, split_cache: SplitCache, columns: list = None) -> None:
+    """
+    Materialise the split of every job into the cache of splits and point the job at the split instead of
+    its dataset, such that every dataset is read and split once by this process rather than by every
+    method, and the methods attaching to a split share one copy of it in the page cache. Splits are keyed by
+    the content of their dataset, so a dataset split in a previous run is not split again.
+
+    The function takes the following arguments:
+        specs (list): The jobs to run as planned by plan_jobs, whose arguments are updated in place
+        datasets (dict): A dictionary mapping a label of each dataset to its path
+        digests (dict): A dictionary mapping a label of each dataset to the digest of its content,
+                        the digests of datasets missing from it are computed
+        split_cache (SplitCache): The cache to materialise the splits in
+        columns (list): The feature columns to read, None for all columns but the target
+    """
+    start_time = time.perf_counter()
+    splits = {}
+    for spec in specs:
+        splits.setdefault(spec["args"]["file_name"], {})[(spec["seed"], spec["fold"], spec.get("dtype"))] = None
+    paths = {}
+    for label, dataset_splits in splits.items():
+        digest = digests.get(label) or file_digest(datasets[label])
+        paths[label] = split_cache.materialise(datasets[label], digest, list(dataset_splits), columns)
+    for spec in specs:
+        spec["args"]["data_path"] = paths[spec["args"]["file_name"]][(spec["seed"], spec["fold"], spec.get("dtype"))]
+    split_cache.evict(keep={path for dataset_paths in paths.values() for path in dataset_paths.values()})
+    logging.info(f"Shared {sum(len(dataset_splits) for dataset_splits in splits.values())} splits of "
+                 f"{len(splits)} datasets in {time.perf_counter() - start_time:.3f} seconds")
+
+
+def decode_datasets(datasets: dict, target: str = None, digests: dict = None, cache_dir: str = DECODED_DIR,
+                    max_size: int = DECODED_SIZE) -> dict:
+    """
+    Decode the compressed datasets, and all datasets if the target is another column than TARGET, into the
+    cache of decoded datasets, see decode_dataset. A dataset is decompressed and parsed on its first read only,
+    and every later read, by this run or a later one, maps the decoded .npy file instead. Returns the datasets
+    with the paths of the decoded datasets, where the other datasets keep their paths. The least recently used
+    decoded datasets of earlier runs are removed beyond the size limit of the cache.
+    The results of a decoded dataset are cached by the digest of the dataset as given, see dataset_digest,
+    rather than of the decoded file, such that they can be invalidated by the dataset.
+
+    The function takes the following arguments:
+        datasets (dict): A dictionary mapping a label of each dataset to its path
+        target (string): The name of the target column of the datasets, None for TARGET
+        digests (dict): A dictionary mapping a label of each dataset to its digest, see dataset_digest,
+                        the digests of datasets missing from it are computed
+        cache_dir (string): The directory of the decoded datasets
+        max_size (int): The maximum size of the decoded datasets in bytes
+    """
+    start_time = time.perf_counter()
+    decoded = {}
+    for label, data_path in datasets.items():
+        if split_extension(data_path)[1] is None and target in (None, TARGET):
+            decoded[label] = data_path
+            continue
+        digest = (digests or {}).get(label) or dataset_digest(data_path, target)
+        decoded[label] = decode_dataset(data_path, digest, cache_dir, target)
+        logging.debug(f"Decoded {data_path} to {decoded[label]}")
+    count = sum(decoded[label] != data_path for label, data_path in datasets.items())
+    if count:
+        evict_decoded(cache_dir, max_size, keep=set(decoded.values()))
+        logging.info(f"Decoded {count} datasets in {time.perf_counter() - start_time:.3f} seconds")
+    return decoded
+
+
+def enqueue_datasets(datasets: dict, name: str, queue: str, methods: str = "all",
+                     time_limit: float = None, memory_limit: float = None, scratch_dir: str = None,
+                     warm: bool = False, cache: bool = True, cache_size: float = 1, profile: str = None,
+                     log_size: float = 10, repeats: int = 1, folds: int = 1, max_train_samples: int = None,
+                     sampler: str = None, columns: list = None, downcast: bool = False, digests: dict = None) -> int:
+    """
+    Add the jobs of a benchmark to a shared job queue instead of running them, such that
+    workers on any node sharing the filesystem can run them with `python worker.py --queue <queue>`.
+    Jobs with a cached result are recorded as done right away. Jobs already in the queue are
+    not added again, unless they failed. The jobs are added longest expected first, such that
+    the workers start the longest jobs first. Returns the number of jobs added.
+
+    The function takes the following arguments:
+        datasets (dict): A dictionary mapping a label of each dataset to its path
+        name (string): The name of the benchmark used to name the artifacts and logs folders
+        queue (string): Path of the queue database
+        methods (string): The methods to use to evaluate the datasets
+        time_limit (float): The wall-clock limit of every job in seconds, default is the limit of the method
+        memory_limit (float): The resident memory limit of every job in GB, default is the limit of the method
+        scratch_dir (string): The directory in which each job gets a scratch directory on the node running it
+        warm (bool): Whether to run the jobs in warm workers that are reused across datasets
+        cache (bool): Whether to reuse cached results and cache new results
+        cache_size (float): The maximum size of the cache in GB
+        profile (string): Profile every job with the cprofile or sample profiler, which bypasses the cache
+        log_size (float): The size in MB at which the log of the output of a job is rotated
+        repeats (int): The number of runs of every method and dataset with different seeds
+        folds (int): The number of cross-validation folds of every run, 1 for a single split
+        max_train_samples (int): The cap of the training rows of every method, default is the cap of the method
+        sampler (string): The sampler of the capped training rows, default is the sampler of the method
+        columns (list): The feature columns to read, default is all columns but the target
+        downcast (bool): Whether to downcast the features to float32 for methods computing in single precision
+        digests (dict): A dictionary mapping a label of each dataset to its digest, see dataset_digest,
+                        default is the digests of the files of the datasets
+    """
+    methods_to_process = installed_methods(methods)
+    ts = str(time.time()).replace(".", "-")
+    cache = cache and profile is None
+    result_cache = ResultCache(max_size=int(cache_size * 1024 ** 3)) if cache else None
+    if digests is None:
+        digests = {label: file_digest(data_path) for label, data_path in datasets.items()}
+    digests = digests if cache else {}
+
+    history = RuntimeHistory()
+    jobs = list(plan_jobs(methods_to_process, datasets, name, ts, (), result_cache, digests, time_limit,
+                          memory_limit, scratch_dir, warm, profile, log_size, history=history,
+                          seeds=repeat_seeds(repeats), folds=cv_folds(folds), max_train_samples=max_train_samples,
+                          sampler=sampler, columns=columns, downcast=downcast))
+    history.close()
+
+    # Jobs are claimed in the order they are added, so the longest jobs are added first
+    jobs.sort(key=lambda job: -(job.get("expected") or 0))
+    job_queue = JobQueue(queue)
+    added = 0
+    try:
+        for job in jobs:
+            job["cache_size"] = cache_size
+            added += job_queue.put(job, job.get("row"))
+        logging.info(f"Added {added} jobs to {queue}, the queue holds {job_queue.counts()} jobs by state")
+    finally:
+        job_queue.close()
+    return added
+
+
+def evaluate_datasets(datasets: dict, name: str, methods: str = "all",
+                      cores: int = None, memory: float = None, time_limit: float = None, memory_limit: float = None,
+                      scratch_dir: str = None, warm: bool = False,
+                      cache: bool = True, cache_size: float = 1, resume: bool = False,
+                      output_format: str = "csv", stdout: bool = False, profile: str = None,
+                      log_size: float = 10, queue: str = None, shard: str = None, plan: bool = False,
+                      budget: float = None, repeats: int = 1, folds: int = 1, split_cache: bool = True,
+                      max_train_samples: int = None, sampler: str = None, columns: list = None,
+                      downcast: bool = False, target: str = None) -> None:
+    """
+    Evaluate the performance of the installed methods for a set of datasets.
+    Every method is run on every dataset and all jobs are supervised by one event loop.
+    The jobs run concurrently such that the sum of their declared core
+    and memory budgets stays within the capacity of the machine. The results
+    are saved in one table with a row per method and dataset, and each row is
+    appended to the table as soon as its job completes. Every row records the wall time,
+    CPU time, peak resident memory, context switches and I/O bytes of its job as numbers,
+    as well as the time spent in each phase of the evaluation.
+    Results are cached by the content of the dataset and the code and configuration
+    of the method, such that a job that has been run before is not run again.
+    Every completed job is recorded in a journal as soon as it completes, such that
+    an interrupted run can be resumed without running the completed jobs again.
+    The artifacts saved by the jobs, such as profiles, are saved in the folder
+    results/artifacts/<name>-<timestamp>/<method>/<dataset>, and the output of every job
+    is streamed to the rotating log results/logs/<name>-<timestamp>/<method>/<dataset>.log.
+    Jobs exceeding the time or memory limit of their method are killed and recorded
+    with the status "timeout" or "oom", and jobs that failed with the status "failed".
+    Failed jobs are not journaled, such that they are run again when resuming.
+    If a queue is given, the jobs are added to the queue for workers to run instead, see enqueue_datasets,
+    and the options of local runs, see LOCAL_OPTIONS, do not apply.
+    If a shard i/N is given, only the jobs of the i-th of N shards of balanced expected cost are run, see
+    select_shard, and the shard is named <name>-shard<i>of<N>. The result tables of the shards can be
+    combined with merge_results.py. The partition is kept until every shard has completed without failed jobs,
+    such that a resumed shard runs the same jobs.
+    The wall time of every job is recorded in the runtime history, from which the wall times of the jobs
+    of the next run are predicted. The jobs are started longest expected first, and the predicted makespan
+    and the time at which every method is expected to complete are logged before the jobs start.
+    If a budget is given, it is split across the methods such that the run is predicted to complete
+    within the budget, see budget_shares.
+    If repeats is more than one, every method is run repeats times on every dataset, where every run seeds
+    the split of the dataset and the method with its own seed, see repeat_seeds. The runs are spread across the
+    machine like any other jobs, and the median, the quartiles and a confidence interval of the median of the MSE
+    and the wall time of every method and dataset are saved in results/summary-<name>-<timestamp>.
+    If folds is more than one, every run is a K-fold cross-validation, whose folds are run as parallel jobs
+    within the resource budget of the method. The folds of a run are determined by its seed, and the metrics
+    of the folds are summarized like repeated runs.
+    Every dataset is read and split once before the jobs start, and the methods attach read-only to the split
+    in the cache of splits instead of each reading and splitting the dataset, see share_splits.
+    The training rows of methods that scale badly with the number of rows can be capped, see train_sample, and
+    the labels of the sampled rows of every job are saved to train_sample.json in its artifacts folder.
+    Csv datasets are parsed in chunks as floats, and only the given feature columns are read if columns are given.
+    Compressed csv and tsv datasets, and all datasets if another target column is given, are decoded once into
+    the cache of decoded datasets, and the jobs read the decoded dataset instead, see decode_datasets.
+
+    The function takes the following arguments:
+        datasets (dict): A dictionary mapping a label of each dataset to its path
+        name (string): The name of the benchmark used to name the result file
+        methods (string): The methods to use to evaluate the datasets
+        cores (int): The number of cores available, default is all
+        memory (float): The memory in GB available, default is all
+        time_limit (float): The wall-clock limit of every job in seconds, default is the limit of the method
+        memory_limit (float): The resident memory limit of every job in GB, default is the limit of the method
+        scratch_dir (string): The directory in which each job gets a scratch directory
+        warm (bool): Whether to run the jobs in warm workers that are reused across datasets
+        cache (bool): Whether to reuse cached results and cache new results
+        cache_size (float): The maximum size of the cache in GB
+        resume (bool): Whether to resume from the journal of a previous run with the same name
+        output_format (string): The format of the result table, either csv or jsonl
+        stdout (bool): Whether to also echo each row of the result table to stdout as a JSON line
+        profile (string): Profile every job with the cprofile or sample profiler, which bypasses the cache
+        log_size (float): The size in MB at which the log of the output of a job is rotated
+        queue (string): Path of a shared job queue database to add the jobs to instead of running them
+        shard (string): The shard of the jobs to run as i/N, default is all jobs
+        plan (bool): Whether to only log the predicted makespan and completion times without running the jobs
+        budget (float): The wall-clock budget of the run in seconds, default is no budget
+        repeats (int): The number of runs of every method and dataset with different seeds
+        folds (int): The number of cross-validation folds of every run, 1 for a single split
+        split_cache (bool): Whether to share the splits of the datasets with the methods through the cache of splits
+        max_train_samples (int): The cap of the training rows of every method, default is the cap of the method
+        sampler (string): The sampler of the capped training rows, default is the sampler of the method
+        columns (list): The feature columns to read, default is all columns but the target
+        downcast (bool): Whether to downcast the features to float32 for methods computing in single precision
+        target (string): The name of the target column of the datasets, default is "target"
+    """
+    # Profiled jobs are always run, as a cached result has no profile
+    cache = cache and profile is None
+
+    # The digests are taken of the datasets as given, before they are decoded
+    digests = {label: dataset_digest(data_path, target) for label, data_path in datasets.items()} if cache else {}
+    datasets = decode_datasets(datasets, target, digests)
+    if queue is not None:
+        enqueue_datasets(datasets, name, queue, methods, time_limit=time_limit, memory_limit=memory_limit,
+                         scratch_dir=scratch_dir, warm=warm, cache=cache, cache_size=cache_size,
+                         profile=profile, log_size=log_size, repeats=repeats,
+                         folds=folds, max_train_samples=max_train_samples, sampler=sampler, columns=columns,
+                         downcast=downcast, digests=digests)
+        return
+    if output_format not in ["csv", "jsonl"]:
+        raise ValueError(f"Invalid output format {output_format}. Valid formats are csv and jsonl.")
+
+    # Set basic variables
+    methods_to_process = installed_methods(methods)
+
     if not os.path.exists(f"{PATH}/results"):
         logging.debug("Creating results folder")
         os.makedirs(f"{PATH}/results")
 
+    history = RuntimeHistory()
+    shapes = {label: dataset_shape(data_path) for label, data_path in datasets.items()}
+    seeds = repeat_seeds(repeats)
+    fold_list = cv_folds(folds)
+    selected = None
+    if shard is not None:
+        selected, plan_path = select_shard(methods_to_process, datasets, name, shard, time_limit, history, shapes,
+                                           seeds, fold_list)
+        index, count = parse_shard(shard)
+        name = f"{name}-shard{index}of{count}"
+
+    # Determine capacity of the machine
+    capacity = machine_capacity(cores, memory)
+    logging.info(f"Scheduling within {capacity['cores']} cores and {capacity['memory']:.1f} GB of memory")
+    journal_path = f"{PATH}/results/journal-{name}.jsonl"
+    done = completed_jobs(journal_path) if resume else set()
+    shares = None
+    if budget is not None:
+        shares = budget_shares(methods_to_process, datasets, name, budget, capacity, time_limit, history, shapes,
+                               selected, done, seeds, fold_list)
+
+    # Look up results in the cache
+    result_cache = ResultCache(max_size=int(cache_size * 1024 ** 3)) if cache else None
+
+    # Configure arguments and resource budgets for every method and dataset not completed
+    ts = str(time.time()).replace(".", "-")
+    cached = []
+    specs = []
+    for job in plan_jobs(methods_to_process, datasets, name, ts, done, result_cache, digests, time_limit,
+                         memory_limit, scratch_dir, warm, profile, log_size, selected, history, shapes,
+                         shares, seeds, fold_list, max_train_samples=max_train_samples, sampler=sampler,
+                         columns=columns, downcast=downcast):
+        (cached if "row" in job else specs).append(job)
+
+    # Start the longest jobs first, such that no long job starts last and stretches the run
+    specs.sort(key=lambda spec: -spec["expected"])
+    jobs = [(spec["args"], spec["budget"]) for spec in specs]
+    schedule = simulate_jobs([spec["expected"] for spec in specs], [spec["budget"] for spec in specs], capacity)
+    log_plan(specs, schedule)
+    if plan:
+        logging.info(f"Planned {len(specs)} jobs and {len(cached)} cached results without running them")
+        history.close()
+        return
+    if split_cache and specs:
+        share_splits(specs, datasets, digests, SplitCache(), columns)
+
+    # The jobs of the run, of which the journal of a resumed run may hold only some
+    planned = {job_identifier(method, label, seed, fold) for method, label, seed, fold
+               in itertools.product(methods_to_process, datasets, seeds or [None], fold_list or [None])}
+    if selected is not None:
+        planned &= selected
+
+    journal = Journal(journal_path, resume)
+    sink = ResultSink(f"{PATH}/results/result-{name}-{ts}.{output_format}", COLUMNS, stdout)
+
+    # The rows are only kept in memory if they are summarized, otherwise they are streamed to the sink
+    summarize = repeats > 1 or folds > 1
+    rows = []
+
+    def save_row(row):
+        sink.write(row)
+        if summarize:
+            rows.append(row)
+
     try:
-        # Determine cores
-        cores = os.cpu_count() - 1 if os.cpu_count() > 1 else 1
-
-        # Configure arguments
-        args = [(method, data_path, file_name) for method in methods_to_process]
-
-        # Multicore processing
-        with Pool(cores) as p:
-            results = p.starmap(run_benchmark, args)
-            
-            # Report all tasks done
-            logging.info("All methods have been benchmarked")
-
-        # Collect and save results
-        for method_result in results:
-            method = method_result["method"]
-            run_time = method_result["run_time"]
-
-            if run_time is None:
-                logging.error(f"Method {method} failed to run")
-                continue
-            result_file_name = "result.json"
-            result_string = f"{PATH}/methods/{method}/{result_file_name}"
-
-            try:
-                # Save result
-                logging.info(f"Saving output for: {method}")
-                with open(result_string, 'r') as result_file:
-                    output = pd.read_json(result_file, typ="series")
-                    time_series = pd.Series([run_time], index=["run_time"])
-                    result = pd.concat([output, time_series])
-                    df = pd.concat([df, result.to_frame().T])
-                logging.info(f"Successfully ran {method}")
-            except FileNotFoundError as e:
-                logging.error(f"Result missing for {method}")
-                logging.error(e)
-            # Clean up and return
-            if os.path.exists(result_string):
-                os.remove(result_string)
+        # Include the results of the previous run and the cached results
+        for row in journal.rows(planned):
+            save_row(row)
+        for job in cached:
+            journal.write(job["job"], job["row"])
+            save_row(job["row"])
+
+        # Concurrent processing in one event loop, collecting each result as soon as its job completes
+        failed = []
+
+        async def run_jobs():
+            async for index, method_result in iter_jobs(run_benchmark_async, jobs, capacity):
+                spec = specs[index]
+                row = finish_job(method_result, spec, result_cache, history)
+                if method_result["status"] != "failed":
+                    journal.write(spec["job"], row)
+                else:
+                    failed.append(spec["job"])
+                save_row(row)
+
+        asyncio.run(run_jobs())
+
+        # Summarize the repeated runs and folds of every method and dataset
+        if summarize:
+            summary_path = f"{PATH}/results/summary-{name}-{ts}.{output_format}"
+            write_summary(rows, summary_path)
+            logging.info(f"Saved the summary of {repeats * folds} runs of every method and dataset to {summary_path}")
+
+        # A shard with failed jobs keeps the partition, such that it can be resumed
+        if shard is not None and not failed:
+            finish_shard(plan_path, *parse_shard(shard))
+
+        # Report all tasks done
+        logging.info("All methods have been benchmarked")
     finally:
-        # If the procedure interrupts, save output
-        ts = str(time.time()).replace(".", "-")
-        df.to_csv(f"{PATH}/results/result-{file_name[:-4]}-{ts}.csv", encoding="utf-8", index=False)
-        logging.info(f"Completed evaluating data from: {file_name}.")
+        # The rows are already saved, so an interrupted run keeps its output
+        journal.close()
+        sink.close()
+        history.close()
+        logging.info(f"Saved {sink.rows} results to {sink.path}")
+        logging.info(f"Completed evaluating data from: {name}.")
+
+
+def evaluate_dataset(data_path: str, methods: str = "all", **options) -> None:
+    """
+    Evaluate the performance of the installed methods for a given dataset.
+
+    The function takes the following arguments:
+        data_path (string): The relative path to the dataset, a csv, tsv, Parquet, Feather, Arrow, .npy or .npz
+                            file, where csv and tsv files may be compressed with gzip, xz or Zstandard
+        methods (string): The methods to use to evaluate the dataset
+        options: Options of the benchmark passed on to evaluate_datasets
+    """
+    # Check data_path
+    dataset_format(data_path)
+    file_name = data_path.split("/")[-1]
+
+    evaluate_datasets({file_name: os.path.abspath(data_path)}, dataset_stem(file_name), methods, **options)
+
+
+def evaluate_batch(batch_path: str, methods: str = "all", **options) -> None:
+    """
+    Evaluate the performance of the installed methods for a batch of datasets
+    given as a directory of dataset files or a manifest file listing the datasets.
+
+    The function takes the following arguments:
+        batch_path (string): The path to a directory or manifest of datasets
+        methods (string): The methods to use to evaluate the datasets
+        options: Options of the benchmark passed on to evaluate_datasets
+    """
+    datasets = datasets_handler(batch_path)
+    logging.info(f"Found {len(datasets)} datasets in {batch_path}")
+
+    name = os.path.splitext(os.path.basename(os.path.normpath(batch_path)))[0]
+    evaluate_datasets(datasets, f"batch-{name}", methods, **options)
+
+
+# Options that only apply to local runs, which are rejected if the jobs are added to a queue instead
+LOCAL_OPTIONS = ["cores", "memory", "resume", "output_format", "stdout", "shard", "plan", "budget", "split_cache"]
 
 
 @click.command()
 @click.option(
     "--data_path",
-    help="Absolute path to the data set of .csv format."
+    help="Absolute path to the data set in .csv, .tsv, .parquet, .feather, .arrow, .npy or .npz format, "
+         "where .csv and .tsv files may be compressed as .gz, .xz or .zst."
+)
+@click.option(
+    "--batch",
+    default=None,
+    help="Path to a directory of data sets or a manifest file listing one data set per line."
 )
 @click.option(
     "--methods",
     default="all",
     help="Selected methods to benchmark."
 )
-def main(data_path: str, methods: str = "all") -> None:
+@click.option(
+    "--cores",
+    type=int,
+    default=None,
+    help="Number of cores available for the benchmark. Default is all cores."
+)
+@click.option(
+    "--memory",
+    type=float,
+    default=None,
+    help="Memory in GB available for the benchmark. Default is all physical memory."
+)
+@click.option(
+    "--time_limit",
+    type=float,
+    default=None,
+    help="Wall-clock limit of every job in seconds. Default is the time_limit declared by each method."
+)
+@click.option(
+    "--memory_limit",
+    type=float,
+    default=None,
+    help="Resident memory limit of every job in GB. Default is the memory_limit declared by each method."
+)
+@click.option(
+    "--scratch_dir",
+    default=None,
+    help="Directory for the scratch directories of the jobs, e.g. /dev/shm to use tmpfs. "
+         "Default is the system temporary directory."
+)
+@click.option(
+    "--warm",
+    type=bool,
+    default=False,
+    help="If true, each method runs in a warm worker that imports the method once and is reused across datasets."
+)
+@click.option(
+    "--cache",
+    type=bool,
+    default=True,
+    help="If true, reuse cached results of jobs that have been run before and cache new results."
+)
+@click.option(
+    "--cache_size",
+    type=float,
+    default=1,
+    help="Maximum size of the result cache in GB. The least recently used results are evicted first."
+)
+@click.option(
+    "--split_cache",
+    type=bool,
+    default=True,
+    help="If true, every dataset is split once and the methods attach read-only to the memory-mapped split "
+         "instead of each reading and splitting the dataset."
+)
+@click.option(
+    "--max_train_samples",
+    type=int,
+    default=None,
+    help="Cap the training rows of every method at this number, the testing set is kept whole. "
+         "Default is the max_train_samples of the method, and 0 uses all training rows."
+)
+@click.option(
+    "--sampler",
+    type=click.Choice(SAMPLERS),
+    default=None,
+    help="Sampler of the capped training rows: random, stratified on the target, or a diversity-preserving "
+         "coreset. Default is the sampler of the method or random."
+)
+@click.option(
+    "--columns",
+    default=None,
+    callback=lambda context, param, value: value.split(",") if value else None,
+    help="Comma-separated names of the feature columns to read, e.g. to benchmark on a subset of the features of "
+         "a large dataset. Default is all columns but the target."
+)
+@click.option(
+    "--target",
+    default=None,
+    help="Name of the target column of the datasets, e.g. for datasets of other benchmarks. Default is target. "
+         "Datasets with another target are decoded once into the cache of decoded datasets."
+)
+@click.option(
+    "--downcast",
+    type=bool,
+    default=False,
+    help="If true, the features are read as float32 for the methods that declare float32 in their resources, "
+         "which halves the memory of the dataset for methods computing in single precision."
+)
+@click.option(
+    "--resume",
+    type=bool,
+    default=False,
+    help="If true, resume an interrupted run from its journal and only run the jobs that did not complete."
+)
+@click.option(
+    "--output_format",
+    type=click.Choice(["csv", "jsonl"]),
+    default="csv",
+    help="Format of the result table. Rows are appended as soon as their job completes."
+)
+@click.option(
+    "--stdout",
+    type=bool,
+    default=False,
+    help="If true, also echo each row of the result table to stdout as a JSON line."
+)
+@click.option(
+    "--profile",
+    type=click.Choice(["cprofile", "sample"]),
+    default=None,
+    help="Profile every job with the deterministic cprofile or the low-overhead sample profiler. "
+         "The profiles are saved in the artifacts folder of the results."
+)
+@click.option(
+    "--log_size",
+    type=float,
+    default=10,
+    help="Size in MB at which the log of the output of a job is rotated. Two rotated logs are kept per job."
+)
+@click.option(
+    "--queue",
+    default=None,
+    help="Path of a shared job queue database. If given, the jobs are added to the queue instead of being run, "
+         "and are run by starting `python worker.py --queue <queue>` on any node sharing the filesystem."
+)
+@click.option(
+    "--shard",
+    default=None,
+    help="Only run the i-th of N shards of the jobs given as i/N, e.g. 1/4 to 4/4 for four array tasks. "
+         "The shards are balanced by the expected runtime of their jobs. "
+         "Combine the result tables of the shards with merge_results.py."
+)
+@click.option(
+    "--plan",
+    type=bool,
+    default=False,
+    help="If true, only log the predicted makespan and the time at which every method is expected to complete, "
+         "as predicted from the runtime history of past runs, without running any job."
+)
+@click.option(
+    "--budget",
+    type=float,
+    default=None,
+    help="Wall-clock budget of the whole run in seconds. The budget is split across the methods and pushed into "
+         "their native time limits, such that the run is predicted to complete within the budget."
+)
+@click.option(
+    "--folds",
+    type=int,
+    default=1,
+    help="Number of cross-validation folds. If more than 1, every run is a K-fold cross-validation whose folds run "
+         "as parallel jobs, and the metrics of the folds are summarized. Default is a single 80/20 split."
+)
+@click.option(
+    "--repeats",
+    type=int,
+    default=1,
+    help="Number of runs of every method on every dataset. Every run seeds the split of the dataset and the method "
+         "with its own seed, and the median, quartiles and confidence interval of the MSE and runtime are summarized."
+)
+def main(data_path: str, batch: str = None, methods: str = "all", **options) -> None:
     """
     CLI entry point for installing the benchmark package.
     methods
 
     The function takes the following arguments:
         data_path (string): Path to the dataset
+        batch (string): Path to a directory or manifest of datasets
         methods (string): The methods to use to evaluate the dataset
+        options: Options of the benchmark such as cores, memory, limits, scratch_dir, warm, cache, resume, output,
+                 profile, logs, queue, shard, plan, budget, repeats, folds,
+                 split_cache, max_train_samples, sampler, columns, target and downcast
     """
-    evaluate_dataset(data_path, methods)
+    if (data_path is None) == (batch is None):
+        raise click.UsageError("Exactly one of --data_path and --batch must be given.")
+    if options["queue"] is not None:
+        context = click.get_current_context()
+        given = [f"--{option}" for option in LOCAL_OPTIONS
+                 if context.get_parameter_source(option) != click.core.ParameterSource.DEFAULT]
+        if given:
+            raise click.UsageError(f"{', '.join(given)} only apply to local runs and cannot be combined with --queue. "
+                                   "The cores and memory of the workers are given to worker.py.")
+    if batch is not None:
+        evaluate_batch(batch, methods, **options)
+    else:
+        evaluate_dataset(data_path, methods, **options)
 
 
 if __name__ == "__main__":
     """
-    This function executes the benchmark for a given data path
+    This function executes the benchmark for a given data path or batch of datasets
 
     The function takes the following arguments:
         data_path (string): Path to the dataset
+        batch (string): Path to a directory or manifest of datasets
         methods (string): The methods to use to evaluate the dataset
     """
     main()
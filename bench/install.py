@@ -71,7 +71,8 @@ def install(methods: str, reinstall: bool) -> None:
                 "python_version",
                 "install_commands"
             ]
-            assert list(config.keys()) == config_keys
+            # Optional keys such as "resources" may follow the required keys
+            assert list(config.keys())[:len(config_keys)] == config_keys
 
             # Validate Python version
             if config['python_version'].count(".") == 0:
@@ -0,0 +1,69 @@
+import os
+import sys
+import logging
+import click
+
+# Local imports
+sys.path.append(os.path.join(os.path.dirname(__file__), ''))
+from utils.methods_handler import methods_handler
+from utils.result_cache import ResultCache, dataset_digest
+
+# Set log level
+logging.basicConfig(level=logging.INFO)
+
+
+def invalidate_cache(methods: str = "all", data_path: str = None, target: str = None) -> int:
+    """
+    Remove cached results such that the corresponding jobs are run again.
+
+    The function takes the following arguments:
+        methods (string): The methods to remove the cached results of, default is all
+        data_path (string): Path to a dataset to remove the cached results of, default is all
+        target (string): The name of the target column the dataset was evaluated with, default is "target"
+    """
+    selected_methods = None if methods == "all" else methods_handler(methods)
+    digest = dataset_digest(data_path, target) if data_path is not None else None
+
+    removed = ResultCache().invalidate(selected_methods, digest)
+    logging.info(f"Removed {removed} cached results.")
+    return removed
+
+
+@click.command()
+@click.option(
+    "--methods",
+    default="all",
+    help="Selected methods to remove the cached results of. Default is all."
+)
+@click.option(
+    "--data_path",
+    type=click.Path(exists=True),
+    default=None,
+    help="Path to a data set to remove the cached results of. Default is all data sets."
+)
+@click.option(
+    "--target",
+    default=None,
+    help="Name of the target column the data set was evaluated with. Default is target."
+)
+def main(methods: str = "all", data_path: str = None, target: str = None) -> None:
+    """
+    CLI entry point for invalidating the result cache.
+
+    The function takes the following arguments:
+        methods (string): The methods to remove the cached results of
+        data_path (string): Path to the dataset to remove the cached results of
+        target (string): The name of the target column the dataset was evaluated with
+    """
+    invalidate_cache(methods, data_path, target)
+
+
+if __name__ == "__main__":
+    """
+    This function removes cached results of the benchmark.
+
+    The function takes the following arguments:
+        methods (string): The methods to remove the cached results of
+        data_path (string): Path to the dataset to remove the cached results of
+    """
+    main()
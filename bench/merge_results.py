@@ -0,0 +1,93 @@
+import os
+import sys
+import logging
+import click
+
+# Local imports
+sys.path.append(os.path.join(os.path.dirname(__file__), ''))
+from utils.result_sink import ResultSink, read_rows
+from utils.repeats import write_summary
+from evaluate_dataset import COLUMNS
+
+# Set log level
+logging.basicConfig(level=logging.INFO)
+
+
+def merge_results(paths: list, output: str, stdout: bool = False) -> int:
+    """
+    Combine result tables, e.g. of the shards of a benchmark, into one result table.
+    Every method, dataset, seed, fold and configuration appears once in the combined table. If a job appears in several
+    tables, e.g. because a shard was run again, the row of the last table given is kept.
+    The format of every table is JSON lines if its path ends with .jsonl and csv otherwise.
+    If the tables contain repeated runs or cross-validation folds, the runs are also summarized in a summary
+    table next to the combined table, named like it with the suffix -summary.
+    Returns the number of rows of the combined table.
+
+    The function takes the following arguments:
+        paths (list): Paths of the result tables to combine
+        output (string): Path of the combined result table
+        stdout (bool): Whether to also echo each row to stdout as a JSON line
+    """
+    rows = {}
+    for path in paths:
+        count = 0
+        for row in read_rows(path):
+            key = tuple(row.get(column) for column in ["method", "dataset", "seed", "fold", "config"])
+            rows[key] = row
+            count += 1
+        logging.info(f"Read {count} results from {path}")
+
+    sink = ResultSink(output, COLUMNS, stdout)
+    try:
+        for row in rows.values():
+            sink.write(row)
+    finally:
+        sink.close()
+    logging.info(f"Saved {sink.rows} results to {output}")
+    if any(row.get(column) not in (None, "") for row in rows.values() for column in ["seed", "fold"]):
+        root, extension = os.path.splitext(output)
+        write_summary(list(rows.values()), f"{root}-summary{extension}")
+        logging.info(f"Saved the summary of the repeated runs and folds to {root}-summary{extension}")
+    return sink.rows
+
+
+@click.command()
+@click.argument(
+    "paths",
+    nargs=-1,
+    required=True,
+    type=click.Path(exists=True)
+)
+@click.option(
+    "--output",
+    required=True,
+    help="Path of the combined result table, a .jsonl path writes JSON lines and any other path csv."
+)
+@click.option(
+    "--stdout",
+    type=bool,
+    default=False,
+    help="If true, also echo each row of the combined table to stdout as a JSON line."
+)
+def main(paths: tuple, output: str, stdout: bool = False) -> None:
+    """
+    CLI entry point for combining result tables.
+
+    The function takes the following arguments:
+        paths (tuple): Paths of the result tables to combine
+        output (string): Path of the combined result table
+        stdout (bool): Whether to echo each row to stdout
+    """
+    merge_results(list(paths), output, stdout)
+
+
+if __name__ == "__main__":
+    """
+    This function combines the result tables of the shards of a benchmark into one result table.
+
+    The function takes the following arguments:
+        paths (tuple): Paths of the result tables to combine
+        output (string): Path of the combined result table
+        stdout (bool): Whether to echo each row to stdout
+    """
+    main()
@@ -8,9 +8,7 @@ from dsr import DeepSymbolicRegressor
 
 # Method to Procedure superclass
 sys.path.append(os.path.join(os.path.dirname(__file__), '../../../'))
-from bench.utils.method_evaluator import MethodEvaluator
-
-PATH = os.path.dirname(os.path.abspath(__file__))
+from bench.utils.method_evaluator import MethodEvaluator, method_options
 
 
 class DsrProcedure(MethodEvaluator):
@@ -20,9 +18,10 @@ class DsrProcedure(MethodEvaluator):
     The function takes the following arguments:
         verbose (int):   The level of verbosity of logging.
         test (boolean):  Whether to run the Class in test mode or not.
+        params (dict):   Parameters overriding those of the method.
     """
-    def __init__(self, verbose=2, test=False):
-        super().__init__(verbose)
+    def __init__(self, verbose=2, test=False, params=None):
+        super().__init__(verbose, params)
 
         if test:
             params = {
@@ -204,7 +203,7 @@ class DsrProcedure(MethodEvaluator):
                 }
             }
 
-        self._method = DeepSymbolicRegressor(params)
+        self._method = DeepSymbolicRegressor(self.override_params(params))
 
     def procedure(self, train_x, test_x, train_y, test_y) -> dict:
         # Train model
@@ -226,7 +225,9 @@ class DsrProcedure(MethodEvaluator):
 @click.option(
     '--data_path',
     type=click.Path(exists=True),
-    help='Path to a csv dataset containing a column called "target" as result and other columns as input parameters'
+    help='Path to a csv, tsv, Parquet, Feather, .npy or .npz dataset, where csv and tsv may be compressed as '
+         '.gz, .xz or .zst, containing a column called "target" as result '
+         'and other columns as input parameters'
 )
 @click.option(
     '--verbose',
@@ -240,9 +241,10 @@ class DsrProcedure(MethodEvaluator):
     default=False,
     help='If true, use test parameters'
 )
-def main(data_path: str, verbose: int, test: bool) -> None:
-    method = DsrProcedure(verbose, test)
-    result = method.evaluate(data_path)
+@method_options
+def main(data_path: str, verbose: int, test: bool, params: dict, evaluation: dict) -> None:
+    method = DsrProcedure(verbose, test, params)
+    result = method.evaluate(data_path, **evaluation)
     if result == 1:
         logging.error(
             f"Failed to evaluate Deep Symbolic Regression procedure with data from the path {data_path}."
@@ -253,7 +255,7 @@ def main(data_path: str, verbose: int, test: bool) -> None:
             "equation": "No equation obtained"
         }
 
-    with open(f"{PATH}/result.json", "w") as result_file:
+    with open("result.json", "w") as result_file:
         json.dump(result, result_file)
 
 
@@ -266,5 +268,7 @@ if __name__ == "__main__":
         data_path (str):      The path of the dataset to be evaluated.
         verbose (int):        Set the log level.
         test (bool):          Enable test hyperparameters.
+        params (dict):        Parameters overriding those of the method.
+        evaluation (dict):    Options of the evaluation such as the seed and fold, see method_options.
     """
     main()
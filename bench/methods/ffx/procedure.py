@@ -8,9 +8,7 @@ from ffx import FFXRegressor
 
 # Method to Procedure superclass
 sys.path.append(os.path.join(os.path.dirname(__file__), '../../../'))
-from bench.utils.method_evaluator import MethodEvaluator
-
-PATH = os.path.dirname(os.path.abspath(__file__))
+from bench.utils.method_evaluator import MethodEvaluator, method_options
 
 
 class FfxProcedure(MethodEvaluator):
@@ -19,10 +17,11 @@ class FfxProcedure(MethodEvaluator):
 
     The function takes the following arguments:
         verbose (int):   The level of verbosity of logging.
+        params (dict):   Parameters overriding those of the method.
     """
-    def __init__(self, verbose=2):
-        super().__init__(verbose)
-        self._method = FFXRegressor()
+    def __init__(self, verbose=2, params=None):
+        super().__init__(verbose, params)
+        self._method = FFXRegressor(**self.override_params({}))
 
     def procedure(self, train_x, test_x, train_y, test_y) -> dict:
         # Train model
@@ -45,7 +44,9 @@ class FfxProcedure(MethodEvaluator):
 @click.option(
     '--data_path',
     type=click.Path(exists=True),
-    help='Path to a csv dataset containing a column called "target" as result and other columns as input parameters'
+    help='Path to a csv, tsv, Parquet, Feather, .npy or .npz dataset, where csv and tsv may be compressed as '
+         '.gz, .xz or .zst, containing a column called "target" as result '
+         'and other columns as input parameters'
 )
 @click.option(
     '--verbose',
@@ -59,9 +60,10 @@ class FfxProcedure(MethodEvaluator):
     default=False,
     help='If true, use test parameters'
 )
-def main(data_path: str, verbose: int, test: bool) -> None:
-    method = FfxProcedure(verbose)
-    result = method.evaluate(data_path)
+@method_options
+def main(data_path: str, verbose: int, test: bool, params: dict, evaluation: dict) -> None:
+    method = FfxProcedure(verbose, params)
+    result = method.evaluate(data_path, **evaluation)
     if test:
         logging.error("Fast Function Extraction has no test hyperparameters")
     if result == 1:
@@ -72,7 +74,7 @@ def main(data_path: str, verbose: int, test: bool) -> None:
             "equation": "No equation obtained"
         }
 
-    with open(f"{PATH}/result.json", "w") as result_file:
+    with open("result.json", "w") as result_file:
         json.dump(result, result_file)
 
 
@@ -85,5 +87,7 @@ if __name__ == "__main__":
         data_path (str):      The path of the dataset to be evaluated.
         verbose (int):        Set the log level.
         test (bool):          Enable test hyperparameters.
+        params (dict):        Parameters overriding those of the method.
+        evaluation (dict):    Options of the evaluation such as the seed and fold, see method_options.
     """
     main()
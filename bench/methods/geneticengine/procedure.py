@@ -9,9 +9,7 @@ from geneticengine.off_the_shelf.regressors import GeneticProgrammingRegressor
 
 # Method to Procedure superclass
 sys.path.append(os.path.join(os.path.dirname(__file__), '../../../'))
-from bench.utils.method_evaluator import MethodEvaluator
-
-PATH = os.path.dirname(os.path.abspath(__file__))
+from bench.utils.method_evaluator import MethodEvaluator, method_options
 
 
 class GeneticengineProcedure(MethodEvaluator):
@@ -21,9 +19,10 @@ class GeneticengineProcedure(MethodEvaluator):
     The function takes the following arguments:
         verbose (int):   The level of verbosity of logging.
         test (boolean):  Whether to run the Class in test mode or not.
+        params (dict):   Parameters overriding those of the method.
     """
-    def __init__(self, verbose=2, test=False):
-        super().__init__(verbose)
+    def __init__(self, verbose=2, test=False, params=None):
+        super().__init__(verbose, params)
         if test:
             params = {
                 "population_size": 10,
@@ -56,7 +55,7 @@ class GeneticengineProcedure(MethodEvaluator):
                 "metric": 'mse'
             }
 
-        self._method = GeneticProgrammingRegressor(**params)
+        self._method = GeneticProgrammingRegressor(**self.override_params(params))
 
     def format_output(self):
         """
@@ -88,7 +87,9 @@ class GeneticengineProcedure(MethodEvaluator):
 @click.option(
     '--data_path',
     type=click.Path(exists=True),
-    help='Path to a csv dataset containing a column called "target" as result and other columns as input parameters'
+    help='Path to a csv, tsv, Parquet, Feather, .npy or .npz dataset, where csv and tsv may be compressed as '
+         '.gz, .xz or .zst, containing a column called "target" as result '
+         'and other columns as input parameters'
 )
 @click.option(
     '--verbose',
@@ -102,9 +103,10 @@ class GeneticengineProcedure(MethodEvaluator):
     default=False,
     help='If true, use test parameters'
 )
-def main(data_path: str, verbose: int, test: bool) -> None:
-    method = GeneticengineProcedure(verbose, test)
-    result = method.evaluate(data_path)
+@method_options
+def main(data_path: str, verbose: int, test: bool, params: dict, evaluation: dict) -> None:
+    method = GeneticengineProcedure(verbose, test, params)
+    result = method.evaluate(data_path, **evaluation)
     if result == 1:
         logging.error(f"Failed to evaluate Genetic Engine procedure with data from the path {data_path}.")
         result = {
@@ -113,7 +115,7 @@ def main(data_path: str, verbose: int, test: bool) -> None:
             "equation": "No equation obtained"
         }
 
-    with open(f"{PATH}/result.json", "w") as result_file:
+    with open("result.json", "w") as result_file:
         json.dump(result, result_file)
 
 
@@ -126,6 +128,8 @@ if __name__ == "__main__":
         data_path (str):      The path of the dataset to be evaluated.
         verbose (int):        Set the log level.
         test (bool):          Enable test hyperparameters.
+        params (dict):        Parameters overriding those of the method.
+        evaluation (dict):    Options of the evaluation such as the seed and fold, see method_options.
     """
     main()
 
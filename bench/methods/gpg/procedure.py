@@ -8,9 +8,7 @@ from pygpg.sk import GPGRegressor
 
 # Method to Procedure superclass
 sys.path.append(os.path.join(os.path.dirname(__file__), '../../../'))
-from bench.utils.method_evaluator import MethodEvaluator
-
-PATH = os.path.dirname(os.path.abspath(__file__))
+from bench.utils.method_evaluator import MethodEvaluator, method_options
 
 
 class GpgProcedure(MethodEvaluator):
@@ -20,9 +18,10 @@ class GpgProcedure(MethodEvaluator):
     The function takes the following arguments:
         verbose (int):   The level of verbosity of logging.
         test (boolean):  Whether to run the Class in test mode or not.
+        params (dict):   Parameters overriding those of the method.
     """
-    def __init__(self, verbose=2, test=False):
-        super().__init__(verbose)
+    def __init__(self, verbose=2, test=False, params=None):
+        super().__init__(verbose, params)
 
         if test:
             params = {
@@ -32,6 +31,7 @@ class GpgProcedure(MethodEvaluator):
                 "d": 2,  # maximum tree depth
                 "finetune": True,  # whether to fine-tune the coefficients after the search
                 "finetune_max_evals": 10,  # 10,000 evaluations limit for fine-tuning
+                "random_state": 42,  # seed of the search
                 "verbose": True  # print progress
             }
         else:
@@ -44,11 +44,12 @@ class GpgProcedure(MethodEvaluator):
                 "pop": 3000,                   # population size
                 "finetune": True,              # whether to fine-tune the coefficients after the search
                 "finetune_max_evals": 500_000,  # 10,000 evaluations limit for fine-tuning
+                "random_state": 42,            # seed of the search
                 "verbose": True,               # print progress
                 "fset": '+,-,*,/,log,sqrt,sin,cos' # operators to use
             }
 
-        self._method = GPGRegressor(**params)
+        self._method = GPGRegressor(**self.override_params(params))
 
     def procedure(self, train_x, test_x, train_y, test_y) -> dict:
         # Train model
@@ -71,7 +72,9 @@ class GpgProcedure(MethodEvaluator):
 @click.option(
     '--data_path',
     type=click.Path(exists=True),
-    help='Path to a csv dataset containing a column called "target" as result and other columns as input parameters'
+    help='Path to a csv, tsv, Parquet, Feather, .npy or .npz dataset, where csv and tsv may be compressed as '
+         '.gz, .xz or .zst, containing a column called "target" as result '
+         'and other columns as input parameters'
 )
 @click.option(
     '--verbose',
@@ -85,9 +88,10 @@ class GpgProcedure(MethodEvaluator):
     default=False,
     help='If true, use test parameters'
 )
-def main(data_path: str, verbose: int, test: bool) -> None:
-    method = GpgProcedure(verbose, test)
-    result = method.evaluate(data_path)
+@method_options
+def main(data_path: str, verbose: int, test: bool, params: dict, evaluation: dict) -> None:
+    method = GpgProcedure(verbose, test, params)
+    result = method.evaluate(data_path, **evaluation)
     if result == 1:
         logging.error(f"Failed to evaluate Template procedure with data from the path {data_path}.")
         result = {
@@ -95,7 +99,7 @@ def main(data_path: str, verbose: int, test: bool) -> None:
             "mse": 0,
             "equation": "No equation obtained"
         }
-    with open(f"{PATH}/result.json", "w") as result_file:
+    with open("result.json", "w") as result_file:
         json.dump(result, result_file)
 
 
@@ -108,5 +112,7 @@ if __name__ == "__main__":
         data_path (str):      The path of the dataset to be evaluated.
         verbose (int):        Set the log level.
         test (bool):          Enable test hyperparameters.
+        params (dict):        Parameters overriding those of the method.
+        evaluation (dict):    Options of the evaluation such as the seed and fold, see method_options.
     """
     main()
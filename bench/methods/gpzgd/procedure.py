@@ -8,11 +8,9 @@ import numpy as np
 
 # Method to Procedure superclass
 sys.path.append(os.path.join(os.path.dirname(__file__), '../../../'))
-from bench.utils.method_evaluator import MethodEvaluator
+from bench.utils.method_evaluator import MethodEvaluator, method_options
 from bench.methods.gpzgd.gpzgd.regressor import GPZGD
 
-PATH = os.path.dirname(os.path.abspath(__file__))
-
 
 class GpzgdProcedure(MethodEvaluator):
     """
@@ -21,9 +19,10 @@ class GpzgdProcedure(MethodEvaluator):
     The function takes the following arguments:
         verbose (int):   The level of verbosity of logging.
         test (boolean):  Whether to run the Class in test mode or not.
+        params (dict):   Parameters overriding those of the method.
     """
-    def __init__(self, verbose=2, test=False):
-        super().__init__(verbose)
+    def __init__(self, verbose=2, test=False, params=None):
+        super().__init__(verbose, params)
         if test:
             params = {
                 "pop_size": 5,
@@ -63,7 +62,7 @@ class GpzgdProcedure(MethodEvaluator):
                 "random_state": 1
             }
 
-        self._method = GPZGD(**params)
+        self._method = GPZGD(**self.override_params(params))
 
     @staticmethod
     def format_output(model, threshold=1e-10, significant=5, keep_all=False):
@@ -120,7 +119,9 @@ class GpzgdProcedure(MethodEvaluator):
 @click.option(
     '--data_path',
     type=click.Path(exists=True),
-    help='Path to a csv dataset containing a column called "target" as result and other columns as input parameters'
+    help='Path to a csv, tsv, Parquet, Feather, .npy or .npz dataset, where csv and tsv may be compressed as '
+         '.gz, .xz or .zst, containing a column called "target" as result '
+         'and other columns as input parameters'
 )
 @click.option(
     '--verbose',
@@ -134,9 +135,10 @@ class GpzgdProcedure(MethodEvaluator):
     default=False,
     help='If true, use test parameters'
 )
-def main(data_path: str, verbose: int, test: bool) -> None:
-    method = GpzgdProcedure(verbose, test)
-    result = method.evaluate(data_path)
+@method_options
+def main(data_path: str, verbose: int, test: bool, params: dict, evaluation: dict) -> None:
+    method = GpzgdProcedure(verbose, test, params)
+    result = method.evaluate(data_path, **evaluation)
     if result == 1:
         logging.error(f"Failed to evaluate GPZGD procedure with data from the path {data_path}.")
         result = {
@@ -145,7 +147,7 @@ def main(data_path: str, verbose: int, test: bool) -> None:
             "equation": "No equation obtained"
         }
 
-    with open(f"{PATH}/result.json", "w") as result_file:
+    with open("result.json", "w") as result_file:
         json.dump(result, result_file)
 
 
@@ -158,6 +160,8 @@ if __name__ == "__main__":
         data_path (str):      The path of the dataset to be evaluated.
         verbose (int):        Set the log level.
         test (bool):          Enable test hyperparameters.
+        params (dict):        Parameters overriding those of the method.
+        evaluation (dict):    Options of the evaluation such as the seed and fold, see method_options.
     """
     main()
 
@@ -9,9 +9,7 @@ from pysr import PySRRegressor
 
 # Method to Procedure superclass
 sys.path.append(os.path.join(os.path.dirname(__file__), '../../../'))
-from bench.utils.method_evaluator import MethodEvaluator
-
-PATH = os.path.dirname(os.path.abspath(__file__))
+from bench.utils.method_evaluator import MethodEvaluator, method_options
 
 
 class PysrProcedure(MethodEvaluator):
@@ -21,9 +19,10 @@ class PysrProcedure(MethodEvaluator):
     The function takes the following arguments:
         verbose (int):   The level of verbosity of logging.
         test (boolean):  Whether to run the Class in test mode or not.
+        params (dict):   Parameters overriding those of the method.
     """
-    def __init__(self, verbose=2, test=False):
-        super().__init__(verbose)
+    def __init__(self, verbose=2, test=False, params=None):
+        super().__init__(verbose, params)
         if test:
             params = {
                 "niterations": 2,
@@ -33,6 +32,8 @@ class PysrProcedure(MethodEvaluator):
                 ],
                 "loss": "loss(prediction, target) = (prediction - target)^2",
                 # ^ Custom loss function (julia syntax)
+                "random_state": None,
+                # ^ Seed of the search, set by the seed of a repeated run
             }
         else:
             params = {
@@ -86,6 +87,10 @@ class PysrProcedure(MethodEvaluator):
                 # ^ Can set to false if printing to a file.
                 "weight_randomize": 0.1,
                 # ^ Randomize the tree much more frequently
+                "procs": os.cpu_count(),
+                # ^ Number of processes, set to the cores of the job by the benchmark
+                "random_state": None,
+                # ^ Seed of the search, set by the seed of a repeated run
                 "cluster_manager": None,
                 # ^ Can be set to, e.g., "slurm", to run a slurm
                 # cluster. Just launch one script from the head node.
@@ -107,7 +112,7 @@ class PysrProcedure(MethodEvaluator):
                 # extra_jax_mappings={sympy.cos: "jnp.cos"},
                 # ^ For JAX, one passes a string.
             }
-        self._method = PySRRegressor(**params)
+        self._method = PySRRegressor(**self.override_params(params))
 
     def procedure(self, train_x, test_x, train_y, test_y) -> dict:
         # Train method
@@ -129,7 +134,9 @@ class PysrProcedure(MethodEvaluator):
 @click.option(
     '--data_path',
     type=click.Path(exists=True),
-    help='Path to a csv dataset containing a column called "target" as result and other columns as input parameters'
+    help='Path to a csv, tsv, Parquet, Feather, .npy or .npz dataset, where csv and tsv may be compressed as '
+         '.gz, .xz or .zst, containing a column called "target" as result '
+         'and other columns as input parameters'
 )
 @click.option(
     '--verbose',
@@ -143,9 +150,10 @@ class PysrProcedure(MethodEvaluator):
     default=False,
     help='If true, use test parameters'
 )
-def main(data_path: str, verbose: int, test: bool) -> None:
-    method = PysrProcedure(verbose, test)
-    result = method.evaluate(data_path)
+@method_options
+def main(data_path: str, verbose: int, test: bool, params: dict, evaluation: dict) -> None:
+    method = PysrProcedure(verbose, test, params)
+    result = method.evaluate(data_path, **evaluation)
     if result == 1:
         logging.error(f"Failed to evaluate PySR procedure with data from the path {data_path}.")
         result = {
@@ -154,7 +162,7 @@ def main(data_path: str, verbose: int, test: bool) -> None:
             "equation": "No equation obtained"
         }
 
-    with open(f"{PATH}/result.json", "w") as result_file:
+    with open("result.json", "w") as result_file:
         json.dump(result, result_file)
 
 
@@ -167,6 +175,8 @@ if __name__ == "__main__":
         data_path (str):      The path of the dataset to be evaluated.
         verbose (int):        Set the log level.
         test (bool):          Enable test hyperparameters.
+        params (dict):        Parameters overriding those of the method.
+        evaluation (dict):    Options of the evaluation such as the seed and fold, see method_options.
     """
     main()
 
@@ -11,9 +11,7 @@ import numpy as np
 
 # Method to Procedure superclass
 sys.path.append(os.path.join(os.path.dirname(__file__), '../../../'))
-from bench.utils.method_evaluator import MethodEvaluator
-
-PATH = os.path.dirname(os.path.abspath(__file__))
+from bench.utils.method_evaluator import MethodEvaluator, method_options
 
 
 class QlatticeProcedure(MethodEvaluator):
@@ -23,18 +21,29 @@ class QlatticeProcedure(MethodEvaluator):
     The function takes the following arguments:
         verbose (int):   The level of verbosity of logging.
         test (boolean):  Whether to run the Class in test mode or not.
+        params (dict):   Parameters overriding those of the method.
     """
-    def __init__(self, verbose=2, test=False):
-        super().__init__(verbose)
+    def __init__(self, verbose=2, test=False, params=None):
+        super().__init__(verbose, params)
         if test:
-            self.epochs = 1
-            self.complexity = 2
+            params = {
+                "epochs": 1,
+                "complexity": 2,
+                "random_seed": -1
+            }
         else:
-            self.epochs = 8000
-            self.complexity = 8
+            params = {
+                "epochs": 8000,
+                "complexity": 8,
+                "random_seed": -1
+            }
+
+        params = self.override_params(params)
+        self.epochs = params["epochs"]
+        self.complexity = params["complexity"]
 
         # Connecting
-        self._method = feyn.QLattice()
+        self._method = feyn.QLattice(random_seed=params["random_seed"])
 
     @staticmethod
     def format_output(model, threshold=1e-10, significant=5, keep_all=False):
@@ -129,7 +138,9 @@ class QlatticeProcedure(MethodEvaluator):
 @click.option(
     '--data_path',
     type=click.Path(exists=True),
-    help='Path to a csv dataset containing a column called "target" as result and other columns as input parameters'
+    help='Path to a csv, tsv, Parquet, Feather, .npy or .npz dataset, where csv and tsv may be compressed as '
+         '.gz, .xz or .zst, containing a column called "target" as result '
+         'and other columns as input parameters'
 )
 @click.option(
     '--verbose',
@@ -143,9 +154,10 @@ class QlatticeProcedure(MethodEvaluator):
     default=False,
     help='If true, use test parameters'
 )
-def main(data_path: str, verbose: int, test: bool) -> None:
-    method = QlatticeProcedure(verbose, test)
-    result = method.evaluate(data_path)
+@method_options
+def main(data_path: str, verbose: int, test: bool, params: dict, evaluation: dict) -> None:
+    method = QlatticeProcedure(verbose, test, params)
+    result = method.evaluate(data_path, **evaluation)
     if result == 1:
         logging.error(f"Failed to evaluate Qlattice procedure with data from the path {data_path}.")
         result = {
@@ -154,7 +166,7 @@ def main(data_path: str, verbose: int, test: bool) -> None:
             "equation": "No equation obtained"
         }
 
-    with open(f"{PATH}/result.json", "w") as result_file:
+    with open("result.json", "w") as result_file:
         json.dump(result, result_file)
 
 
@@ -167,5 +179,7 @@ if __name__ == "__main__":
         data_path (str):      The path of the dataset to be evaluated.
         verbose (int):        Set the log level.
         test (bool):          Enable test hyperparameters.
+        params (dict):        Parameters overriding those of the method.
+        evaluation (dict):    Options of the evaluation such as the seed and fold, see method_options.
     """
     main()
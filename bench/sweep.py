@@ -0,0 +1,339 @@
+import os
+import sys
+import json
+import time
+import asyncio
+import logging
+import statistics
+import click
+
+# Local imports
+sys.path.append(os.path.join(os.path.dirname(__file__), ''))
+from utils.run_benchmark import run_benchmark_async
+from utils.datasets_handler import datasets_handler
+from utils.scheduler import read_resources, machine_capacity, iter_jobs
+from utils.result_cache import ResultCache, dataset_digest
+from utils.result_sink import ResultSink
+from utils.runtime_history import RuntimeHistory, dataset_shape
+from utils.budget import dotted_params, NATIVE_FRACTION
+from utils.method_evaluator import merge_params
+from utils.sweep import sample_configs, config_id, halving_rungs, rank_configs, ETA
+from utils.split_cache import SplitCache
+from utils.dataset_reader import dataset_stem
+from evaluate_dataset import PATH, COLUMNS, installed_methods, plan_jobs, finish_job, share_splits, decode_datasets
+
+# Set log level
+logging.basicConfig(level=logging.INFO)
+
+# Columns of the result table of a sweep, the rung of successive halving and the resource of the rung
+SWEEP_COLUMNS = COLUMNS + ["rung", "resource"]
+
+# Columns of the leaderboard of a sweep, one row per configuration
+LEADERBOARD_COLUMNS = ["method", "config", "rung", "resource", "mean_rank", "median_mse", "params"]
+
+
+def method_rungs(method: str, space: dict) -> tuple:
+    """
+    Determine the resource parameter and the resources of the rungs of successive halving of a method.
+    Successive halving is declared under the key "halving" of the search space of the method as
+    {"param": ..., "min": ..., "max": ..., "eta": ...}, where the parameter defaults to the native
+    time limit of the method, "time_limit_param" in its resources. Without halving, every configuration
+    is run once with its own parameters, a single rung without a resource.
+    Returns the resource parameter and the list of resources of the rungs.
+
+    The function takes the following arguments:
+        method (string): The method to sweep
+        space (dict): The search space of the method
+    """
+    halving = space.get("halving")
+    if not halving:
+        return None, [None]
+    param = halving.get("param") or read_resources(method).get("time_limit_param")
+    if not param:
+        raise ValueError(f"Successive halving of {method} needs a resource parameter, as the method "
+                         f"declares no native time limit.")
+    return param, halving_rungs(halving["min"], halving["max"], halving.get("eta", ETA))
+
+
+def run_sweep(datasets: dict, name: str, space_path: str, methods: str = "all", seed: int = 0,
+              cores: int = None, memory: float = None, time_limit: float = None, memory_limit: float = None,
+              scratch_dir: str = None, warm: bool = False, cache: bool = True, cache_size: float = 1,
+              log_size: float = 10, output_format: str = "csv", stdout: bool = False,
+              split_cache: bool = True, target: str = None) -> list:
+    """
+    Sweep the parameters of the installed methods over the search spaces given in a JSON file, which maps
+    every method to sweep to its search space, see sample_configs. The parameters of every configuration
+    override those of the procedure of the method, so no code is edited. The configurations of all methods
+    are run on every dataset as concurrent jobs within the capacity of the machine, and the results of
+    identical configurations are cached like any other result. With successive halving, all configurations
+    are run with the smallest resource of the method, e.g. its native time limit or number of iterations,
+    and only the best 1/eta configurations by their mean rank across the datasets advance to the next rung,
+    which has eta times the resource, such that configurations that clearly lose are stopped early.
+    The rows of all jobs are saved in results/sweep-<name>-<timestamp> and the ranking of the configurations
+    in results/leaderboard-<name>-<timestamp>. Every dataset is split once for all configurations, and the
+    jobs attach to the split in the cache of splits, see share_splits. Compressed datasets, and all datasets if
+    another target column is given, are decoded once, see decode_datasets. Returns the rows of the leaderboard.
+
+    The function takes the following arguments:
+        datasets (dict): A dictionary mapping a label of each dataset to its path
+        name (string): The name of the sweep used to name the result files
+        space_path (string): Path of the JSON file of the search spaces of the methods
+        methods (string): The methods to sweep among those with a search space
+        seed (int): The seed of the random and Sobol searches
+        cores (int): The number of cores available, default is all
+        memory (float): The memory in GB available, default is all
+        time_limit (float): The wall-clock limit of every job in seconds, default is the limit of the method
+        memory_limit (float): The resident memory limit of every job in GB, default is the limit of the method
+        scratch_dir (string): The directory in which each job gets a scratch directory
+        warm (bool): Whether to run the jobs in warm workers that are reused across datasets
+        cache (bool): Whether to reuse cached results and cache new results
+        cache_size (float): The maximum size of the cache in GB
+        log_size (float): The size in MB at which the log of the output of a job is rotated
+        output_format (string): The format of the result files, either csv or jsonl
+        stdout (bool): Whether to also echo each row of the result table to stdout as a JSON line
+        split_cache (bool): Whether to share the splits of the datasets with the methods through the cache of splits
+        target (string): The name of the target column of the datasets, default is "target"
+    """
+    # The digests are taken of the datasets as given, before they are decoded
+    digests = {label: dataset_digest(data_path, target) for label, data_path in datasets.items()} if cache else {}
+    datasets = decode_datasets(datasets, target, digests)
+    with open(space_path, "r") as space_file:
+        spaces = json.load(space_file)
+    sweeps = {}
+    for method in installed_methods(methods):
+        if method not in spaces:
+            logging.warning(f"Method {method} has no search space in {space_path} and is not swept")
+            continue
+        param, rungs = method_rungs(method, spaces[method])
+        configs = {config_id(config): config for config in sample_configs(spaces[method], seed)}
+        sweeps[method] = {"param": param, "rungs": rungs, "configs": configs,
+                          "eta": spaces[method].get("halving", {}).get("eta", ETA)}
+        logging.info(f"Sweeping {len(configs)} configurations of {method} in {len(rungs)} rungs")
+
+    os.makedirs(f"{PATH}/results", exist_ok=True)
+    capacity = machine_capacity(cores, memory)
+    result_cache = ResultCache(max_size=int(cache_size * 1024 ** 3)) if cache else None
+    shapes = {label: dataset_shape(data_path) for label, data_path in datasets.items()}
+    history = RuntimeHistory()
+    ts = str(time.time()).replace(".", "-")
+    sink = ResultSink(f"{PATH}/results/sweep-{name}-{ts}.{output_format}", SWEEP_COLUMNS, stdout)
+    leaderboard = {}
+    try:
+        rung = 0
+        while any(rung < len(sweep["rungs"]) and sweep["configs"] for sweep in sweeps.values()):
+            # Plan the jobs of every configuration still in the sweep with the resource of the rung
+            rows = []
+            specs = []
+            bases = {}
+            for method, sweep in sweeps.items():
+                if rung >= len(sweep["rungs"]):
+                    continue
+                resource = sweep["rungs"][rung]
+                run_configs = []
+                for base, config in sweep["configs"].items():
+                    if resource is not None:
+                        config = merge_params(config, dotted_params(sweep["param"], resource))
+                    bases[(method, config_id(config))] = base
+                    run_configs.append(config)
+                method_time_limit = time_limit
+                if method_time_limit is None and resource is not None \
+                        and sweep["param"] == read_resources(method).get("time_limit_param"):
+                    method_time_limit = resource / NATIVE_FRACTION
+                for job in plan_jobs([method], datasets, name, ts, (), result_cache, digests, method_time_limit,
+                                     memory_limit, scratch_dir, warm, None, log_size, history=history,
+                                     shapes=shapes, configs=run_configs):
+                    if "row" in job:
+                        rows.append((method, job["row"]))
+                    else:
+                        specs.append(job)
+            logging.info(f"Running rung {rung} of the sweep with {len(specs)} jobs and {len(rows)} cached results")
+
+            if split_cache and specs:
+                share_splits(specs, datasets, digests, SplitCache())
+
+            # Start the longest jobs first
+            specs.sort(key=lambda spec: -spec["expected"])
+            jobs = [(spec["args"], spec["budget"]) for spec in specs]
+
+            async def run_jobs():
+                async for index, method_result in iter_jobs(run_benchmark_async, jobs, capacity):
+                    spec = specs[index]
+                    rows.append((spec["method"], finish_job(method_result, spec, result_cache, history)))
+
+            asyncio.run(run_jobs())
+
+            # Rank the configurations of every method and keep the best for the next rung
+            scores = {}
+            for method, row in rows:
+                base = bases[(method, row["config"])]
+                row.update(config=base, rung=rung, resource=sweeps[method]["rungs"][rung])
+                sink.write(row)
+                mse = row.get("mse") if row["status"] == "ok" else None
+                scores.setdefault(method, {}).setdefault(base, {})[row["dataset"]] = mse
+            for method, method_scores in scores.items():
+                sweep = sweeps[method]
+                ranking = rank_configs(method_scores)
+                for base, mean_rank in ranking:
+                    errors = [mse for mse in method_scores[base].values() if mse is not None]
+                    leaderboard[(method, base)] = {
+                        "method": method,
+                        "config": base,
+                        "rung": rung,
+                        "resource": sweep["rungs"][rung],
+                        "mean_rank": mean_rank,
+                        "median_mse": statistics.median(errors) if errors else None,
+                        "params": json.dumps(sweep["configs"][base], sort_keys=True)
+                    }
+                if rung + 1 < len(sweep["rungs"]):
+                    keep = max(len(ranking) // sweep["eta"], 1)
+                    sweep["configs"] = {base: sweep["configs"][base] for base, _ in ranking[:int(keep)]}
+                    logging.info(f"{len(sweep['configs'])} of {len(ranking)} configurations of {method} "
+                                 f"advance to rung {rung + 1}")
+            rung += 1
+    finally:
+        sink.close()
+        history.close()
+        logging.info(f"Saved {sink.rows} results to {sink.path}")
+
+    # The configurations that reached the last rung rank first
+    board = sorted(leaderboard.values(), key=lambda row: (row["method"], -row["rung"], row["mean_rank"]))
+    board_sink = ResultSink(f"{PATH}/results/leaderboard-{name}-{ts}.{output_format}", LEADERBOARD_COLUMNS)
+    try:
+        for row in board:
+            board_sink.write(row)
+    finally:
+        board_sink.close()
+    for method in sweeps:
+        best = next((row for row in board if row["method"] == method), None)
+        if best is not None:
+            logging.info(f"Best configuration of {method}: {best['params']} with median MSE {best['median_mse']}")
+    logging.info(f"Saved the leaderboard to {board_sink.path}")
+    return board
+
+
+@click.command()
+@click.option(
+    "--space",
+    required=True,
+    type=click.Path(exists=True),
+    help="Path of a JSON file mapping every method to sweep to its search space."
+)
+@click.option(
+    "--data_path",
+    help="Absolute path to the data set in .csv, .tsv, .parquet, .feather, .arrow, .npy or .npz format, "
+         "where .csv and .tsv files may be compressed as .gz, .xz or .zst."
+)
+@click.option(
+    "--batch",
+    default=None,
+    help="Path to a directory of data sets or a manifest file listing one data set per line."
+)
+@click.option(
+    "--methods",
+    default="all",
+    help="Selected methods to sweep among those with a search space."
+)
+@click.option(
+    "--seed",
+    type=int,
+    default=0,
+    help="Seed of the random and Sobol searches."
+)
+@click.option(
+    "--cores",
+    type=int,
+    default=None,
+    help="Number of cores available for the sweep. Default is all cores."
+)
+@click.option(
+    "--memory",
+    type=float,
+    default=None,
+    help="Memory in GB available for the sweep. Default is all physical memory."
+)
+@click.option(
+    "--time_limit",
+    type=float,
+    default=None,
+    help="Wall-clock limit of every job in seconds. Default is the time_limit declared by each method, "
+         "or the resource of the rung if successive halving is over the native time limit of the method."
+)
+@click.option(
+    "--memory_limit",
+    type=float,
+    default=None,
+    help="Resident memory limit of every job in GB. Default is the memory_limit declared by each method."
+)
+@click.option(
+    "--scratch_dir",
+    default=None,
+    help="Directory for the scratch directories of the jobs. Default is the system temporary directory."
+)
+@click.option(
+    "--warm",
+    type=bool,
+    default=False,
+    help="If true, each method runs in a warm worker that imports the method once and is reused across jobs."
+)
+@click.option(
+    "--cache",
+    type=bool,
+    default=True,
+    help="If true, reuse cached results of configurations that have been run before and cache new results."
+)
+@click.option(
+    "--cache_size",
+    type=float,
+    default=1,
+    help="Maximum size of the result cache in GB."
+)
+@click.option(
+    "--split_cache",
+    type=bool,
+    default=True,
+    help="If true, every dataset is split once and the methods attach read-only to the memory-mapped split "
+         "instead of each reading and splitting the dataset."
+)
+@click.option(
+    "--target",
+    default=None,
+    help="Name of the target column of the datasets. Default is target."
+)
+@click.option(
+    "--output_format",
+    type=click.Choice(["csv", "jsonl"]),
+    default="csv",
+    help="Format of the result table and leaderboard of the sweep."
+)
+def main(space: str, data_path: str = None, batch: str = None, **options) -> None:
+    """
+    CLI entry point for sweeping the parameters of the methods.
+
+    The function takes the following arguments:
+        space (string): Path of the JSON file of the search spaces
+        data_path (string): Path to the dataset
+        batch (string): Path to a directory or manifest of datasets
+        options: Options of the sweep such as methods, seed, cores, memory, limits, warm and cache
+    """
+    if (data_path is None) == (batch is None):
+        raise click.UsageError("Exactly one of --data_path and --batch must be given.")
+    if batch is not None:
+        datasets = datasets_handler(batch)
+        name = f"batch-{os.path.splitext(os.path.basename(os.path.normpath(batch)))[0]}"
+    else:
+        datasets = {os.path.basename(data_path): os.path.abspath(data_path)}
+        name = dataset_stem(data_path)
+    run_sweep(datasets, name, space, **options)
+
+
+if __name__ == "__main__":
+    """
+    This function sweeps the parameters of the methods over their search spaces on a dataset or batch of datasets.
+
+    The function takes the following arguments:
+        space (string): Path of the JSON file of the search spaces
+        data_path (string): Path to the dataset
+        batch (string): Path to a directory or manifest of datasets
+        methods (string): The methods to sweep
+    """
+    main()
@@ -0,0 +1,122 @@
+import logging
+from .scheduler import simulate_jobs
+
+# Fraction of its share of the budget a method is given as its native time limit, the rest is left
+# for starting the method, loading the dataset and predicting after the native limit stopped the search
+NATIVE_FRACTION = 0.8
+
+# Number of bisection steps searching the longest share that fits in the budget
+STEPS = 30
+
+
+def longest_first(durations: list) -> list:
+    """
+    Order job indices longest duration first, the order in which the jobs are started.
+
+    The function takes the following arguments:
+        durations (list): The duration of every job in seconds
+    """
+    return sorted(range(len(durations)), key=lambda index: -durations[index])
+
+
+def predicted_makespan(durations: list, budgets: list, capacity: dict) -> float:
+    """
+    Predict the makespan of jobs started longest first within the capacity of the machine.
+
+    The function takes the following arguments:
+        durations (list): The duration of every job in seconds
+        budgets (list):   The resource budget of every job
+        capacity (dict):  The capacity of the machine
+    """
+    order = longest_first(durations)
+    schedule = simulate_jobs([durations[index] for index in order], [budgets[index] for index in order], capacity)
+    return max((end for _, end in schedule), default=0.0)
+
+
+def split_budget(budget: float, expected: list, budgets: list, capacity: dict):
+    """
+    Split a wall-clock budget of a run across its jobs by finding the longest time every job
+    may take such that the run is predicted to complete within the budget. Jobs expected to
+    take less than this share keep their expected time, so the time saved on short methods is
+    given to the long methods instead of shortening every method by the same fraction.
+    Returns the share in seconds, or None if the run is predicted to fit in the budget anyway, in which
+    case no job needs to be shortened.
+
+    The function takes the following arguments:
+        budget (float):   The wall-clock budget of the run in seconds
+        expected (list):  The expected wall time of every job in seconds
+        budgets (list):   The resource budget of every job
+        capacity (dict):  The capacity of the machine
+    """
+    if budget <= 0:
+        raise ValueError(f"The budget must be positive, got {budget}.")
+    if predicted_makespan(expected, budgets, capacity) <= budget:
+        return None
+
+    longest = max(expected, default=0.0)
+
+    low, high = 0.0, longest
+    for _ in range(STEPS):
+        share = (low + high) / 2
+        if predicted_makespan([min(time, share) for time in expected], budgets, capacity) <= budget:
+            low = share
+        else:
+            high = share
+    if low == 0.0:
+        logging.warning(f"The jobs cannot complete within the budget of {budget:.0f} seconds on this machine")
+    return low
+
+
+def dotted_params(param: str, value) -> dict:
+    """
+    Build the parameters setting a single parameter of a method, where a dotted name
+    sets a parameter of a nested configuration, e.g. "training.time_limit".
+
+    The function takes the following arguments:
+        param (string): The name of the parameter
+        value:          The value of the parameter
+    """
+    params = nested = {}
+    keys = param.split(".")
+    for key in keys[:-1]:
+        nested[key] = {}
+        nested = nested[key]
+    nested[keys[-1]] = value
+    return params
+
+
+def native_params(resources: dict, share: float) -> dict:
+    """
+    Build the parameters setting the native time limit of a method to its share of the budget.
+    The name of the parameter is declared as "time_limit_param" in the resources of the method,
+    where a dotted name sets a parameter of a nested configuration, e.g. "training.time_limit".
+    Returns no parameters if the method has no native time limit, in which case the share is
+    only enforced by killing the method.
+
+    The function takes the following arguments:
+        resources (dict): The resources of the method as read by read_resources
+        share (float):    The share of the budget of the method in seconds
+    """
+    param = resources.get("time_limit_param")
+    if not param:
+        return {}
+    return dotted_params(param, max(int(share * NATIVE_FRACTION), 1))
+
+
+def cores_params(resources: dict, cores: int) -> dict:
+    """
+    Build the parameters setting the number of threads or processes of a method to the cores granted
+    to its job by the scheduler, such that a method with its own thread pool does not use more cores
+    than its budget. The name of the parameter is declared as "cores_param" in the resources of the method,
+    where a dotted name sets a parameter of a nested configuration, e.g. "training.n_cores_batch".
+    Returns no parameters if the method has no such parameter, in which case its threads are only
+    limited by the environment variables of the common parallel runtimes.
+
+    The function takes the following arguments:
+        resources (dict): The resources of the method as read by read_resources
+        cores (int):      The number of cores granted to the job
+    """
+    param = resources.get("cores_param")
+    if not param or cores is None:
+        return {}
+    return dotted_params(param, int(cores))
@@ -0,0 +1,415 @@
+import os
+import io
+import gzip
+import lzma
+import zipfile
+import hashlib
+import tempfile
+import numpy as np
+import pandas as pd
+
+# Name of the column of a dataset holding the expected output value
+TARGET = "target"
+
+# Number of rows of a csv dataset parsed at a time
+CHUNK_ROWS = 100000
+
+# Types of the features of a dataset, the target is always float64
+DTYPES = ["float64", "float32"]
+
+# Formats of datasets by their file extension
+FORMATS = {
+    ".csv": "csv",
+    ".tsv": "tsv",
+    ".parquet": "parquet",
+    ".pq": "parquet",
+    ".feather": "arrow",
+    ".arrow": "arrow",
+    ".ipc": "arrow",
+    ".npy": "npy",
+    ".npz": "npz"
+}
+
+# Separators of the text formats of datasets
+SEPARATORS = {
+    "csv": ",",
+    "tsv": "\t"
+}
+
+# Compressions of text datasets by their file extension, which are decompressed while streaming
+COMPRESSIONS = {
+    ".gz": "gzip",
+    ".xz": "xz",
+    ".zst": "zstd"
+}
+
+
+def split_extension(path: str) -> tuple:
+    """
+    Split the file extension of a dataset into the extension of its format and its compression,
+    e.g. (".tsv", "gzip") for data.tsv.gz, where the compression is None for an uncompressed dataset.
+
+    The function takes the following arguments:
+        path (string): Path of the dataset
+    """
+    root, extension = os.path.splitext(path)
+    extension = extension.lower()
+    if extension in COMPRESSIONS:
+        return os.path.splitext(root)[1].lower(), COMPRESSIONS[extension]
+    return extension, None
+
+
+def dataset_format(path: str) -> str:
+    """
+    Determine the format of a dataset from its file extension, one of the values of FORMATS.
+    Csv and tsv datasets may be compressed, see COMPRESSIONS, e.g. data.tsv.gz in the layout of PMLB.
+    A TypeError is raised if the format is not supported.
+
+    The function takes the following arguments:
+        path (string): Path of the dataset
+    """
+    extension, compression = split_extension(path)
+    if extension not in FORMATS:
+        raise TypeError(f"Dataset {path} is not in a supported format. "
+                        f"Supported extensions are {', '.join(FORMATS)}, and {', '.join(COMPRESSIONS)} "
+                        f"for compressed {' and '.join(SEPARATORS)} datasets.")
+    if compression is not None and FORMATS[extension] not in SEPARATORS:
+        raise TypeError(f"Dataset {path} is compressed, but only {' and '.join(SEPARATORS)} datasets "
+                        f"can be compressed.")
+    return FORMATS[extension]
+
+
+def dataset_stem(path: str) -> str:
+    """
+    The file name of a dataset without the extensions of its format and compression, e.g. 192_vineyard
+    for 192_vineyard.tsv.gz.
+
+    The function takes the following arguments:
+        path (string): Path of the dataset
+    """
+    name = os.path.basename(path)
+    if split_extension(name)[1] is not None:
+        name = os.path.splitext(name)[0]
+    return os.path.splitext(name)[0]
+
+
+def import_pyarrow():
+    """
+    Import pyarrow, which is only needed to read Parquet and Arrow datasets and is not a
+    requirement of the methods. Returns the modules pyarrow, pyarrow.ipc and pyarrow.parquet.
+    """
+    try:
+        import pyarrow
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError("Reading Parquet and Arrow datasets requires pyarrow. "
+                          "Install it with `pip install pyarrow` in the environment of the method.")
+    return pyarrow, pyarrow.ipc, pyarrow.parquet
+
+
+def open_text(path: str):
+    """
+    Open a text dataset as a binary stream, which decompresses a compressed dataset while it is read,
+    such that it is never decompressed to disk. Zstandard requires the zstandard package, which is only
+    imported when a .zst dataset is read.
+
+    The function takes the following arguments:
+        path (string): Path of the dataset
+    """
+    compression = split_extension(path)[1]
+    if compression == "gzip":
+        return gzip.open(path, "rb")
+    if compression == "xz":
+        return lzma.open(path, "rb")
+    if compression == "zstd":
+        try:
+            import zstandard
+        except ImportError:
+            raise ImportError("Reading Zstandard compressed datasets requires zstandard. "
+                              "Install it with `pip install zstandard` in the environment of the method.")
+        return zstandard.ZstdDecompressor().stream_reader(open(path, "rb"), read_across_frames=True, closefd=True)
+    return open(path, "rb")
+
+
+def array_columns(array: np.ndarray) -> dict:
+    """
+    Split a NumPy array into named columns. The fields of a structured array are its columns, and the
+    last column of a 2-D array is the target while the other columns are the features x0, x1, ...
+
+    The function takes the following arguments:
+        array (ndarray): The array, possibly memory-mapped
+    """
+    if array.dtype.names is not None:
+        return {name: array[name] for name in array.dtype.names}
+    if array.ndim != 2 or array.shape[1] < 2:
+        raise ValueError(f"A dataset array must be structured or 2-D with at least two columns, "
+                         f"got shape {array.shape}.")
+    columns = {f"x{index}": array[:, index] for index in range(array.shape[1] - 1)}
+    columns[TARGET] = array[:, -1]
+    return columns
+
+
+def select_columns(path: str, names: list, columns: list = None, target: str = TARGET) -> list:
+    """
+    Select the feature columns to read from the columns of a dataset, all columns but the target by default.
+    A ValueError is raised if the dataset has no target or lacks a selected column, or if another target
+    is given and a selected feature is named TARGET, as the target is read as TARGET.
+
+    The function takes the following arguments:
+        path (string): Path of the dataset
+        names (list):  The names of the columns of the dataset
+        columns (list): The names of the feature columns to read, None for all features
+        target (string): The name of the target column
+    """
+    if target not in names:
+        raise ValueError(f"Dataset {path} has no column {target}.")
+    if columns is None:
+        columns = [name for name in names if name != target]
+    missing = [column for column in columns if column not in names or column == target]
+    if missing:
+        raise ValueError(f"Dataset {path} has no feature columns {', '.join(missing)}.")
+    if target != TARGET and TARGET in columns:
+        raise ValueError(f"Dataset {path} has a feature column {TARGET}, which clashes with the target column "
+                         f"{target} that is read as {TARGET}. Rename the column {TARGET} of the dataset.")
+    return list(columns)
+
+
+def read_columns(path: str, columns: list = None, target: str = TARGET) -> dict:
+    """
+    Read the columns of a dataset as one-dimensional arrays, memory-mapped where the format allows it:
+    uncompressed Arrow IPC and Feather files and .npy files are mapped without copying, and Parquet
+    files are decoded from a memory map. An .npz archive holds one array per column, or a 2-D feature
+    array "X" or "x" and a target array "y", which are read into memory as archives cannot be mapped.
+    Only the target and the selected feature columns are returned, and Parquet files only decode those.
+    Text datasets are read by read_text_dataset instead.
+
+    The function takes the following arguments:
+        path (string):   Path of the dataset
+        columns (list):  The names of the feature columns to read, None for all features
+        target (string): The name of the target column
+    """
+    data_format = dataset_format(path)
+    if data_format in ["parquet", "arrow"]:
+        pyarrow, ipc, parquet = import_pyarrow()
+        if data_format == "parquet":
+            names = parquet.read_schema(path, memory_map=True).names
+            selected = select_columns(path, names, columns, target) + [target]
+            table = parquet.read_table(path, columns=selected, memory_map=True)
+        else:
+            table = ipc.open_file(pyarrow.memory_map(path, "r")).read_all()
+            table = table.select(select_columns(path, table.column_names, columns, target) + [target])
+        # A column of a single chunk without nulls is a view of the mapped file
+        return {name: table.column(name).to_numpy() for name in table.column_names}
+    if data_format == "npy":
+        arrays = array_columns(np.load(path, mmap_mode="r"))
+    else:
+        with np.load(path) as archive:
+            arrays = {name: archive[name] for name in archive.files}
+        features = arrays.get("X", arrays.get("x"))
+        if features is not None and "y" in arrays:
+            values = arrays["y"]
+            arrays = {f"x{index}": features[:, index] for index in range(features.shape[1])}
+            arrays[target] = values
+    return {name: arrays[name] for name in select_columns(path, list(arrays), columns, target) + [target]}
+
+
+def read_text_dataset(path: str, columns: list = None, dtype: str = "float64", target: str = TARGET) -> tuple:
+    """
+    Read a csv or tsv dataset in chunks of CHUNK_ROWS rows, parsing only the target and the selected feature
+    columns as float64 rather than inferring their types, in a single pass over the file. The chunks are
+    kept as arrays of the type until the rows are known, and are then copied into one Fortran-ordered array
+    and released one at a time. As the pages of the new array are only committed when they are written,
+    the memory needed is about that of the arrays and one chunk. A compressed dataset is decompressed while
+    it is parsed, see open_text.
+    Returns the features as a Fortran-ordered array of the type, the float64 target and the feature names.
+
+    The function takes the following arguments:
+        path (string):   Path of the dataset
+        columns (list):  The names of the feature columns to read, None for all features
+        dtype (string):  The type of the features, float64 or float32
+        target (string): The name of the target column
+    """
+    separator = SEPARATORS[dataset_format(path)]
+    with io.TextIOWrapper(open_text(path), encoding="utf-8") as data_file:
+        header = pd.read_csv(data_file, sep=separator, nrows=0)
+    names = select_columns(path, list(header.columns), columns, target)
+    chunks = []
+    with io.TextIOWrapper(open_text(path), encoding="utf-8") as data_file:
+        for chunk in pd.read_csv(data_file, sep=separator, usecols=names + [target], dtype=np.float64,
+                                 chunksize=CHUNK_ROWS):
+            chunks.append((chunk[names].to_numpy(dtype=dtype), chunk[target].to_numpy()))
+
+    rows = sum(len(chunk_values) for _, chunk_values in chunks)
+    features = np.empty((rows, len(names)), dtype=dtype, order="F")
+    values = np.empty(rows, dtype=np.float64)
+    position = 0
+    chunks.reverse()
+    while chunks:
+        chunk_features, chunk_values = chunks.pop()
+        end = position + len(chunk_values)
+        features[position:end] = chunk_features
+        values[position:end] = chunk_values
+        position = end
+    return features, values, names
+
+
+def read_dataset(path: str, columns: list = None, dtype: str = None, target: str = None) -> tuple:
+    """
+    Read a dataset into the features as a DataFrame and the target as a float64 Series named TARGET.
+    The features are one Fortran-ordered block, such that every feature column and the target
+    are contiguous arrays, and the data is copied once from the file or its memory map.
+    Only the selected feature columns are read, and the features are downcast to float32 if the
+    type is float32, e.g. for methods computing in single precision, which halves their memory.
+    The target is the column TARGET unless another column is given, e.g. for datasets of other benchmarks.
+
+    The function takes the following arguments:
+        path (string):   Path of the dataset
+        columns (list):  The names of the feature columns to read, None for all features
+        dtype (string):  The type of the features, float64 or float32, None for float64
+        target (string): The name of the target column, None for TARGET
+    """
+    dtype = dtype or "float64"
+    target = target or TARGET
+    if dtype not in DTYPES:
+        raise ValueError(f"Invalid dtype {dtype}. Valid dtypes are {', '.join(DTYPES)}.")
+    if dataset_format(path) in SEPARATORS:
+        features, values, names = read_text_dataset(path, columns, dtype, target)
+    else:
+        arrays = read_columns(path, columns, target)
+        names = [name for name in arrays if name != target]
+        features = np.empty((len(arrays[target]), len(names)), dtype=dtype, order="F")
+        for index, name in enumerate(names):
+            features[:, index] = arrays[name]
+        values = np.ascontiguousarray(arrays[target], dtype=np.float64)
+    x = pd.DataFrame(features, columns=names, copy=False)
+    y = pd.Series(values, name=TARGET, copy=False)
+    return x, y
+
+
+def read_shape(path: str) -> tuple:
+    """
+    Determine the number of rows and features of a dataset without parsing it. The lines of a text
+    dataset and the columns of its header are counted, decompressing a compressed dataset while counting,
+    and the shape of a binary dataset is read from its metadata or header, where the target is not a feature.
+
+    The function takes the following arguments:
+        path (string): Path of the dataset
+    """
+    data_format = dataset_format(path)
+    if data_format in SEPARATORS:
+        with open_text(path) as data_file:
+            header = data_file.readline()
+            rows = 0
+            last = b"\n"
+            for block in iter(lambda: data_file.read(1024 ** 2), b""):
+                rows += block.count(b"\n")
+                last = block[-1:]
+            if last != b"\n":
+                rows += 1
+        separator = SEPARATORS[data_format].encode("utf-8")
+        return rows, max(len(header.split(separator)) - 1, 0) if header.strip() else 0
+    if data_format == "parquet":
+        _, _, parquet = import_pyarrow()
+        metadata = parquet.ParquetFile(path).metadata
+        return metadata.num_rows, metadata.num_columns - 1
+    if data_format == "arrow":
+        pyarrow, ipc, _ = import_pyarrow()
+        reader = ipc.open_file(pyarrow.memory_map(path, "r"))
+        rows = sum(reader.get_batch(index).num_rows for index in range(reader.num_record_batches))
+        return rows, len(reader.schema.names) - 1
+    if data_format == "npy":
+        array = np.load(path, mmap_mode="r")
+        if array.dtype.names is not None:
+            return len(array), len(array.dtype.names) - 1
+        return array.shape[0], array.shape[1] - 1
+
+    # The shapes of the arrays of an archive are read from their headers
+    shapes = {}
+    with zipfile.ZipFile(path) as archive:
+        for member in archive.namelist():
+            with archive.open(member) as array_file:
+                version = np.lib.format.read_magic(array_file)
+                if version == (1, 0):
+                    shapes[member[:-len(".npy")]] = np.lib.format.read_array_header_1_0(array_file)[0]
+                else:
+                    shapes[member[:-len(".npy")]] = np.lib.format.read_array_header_2_0(array_file)[0]
+    features = shapes.get("X", shapes.get("x"))
+    if features is not None and "y" in shapes:
+        return features[0], features[1]
+    return shapes.get(TARGET, (0,))[0], len(shapes) - 1
+
+
+def decode_dataset(path: str, dataset_digest: str, cache_dir: str, target: str = None) -> str:
+    """
+    Decode a text dataset into a structured .npy file in a cache, such that later reads of the dataset
+    map the decoded file instead of decompressing and parsing the text again. The decoded file is keyed
+    by the content of the dataset and its target, which is renamed to TARGET, and is written to a temporary
+    file and renamed into place, such that a decoded file in the cache is always complete.
+    Returns the path of the decoded file.
+
+    The function takes the following arguments:
+        path (string):           Path of the dataset
+        dataset_digest (string): Digest of the content of the dataset
+        cache_dir (string):      Directory of the decoded datasets
+        target (string):         The name of the target column, None for TARGET
+    """
+    key = hashlib.sha256(f"{dataset_digest}/target={target or TARGET}".encode("utf-8")).hexdigest()
+    decoded_path = f"{cache_dir}/{key}.npy"
+    if os.path.isfile(decoded_path):
+        # Mark the decoded dataset as recently used, unless another process evicted it meanwhile
+        try:
+            os.utime(decoded_path)
+            return decoded_path
+        except FileNotFoundError:
+            pass
+    os.makedirs(cache_dir, exist_ok=True)
+    x, y = read_dataset(path, target=target)
+    array = np.empty(len(y), dtype=[(str(name), np.float64) for name in x.columns] + [(TARGET, np.float64)])
+    for name in x.columns:
+        array[str(name)] = x[name].to_numpy()
+    array[TARGET] = y.to_numpy()
+    handle, tmp_path = tempfile.mkstemp(prefix=".decoded-", suffix=".npy", dir=cache_dir)
+    try:
+        with os.fdopen(handle, "wb") as decoded_file:
+            np.save(decoded_file, array)
+        os.replace(tmp_path, decoded_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return decoded_path
+
+
+def evict_decoded(cache_dir: str, max_size: int, keep=()) -> None:
+    """
+    Remove the least recently used decoded datasets until the cache of decoded datasets is within
+    its size limit, see decode_dataset. The decoded datasets of the current run are kept.
+
+    The function takes the following arguments:
+        cache_dir (string): Directory of the decoded datasets
+        max_size (int):     The maximum size of the decoded datasets in bytes
+        keep (container):   The paths of the decoded datasets to keep
+    """
+    stats = {}
+    if os.path.isdir(cache_dir):
+        for entry in os.scandir(cache_dir):
+            if not entry.name.endswith(".npy") or entry.name.startswith("."):
+                continue
+            # The decoded datasets removed by another process sharing the cache are skipped
+            try:
+                stats[entry.path] = entry.stat()
+            except FileNotFoundError:
+                continue
+    paths = sorted(stats, key=lambda path: stats[path].st_mtime)
+    sizes = {path: stats[path].st_size for path in paths}
+    size = sum(sizes.values())
+    for path in paths:
+        if size <= max_size:
+            break
+        if path in keep:
+            continue
+        size -= sizes[path]
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
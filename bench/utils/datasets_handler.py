@@ -0,0 +1,54 @@
+import os
+import glob
+import logging
+from .dataset_reader import FORMATS, SEPARATORS, COMPRESSIONS, dataset_format
+
+# File extensions of datasets, including the compressed text datasets
+EXTENSIONS = list(FORMATS) + [f"{extension}{compression}" for extension, data_format in FORMATS.items()
+                              if data_format in SEPARATORS for compression in COMPRESSIONS]
+
+
+def datasets_handler(batch_path: str) -> dict:
+    """
+    This function converts a batch of datasets into a dictionary
+    mapping a label of each dataset to its absolute path, and
+    verify that the datasets exist and are in a supported format, see EXTENSIONS.
+
+    The batch can either be a directory, in which case all datasets in
+    the directory and its subdirectories are selected, or a manifest file
+    listing one dataset path per line. Empty lines and lines starting with #
+    are ignored in a manifest, and relative paths are relative to the manifest.
+    The label of a dataset is its path relative to the directory or manifest.
+
+    The function takes the following arguments:
+        batch_path (string): Path to a directory or a manifest file of datasets
+    """
+    if os.path.isdir(batch_path):
+        root = os.path.abspath(batch_path)
+        data_paths = sorted(path for extension in EXTENSIONS
+                            for path in glob.glob(f"{root}/**/*{extension}", recursive=True))
+    elif os.path.isfile(batch_path):
+        root = os.path.dirname(os.path.abspath(batch_path))
+        data_paths = []
+        with open(batch_path, "r") as manifest:
+            for line in manifest:
+                line = line.strip()
+                if line == "" or line.startswith("#"):
+                    continue
+                data_paths.append(os.path.normpath(os.path.join(root, line)))
+    else:
+        logging.critical(f"Batch path {batch_path} does not exist")
+        raise FileNotFoundError(f"No directory or manifest found at {batch_path}")
+
+    if not data_paths:
+        logging.critical(f"No datasets found in {batch_path}")
+        raise ValueError(f"The batch {batch_path} contains no datasets.")
+
+    datasets = {}
+    for data_path in data_paths:
+        dataset_format(data_path)
+        if not os.path.isfile(data_path):
+            raise FileNotFoundError(f"Dataset {data_path} not found.")
+        datasets[os.path.relpath(data_path, root)] = data_path
+
+    return datasets
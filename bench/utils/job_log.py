@@ -0,0 +1,135 @@
+import os
+import asyncio
+import logging
+import threading
+
+# Size in bytes at which the log of a job is rotated
+MAX_BYTES = 10 * 1024 ** 2
+
+# Number of rotated log files kept per job
+BACKUP_COUNT = 2
+
+# Bytes read from the output of a job at a time
+CHUNK_SIZE = 64 * 1024
+
+
+class JobLog:
+    """
+    Size-capped log file of the output of a job. When the log exceeds its maximum size,
+    it is rotated to <path>.1, <path>.1 to <path>.2 and so on, such that at most the
+    newest (backup_count + 1) * max_bytes of output are kept on disk and none in memory.
+    The log is flushed after every write, such that the progress of a job can be followed.
+
+    The function takes the following arguments:
+        path (string):      Path of the log file, its directory is created if it does not exist
+        max_bytes (int):    Size in bytes at which the log is rotated
+        backup_count (int): Number of rotated log files to keep
+    """
+    def __init__(self, path: str, max_bytes: int = MAX_BYTES, backup_count: int = BACKUP_COUNT):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.size = 0
+        self.bytes = 0
+        self._lock = threading.Lock()
+        self._file = open(path, "wb")
+
+    def _rotate(self) -> None:
+        self._file.close()
+        for index in range(self.backup_count - 1, 0, -1):
+            if os.path.exists(f"{self.path}.{index}"):
+                os.replace(f"{self.path}.{index}", f"{self.path}.{index + 1}")
+        if self.backup_count > 0:
+            os.replace(self.path, f"{self.path}.1")
+        self._file = open(self.path, "wb")
+        self.size = 0
+
+    def write(self, data: bytes) -> None:
+        """
+        Append output of the job to the log.
+
+        The function takes the following arguments:
+            data (bytes): The output to append
+        """
+        with self._lock:
+            if self._file.closed:
+                return
+            if self.size > 0 and self.size + len(data) > self.max_bytes:
+                self._rotate()
+            self._file.write(data)
+            self._file.flush()
+            self.size += len(data)
+            self.bytes += len(data)
+
+    def tail(self, size: int = CHUNK_SIZE) -> str:
+        """
+        Read the end of the output of the job, including the newest rotated log if the
+        current log is shorter than the requested size.
+
+        The function takes the following arguments:
+            size (int): Number of bytes to read
+        """
+        with self._lock:
+            if not self._file.closed:
+                self._file.flush()
+            data = b""
+            for path in [self.path, f"{self.path}.1"]:
+                if len(data) >= size or not os.path.exists(path):
+                    break
+                with open(path, "rb") as log_file:
+                    log_file.seek(max(os.path.getsize(path) - (size - len(data)), 0))
+                    data = log_file.read() + data
+        return data.decode("utf-8", errors="replace")
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+
+def stream(pipe, log) -> threading.Thread:
+    """
+    Start a thread copying the output of a process from a pipe to a log until the pipe is closed.
+    The log is either a JobLog or a function returning the JobLog to write to, or None to discard the output.
+
+    The function takes the following arguments:
+        pipe (file): The pipe to read the output from
+        log (JobLog): The log to write the output to
+    """
+    def copy():
+        try:
+            while True:
+                data = os.read(pipe.fileno(), CHUNK_SIZE)
+                if not data:
+                    break
+                target = log() if callable(log) else log
+                if target is not None:
+                    target.write(data)
+        except (OSError, ValueError) as e:
+            logging.debug(f"Stopped streaming output: {e}")
+
+    thread = threading.Thread(target=copy, daemon=True)
+    thread.start()
+    return thread
+
+
+async def stream_async(pipe, log: JobLog) -> None:
+    """
+    Copy the output of a process from a pipe to a log in the event loop until the pipe is closed.
+    The pipe is closed afterwards.
+
+    The function takes the following arguments:
+        pipe (file): The pipe to read the output from
+        log (JobLog): The log to write the output to
+    """
+    loop = asyncio.get_running_loop()
+    reader = asyncio.StreamReader(limit=CHUNK_SIZE)
+    transport, _ = await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), pipe)
+    try:
+        while True:
+            data = await reader.read(CHUNK_SIZE)
+            if not data:
+                break
+            log.write(data)
+    finally:
+        transport.close()
@@ -0,0 +1,317 @@
+import os
+import json
+import time
+import socket
+import sqlite3
+import asyncio
+import logging
+from .scheduler import fit_budget
+
+# Seconds a claimed job is leased to a worker before it is handed to another worker
+LEASE_TIME = 60.0
+
+# Seconds between polls of an idle worker for new jobs
+POLL_INTERVAL = 5.0
+
+# Number of times a job is claimed before a job whose lease expired is given up
+MAX_ATTEMPTS = 3
+
+# Seconds to wait for the lock of the queue database
+LOCK_TIMEOUT = 60.0
+
+
+class JobQueue:
+    """
+    Job queue stored in an SQLite database, such that several workers on several nodes
+    sharing a filesystem can drain the same benchmark. Every job is a JSON-serializable
+    dictionary with the identifier of the job under the key "job" and its resource budget
+    under the key "budget". A worker claims a job atomically and holds it under a lease,
+    which the worker renews with heartbeats while the job runs. A job whose lease expired,
+    because its worker died or lost its node, is handed to the next worker claiming a job.
+    The rows of the result table of the completed jobs are stored in the queue as well.
+    The database uses the rollback journal rather than write-ahead logging, as the
+    latter requires shared memory that is unavailable on network filesystems.
+
+    The function takes the following arguments:
+        path (string):      Path of the queue database, created if it does not exist
+        lease_time (float): Seconds a claimed job is leased to a worker
+    """
+    def __init__(self, path: str, lease_time: float = LEASE_TIME):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.lease_time = lease_time
+        self._connection = sqlite3.connect(path, timeout=LOCK_TIMEOUT, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=DELETE")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "position INTEGER PRIMARY KEY AUTOINCREMENT, "
+            "job TEXT UNIQUE NOT NULL, "
+            "spec TEXT NOT NULL, "
+            "state TEXT NOT NULL, "
+            "worker TEXT, "
+            "lease_until REAL, "
+            "attempts INTEGER NOT NULL DEFAULT 0, "
+            "status TEXT, "
+            "row TEXT)"
+        )
+
+    def _transaction(self):
+        # The write lock is taken up front, such that no two workers can claim the same job
+        self._connection.execute("BEGIN IMMEDIATE")
+        return self._connection
+
+    def put(self, spec: dict, row: dict = None) -> bool:
+        """
+        Add a job to the queue, unless it is already queued, running or done.
+        A job that failed is queued again. If a row is given, the job is recorded as done
+        with that row, e.g. for a job whose result was cached.
+        Returns whether the job was added.
+
+        The function takes the following arguments:
+            spec (dict): The job, with its identifier under the key "job"
+            row (dict):  The row of the result table of an already completed job
+        """
+        state = "queued" if row is None else "done"
+        status = None if row is None else row.get("status")
+        row = None if row is None else json.dumps(row, default=str)
+        connection = self._transaction()
+        try:
+            existing = connection.execute("SELECT state FROM jobs WHERE job = ?", (spec["job"],)).fetchone()
+            if existing is not None and existing[0] != "failed":
+                connection.execute("COMMIT")
+                return False
+            connection.execute("DELETE FROM jobs WHERE job = ?", (spec["job"],))
+            connection.execute(
+                "INSERT INTO jobs (job, spec, state, status, row) VALUES (?, ?, ?, ?, ?)",
+                (spec["job"], json.dumps(spec, default=str), state, status, row)
+            )
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        return True
+
+    def claim(self, worker: str, capacity: dict = None, used: dict = None):
+        """
+        Atomically claim the first job that is queued or whose lease expired, and that fits in the capacity
+        of the worker next to the budgets it already uses. Returns the job with the budget fitted to the capacity,
+        or None if no job can be claimed.
+        Jobs whose lease expired after MAX_ATTEMPTS claims are marked as failed instead of being claimed again,
+        such that a job crashing its node is not retried forever.
+
+        The function takes the following arguments:
+            worker (string):  Identifier of the worker claiming the job
+            capacity (dict):  The cores and memory in GB of the worker, default is any job
+            used (dict):      The cores and memory in GB used by the running jobs of the worker
+        """
+        now = time.time()
+        connection = self._transaction()
+        try:
+            rows = connection.execute(
+                "SELECT job, spec, state, attempts FROM jobs "
+                "WHERE state = 'queued' OR (state = 'running' AND lease_until < ?) ORDER BY position",
+                (now,)
+            ).fetchall()
+            for job, spec, state, attempts in rows:
+                if state == "running" and attempts >= MAX_ATTEMPTS:
+                    logging.warning(f"Giving up on job {job} after its lease expired {attempts} times")
+                    connection.execute(
+                        "UPDATE jobs SET state = 'failed', status = 'failed', worker = NULL WHERE job = ?", (job,)
+                    )
+                    continue
+                spec = json.loads(spec)
+                if capacity is not None:
+                    budget = fit_budget(spec["budget"], capacity)
+                    used = used or {"cores": 0, "memory": 0}
+                    if (used["cores"] + budget["cores"] > capacity["cores"]
+                            or used["memory"] + budget["memory"] > capacity["memory"]):
+                        continue
+                    spec["budget"] = budget
+                if state == "running":
+                    logging.info(f"Claiming job {job} whose lease expired")
+                connection.execute(
+                    "UPDATE jobs SET state = 'running', worker = ?, lease_until = ?, attempts = attempts + 1 "
+                    "WHERE job = ?",
+                    (worker, now + self.lease_time, job)
+                )
+                connection.execute("COMMIT")
+                return spec
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        return None
+
+    def heartbeat(self, worker: str, jobs: list) -> set:
+        """
+        Renew the leases of running jobs of a worker. Returns the jobs that are still leased to the worker,
+        a job missing from it has been claimed by another worker after its lease expired.
+
+        The function takes the following arguments:
+            worker (string): Identifier of the worker
+            jobs (list):     Identifiers of the jobs to renew the leases of
+        """
+        if not jobs:
+            return set()
+        connection = self._transaction()
+        try:
+            leased = set()
+            for job in jobs:
+                cursor = connection.execute(
+                    "UPDATE jobs SET lease_until = ? WHERE job = ? AND worker = ? AND state = 'running'",
+                    (time.time() + self.lease_time, job, worker)
+                )
+                if cursor.rowcount:
+                    leased.add(job)
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        return leased
+
+    def complete(self, worker: str, job: str, status: str, row: dict) -> bool:
+        """
+        Record a job of a worker as done together with its row of the result table.
+        A job with the status "failed" is recorded as failed, such that enqueueing it again retries it.
+        Returns False if the job is no longer leased to the worker, in which case nothing is recorded.
+
+        The function takes the following arguments:
+            worker (string): Identifier of the worker
+            job (string):    Identifier of the job
+            status (string): Status of the job
+            row (dict):      The row of the result table for the job, None if there is none
+        """
+        row = None if row is None else json.dumps(row, default=str)
+        cursor = self._connection.execute(
+            "UPDATE jobs SET state = ?, status = ?, row = ?, lease_until = NULL "
+            "WHERE job = ? AND worker = ? AND state = 'running'",
+            ("failed" if status == "failed" else "done", status, row, job, worker)
+        )
+        return cursor.rowcount > 0
+
+    def release(self, worker: str, jobs: list) -> None:
+        """
+        Put running jobs of a worker back in the queue, e.g. when the worker is stopped.
+
+        The function takes the following arguments:
+            worker (string): Identifier of the worker
+            jobs (list):     Identifiers of the jobs to release
+        """
+        for job in jobs:
+            self._connection.execute(
+                "UPDATE jobs SET state = 'queued', worker = NULL, lease_until = NULL, attempts = attempts - 1 "
+                "WHERE job = ? AND worker = ? AND state = 'running'",
+                (job, worker)
+            )
+
+    def counts(self) -> dict:
+        """
+        Count the jobs in the queue by state.
+        """
+        rows = self._connection.execute("SELECT state, COUNT(*) FROM jobs GROUP BY state").fetchall()
+        return dict(rows)
+
+    def rows(self):
+        """
+        Iterate over the rows of the result table of the done and failed jobs in the order they were enqueued.
+        """
+        for row, in self._connection.execute(
+                "SELECT row FROM jobs WHERE row IS NOT NULL ORDER BY position").fetchall():
+            yield json.loads(row)
+
+    def close(self) -> None:
+        self._connection.close()
+
+
+def worker_name() -> str:
+    """
+    Identifier of this process as a worker, unique across the nodes sharing a queue.
+    """
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+async def drain(queue: JobQueue, function, capacity: dict, worker: str = None, wait: bool = False,
+                poll_interval: float = POLL_INTERVAL) -> int:
+    """
+    Claim and run jobs from a queue concurrently in the event loop, such that the sum of the
+    budgets of the running jobs stays within the capacity of the worker. The leases of the running
+    jobs are renewed every third of the lease time, and a job claimed by another worker after its
+    lease expired is cancelled. Without waiting, the worker returns once every job of the queue is
+    done or failed, including the jobs running on other workers, such that jobs whose worker died
+    are picked up. If the worker is cancelled, its running jobs are cancelled and put back in the queue.
+    Returns the number of jobs run by the worker.
+
+    The function takes the following arguments:
+        queue (JobQueue):      The queue to drain
+        function (callable):   The coroutine function to run for each job, called with the job and
+                               the number of cores granted to it as the keyword cores. It returns
+                               the status of the job and its row of the result table
+        capacity (dict):       The capacity of the worker
+        worker (string):       Identifier of the worker, default is the host name and process id
+        wait (bool):           Whether to keep waiting for new jobs when the queue is drained
+        poll_interval (float): Seconds between polls for new jobs when no job can be claimed
+    """
+    worker = worker if worker is not None else worker_name()
+    heartbeat_interval = queue.lease_time / 3
+    used = {"cores": 0, "memory": 0}
+    running = {}
+    completed = 0
+    last_heartbeat = time.monotonic()
+    logging.info(f"Worker {worker} draining {queue.path} with {capacity['cores']} cores "
+                 f"and {capacity['memory']:.1f} GB of memory")
+
+    try:
+        while True:
+            # Claim jobs while they fit in the remaining capacity
+            while used["cores"] < capacity["cores"]:
+                spec = queue.claim(worker, capacity, used)
+                if spec is None:
+                    break
+                budget = spec["budget"]
+                used["cores"] += budget["cores"]
+                used["memory"] += budget["memory"]
+                logging.info(f"Worker {worker} running job {spec['job']}")
+                task = asyncio.ensure_future(function(spec, cores=budget["cores"]))
+                running[task] = (spec["job"], budget)
+
+            if not running:
+                counts = queue.counts()
+                if not wait and not counts.get("queued") and not counts.get("running"):
+                    break
+                await asyncio.sleep(poll_interval)
+                continue
+
+            done, _ = await asyncio.wait(running, timeout=min(poll_interval, heartbeat_interval),
+                                         return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                job, budget = running.pop(task)
+                used["cores"] -= budget["cores"]
+                used["memory"] -= budget["memory"]
+                if task.cancelled():
+                    continue
+                try:
+                    status, row = task.result()
+                except Exception:
+                    logging.exception(f"Job {job} raised an error")
+                    status, row = "failed", None
+                if queue.complete(worker, job, status, row):
+                    completed += 1
+                else:
+                    logging.warning(f"Discarding result of job {job}, whose lease was taken by another worker")
+
+            # Renew the leases and stop the jobs whose lease was lost
+            if running and time.monotonic() - last_heartbeat >= heartbeat_interval:
+                last_heartbeat = time.monotonic()
+                leased = queue.heartbeat(worker, [job for job, _ in running.values()])
+                for task, (job, _) in running.items():
+                    if job not in leased:
+                        logging.warning(f"Lost the lease of job {job}, cancelling it")
+                        task.cancel()
+    finally:
+        for task in running:
+            task.cancel()
+        await asyncio.gather(*running, return_exceptions=True)
+        queue.release(worker, [job for job, _ in running.values()])
+
+    logging.info(f"Worker {worker} ran {completed} jobs")
+    return completed
@@ -0,0 +1,84 @@
+import os
+import json
+import logging
+
+
+def read_journal(path: str):
+    """
+    Iterate over the identifiers and rows of the jobs recorded in a journal.
+
+    The function takes the following arguments:
+        path (string): Path of the journal file
+    """
+    with open(path, "r") as journal_file:
+        for line in journal_file:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                # The last line may be incomplete if the run was interrupted while writing it
+                logging.warning(f"Skipping incomplete line in journal {path}")
+                continue
+            yield entry["job"], entry["row"]
+
+
+def completed_jobs(path: str) -> set:
+    """
+    Read the identifiers of the jobs completed according to a journal, without opening it for writing.
+
+    The function takes the following arguments:
+        path (string): Path of the journal file
+    """
+    if not os.path.exists(path):
+        return set()
+    return {job for job, _ in read_journal(path)}
+
+
+class Journal:
+    """
+    Append-only journal of the completed jobs of a benchmark run. Every job is written
+    as one JSON line and synced to disk as soon as it completes, such that the results
+    of completed jobs survive if the run is interrupted. When resuming, the journal
+    is read to determine which jobs have already completed.
+
+    The function takes the following arguments:
+        path (string):  Path of the journal file
+        resume (bool):  Whether to continue an existing journal, otherwise it is started over
+    """
+    def __init__(self, path: str, resume: bool = False):
+        self.path = path
+        self.jobs = set()
+        if resume and os.path.exists(path):
+            self.jobs = completed_jobs(path)
+            logging.info(f"Resuming with {len(self.jobs)} completed jobs from {path}")
+        self._file = open(path, "a" if resume else "w")
+
+    def __contains__(self, job: str) -> bool:
+        return job in self.jobs
+
+    def rows(self, jobs=None):
+        """
+        Iterate over the rows of the result table of the journaled jobs.
+
+        The function takes the following arguments:
+            jobs (container): The identifiers of the jobs whose rows to include, None for all jobs
+        """
+        self._file.flush()
+        for job, row in read_journal(self.path):
+            if jobs is None or job in jobs:
+                yield row
+
+    def write(self, job: str, row: dict) -> None:
+        """
+        Record a completed job and its row of the result table.
+
+        The function takes the following arguments:
+            job (string): Identifier of the job
+            row (dict):   The row of the result table for the job
+        """
+        self.jobs.add(job)
+        self._file.write(json.dumps({"job": job, "row": row}, default=str) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self) -> None:
+        self._file.close()
@@ -1,7 +1,58 @@
+import os
+import json
+import time
 import click
 import logging
-import pandas as pd
-from sklearn.model_selection import train_test_split
+import functools
+import contextlib
+from .profiler import profiled, ARTIFACTS_DIR
+from .dataset_reader import read_dataset
+from .split_cache import SPLIT_SEED, split_dataset, is_split, attach_split
+from .sampling import parse_sample, sample_rows
+
+# Phases of an evaluation that are timed in seconds
+PHASES = ["startup", "load", "split", "sample", "fit", "predict", "format_output", "procedure"]
+
+# Whether an evaluation has been run in this process, such that the startup is only reported once
+_STARTED = False
+
+# The last dataset loaded in this process, such that evaluations of the same dataset with different seeds
+# in a warm worker reuse it, as (path, modification time, size, columns, dtype, target column, features, target)
+_LOADED = None
+
+
+def merge_params(params: dict, overrides: dict) -> dict:
+    """
+    Merge parameters overriding the parameters of a method into a copy of them,
+    where nested dictionaries are merged rather than replaced.
+
+    The function takes the following arguments:
+        params (dict):    The parameters of the method
+        overrides (dict): The parameters overriding them
+    """
+    merged = dict(params)
+    for key, value in overrides.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = merge_params(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+
+def startup_time():
+    """
+    Seconds since this process started, i.e. the time spent on starting the interpreter
+    and importing the procedure when called at the start of the first evaluation.
+    Returns None if the start time of the process is unavailable.
+    """
+    try:
+        with open("/proc/self/stat", "r") as stat_file:
+            start_ticks = int(stat_file.read().rsplit(")", 1)[1].split()[19])
+        with open("/proc/uptime", "r") as uptime_file:
+            uptime = float(uptime_file.read().split()[0])
+        return max(uptime - start_ticks / os.sysconf("SC_CLK_TCK"), 0.0)
+    except (OSError, ValueError, IndexError):
+        return None
 
 
 class MethodEvaluator:
@@ -11,11 +62,30 @@ class MethodEvaluator:
     dataset such that it can be ingested into test procedure.
     It contains a dummy procedure to be overwritten by the benchmark procedures.
     Then it contains a function with CLI interfacing for the benchmark procedure.
+    The evaluation times its phases for every procedure: the startup of the process,
+    loading and splitting the dataset, the fit and predict calls of the method in self._method,
+    the format_output method of the procedure if it has one, and the procedure in total.
+    The timings are added to the result under the key "phases".
+    Optionally, the evaluation is profiled and the profile is saved in the artifacts folder.
+    Parameters given to the procedure override the parameters of the method, e.g. to set its
+    native time limit, when the procedure passes its parameters through override_params.
+    The seed of an evaluation seeds the split into training and testing sets, and a dataset
+    evaluated again in the same process with another seed or fold is not loaded again.
+    In cross-validation mode the evaluation is given a fold i/K, and the i-th of K folds of
+    the shuffled dataset is the testing set. The folds are determined by the seed alone, such
+    that the K evaluations of a cross-validation, e.g. run in parallel, partition the dataset.
+    The features can be limited to some columns, given as a list or a comma-separated string, and be downcast
+    to float32 for methods computing in single precision, see read_dataset. Csv and tsv datasets may be
+    compressed with gzip, xz or Zstandard and are decompressed while they are read, and the target can be
+    another column than "target", e.g. for datasets of other benchmarks.
+    A sample N:sampler caps the training set at N rows selected by the sampler, see sample_rows, for methods
+    that scale badly with the number of rows, while the method is still scored on the whole testing set.
 
     The function takes the following arguments:
         verbose (int):   The level of verbosity of logging.
+        params (dict):   Parameters overriding the parameters of the method.
     """
-    def __init__(self, verbose=2):
+    def __init__(self, verbose=2, params=None):
         if verbose == 1:
             self.log_level = logging.DEBUG
         elif verbose == 2:
@@ -33,18 +103,103 @@ class MethodEvaluator:
             )
         # Set log level
         logging.basicConfig(level=self.log_level)
+        self.phases = {}
+        self.params = params or {}
 
-    @staticmethod
-    def __load(data_path):
+    def override_params(self, params):
+        """
+        Apply the parameters given to the procedure to the parameters of the method.
+        """
+        if self.params:
+            logging.info(f"Overriding parameters {self.params}")
+        return merge_params(params, self.params)
+
+    @contextlib.contextmanager
+    def _phase(self, name):
+        """
+        Time a phase of the evaluation, the time of repeated phases is summed.
+        """
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + time.perf_counter() - start_time
+
+    def _timed(self, owner, name):
         """
-        This method loads the csv dataset into a pandas dataframe.
-        Then it splits the dataset into training and testing sets.
+        Replace a method of an object by a wrapper timing it as the phase of the same name.
+        Returns a function restoring the method, or None if the method was not replaced.
         """
-        df = pd.read_csv(data_path)
-        x = df.loc[:, df.columns != "target"]
-        y = df.loc[:, "target"]
-        train_x, test_x, train_y, test_y = train_test_split(x, y, test_size=0.2, random_state=42)
-        return train_x, test_x, train_y, test_y
+        function = getattr(owner, name, None)
+        if owner is None or not callable(function):
+            return None
+
+        @functools.wraps(function)
+        def timed(*args, **kwargs):
+            with self._phase(name):
+                return function(*args, **kwargs)
+
+        # Methods set on the instance itself are put back, otherwise the wrapper is removed
+        own_function = getattr(owner, "__dict__", {}).get(name)
+
+        def restore():
+            if own_function is not None:
+                setattr(owner, name, own_function)
+            else:
+                delattr(owner, name)
+
+        try:
+            setattr(owner, name, timed)
+        except (AttributeError, TypeError):
+            logging.debug(f"Unable to time {name} of {type(owner).__name__}")
+            return None
+        return restore
+
+    def __load(self, data_path, seed=None, fold=None, columns=None, dtype=None, target=None):
+        """
+        This method loads the dataset into a dataframe of the features and a series of the target,
+        see read_dataset for the supported formats, reading only the selected feature columns as the given type.
+        Then it splits the dataset into training and testing sets,
+        or into the training and testing sets of a fold if one is given.
+        If the path is a split materialised by the orchestrator, see SplitCache, the split is attached
+        read-only instead, and the seed and fold are those the split was materialised with.
+        """
+        global _LOADED
+        if is_split(data_path):
+            with self._phase("load"):
+                return attach_split(data_path)
+        with self._phase("load"):
+            stat = os.stat(data_path)
+            key = (data_path, stat.st_mtime, stat.st_size, columns, dtype, target)
+            if _LOADED is not None and _LOADED[:6] == key:
+                x, y = _LOADED[6:]
+            else:
+                # The previous dataset is released before loading, such that only one is held
+                _LOADED = None
+                x, y = read_dataset(data_path, columns, dtype, target)
+                _LOADED = key + (x, y)
+        with self._phase("split"):
+            return split_dataset(x, y, seed, fold)
+
+    def __sample(self, data, sample, seed=None):
+        """
+        This method caps the training set at the number of rows of the sample, selected by its sampler
+        with the seed of the split, and keeps the testing set whole. The labels of the selected rows in
+        the dataset are saved to train_sample.json in the artifacts folder, such that the sample can be reproduced.
+        """
+        train_x, test_x, train_y, test_y = data
+        rows, sampler = parse_sample(sample)
+        if len(train_y) <= rows:
+            return data
+        with self._phase("sample"):
+            seed = SPLIT_SEED if seed is None else seed
+            positions = sample_rows(train_x.to_numpy(), train_y.to_numpy(), rows, sampler, seed)
+            os.makedirs(ARTIFACTS_DIR, exist_ok=True)
+            with open(os.path.join(ARTIFACTS_DIR, "train_sample.json"), "w") as sample_file:
+                json.dump({"sampler": sampler, "rows": rows, "seed": seed, "train_rows": len(train_y),
+                           "index": train_x.index[positions].tolist()}, sample_file)
+        logging.info(f"Sampled {len(positions)} of {len(train_y)} training rows with the {sampler} sampler")
+        return train_x.iloc[positions], test_x, train_y.iloc[positions], test_y
 
     @staticmethod
     def procedure(train_x, test_x, train_y, test_y) -> dict:
@@ -64,11 +219,102 @@ class MethodEvaluator:
         }
         return result
 
-    def evaluate(self, data_path) -> dict:
+    def evaluate(self, data_path, profile=None, seed=None, fold=None, sample=None, columns=None, dtype=None,
+                 target=None) -> dict:
+        global _STARTED
+        self.phases = {}
+        if not _STARTED:
+            _STARTED = True
+            startup = startup_time()
+            if startup is not None:
+                self.phases["startup"] = startup
+        if isinstance(columns, str):
+            columns = columns.split(",")
+
+        # The wrappers are instance attributes, which are restored again after the procedure
+        method = getattr(self, "_method", None)
+        restores = [self._timed(method, "fit"), self._timed(method, "predict"), self._timed(self, "format_output")]
         try:
-            data = self.__load(data_path)
-            result = self.procedure(*data)
+            with profiled(profile):
+                data = self.__load(data_path, seed, fold, columns, dtype, target)
+                if sample is not None:
+                    data = self.__sample(data, sample, seed)
+                with self._phase("procedure"):
+                    result = self.procedure(*data)
+            if isinstance(result, dict):
+                result["phases"] = self.phases
             return result
         except FileNotFoundError:
             logging.error(f"File with path {data_path} not found.")
             return 1
+        finally:
+            for restore in restores:
+                if restore is not None:
+                    restore()
+
+
+# Options of an evaluation shared by the procedures of all methods, see method_options
+EVALUATION_OPTIONS = [
+    click.option(
+        '--profile',
+        type=click.Choice(["cprofile", "sample"]),
+        default=None,
+        help='Profile the evaluation with the deterministic cprofile or the low-overhead sample profiler. '
+             'The profile is saved in the artifacts folder.'
+    ),
+    click.option(
+        '--params',
+        default=None,
+        help='JSON object of parameters overriding those of the method, e.g. its native time limit.'
+    ),
+    click.option(
+        '--seed',
+        type=int,
+        default=None,
+        help='Seed of the split of the dataset into training and testing sets. Default is 42.'
+    ),
+    click.option(
+        '--fold',
+        default=None,
+        help='Evaluate the i-th of K cross-validation folds given as i/K instead of a single split.'
+    ),
+    click.option(
+        '--sample',
+        default=None,
+        help='Cap the training set at N rows given as N or N:sampler, where the sampler is random, stratified or '
+             'coreset. The method is still scored on the whole testing set.'
+    ),
+    click.option(
+        '--columns',
+        default=None,
+        help='Comma-separated names of the feature columns to read. Default is all columns but the target.'
+    ),
+    click.option(
+        '--dtype',
+        type=click.Choice(["float64", "float32"]),
+        default=None,
+        help='Type of the features, float32 halves their memory for methods computing in single precision. '
+             'Default is float64.'
+    )
+]
+
+
+def method_options(main):
+    """
+    Add the options of an evaluation shared by the procedures of all methods to the CLI of a procedure.
+    The main function of the procedure is called with its own options, the parameters overriding those
+    of the method parsed from the JSON object given as --params, and the keyword arguments of
+    MethodEvaluator.evaluate given by the other options as the dictionary evaluation.
+
+    The function takes the following arguments:
+        main (callable): The main function of the procedure, taking its own options, params and evaluation
+    """
+    @functools.wraps(main)
+    def wrapper(params, profile, seed, fold, sample, columns, dtype, **options):
+        evaluation = {"profile": profile, "seed": seed, "fold": fold, "sample": sample, "columns": columns,
+                      "dtype": dtype}
+        return main(params=json.loads(params) if params else None, evaluation=evaluation, **options)
+
+    for option in reversed(EVALUATION_OPTIONS):
+        wrapper = option(wrapper)
+    return wrapper
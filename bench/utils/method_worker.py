@@ -0,0 +1,228 @@
+import os
+import sys
+import json
+import time
+import select
+import shlex
+import inspect
+import logging
+import importlib
+import traceback
+import subprocess
+import click
+
+# Path of the parent folder
+PATH = os.path.dirname(os.path.abspath(__file__))[:-len("/utils")]
+
+
+class MethodWorker:
+    """
+    Handle to a long-lived worker process that runs the procedure of a method
+    in the environment of the method. The worker imports the procedure once
+    and then evaluates datasets back to back, such that the interpreter startup,
+    the pyenv shim resolution and the imports of the method are paid only once.
+    Jobs and results are exchanged as JSON lines over the pipes of the worker.
+    The output of the method is streamed to the log of the job being evaluated.
+
+    The function takes the following arguments:
+        method (string): Method to run in the worker
+        env (dict):      Environment variables of the worker process
+    """
+    def __init__(self, method: str, env: dict = None):
+        method_dir = f"{PATH}/methods/{method}"
+        if not os.path.isdir(method_dir):
+            raise FileNotFoundError(f"No method directory found at {method_dir}")
+        self.method = method
+        self.log = None
+
+        # PYENV_DIR selects the environment of the method
+        command = (
+            f"unset PYENV_VERSION && PYENV_DIR={shlex.quote(method_dir)} "
+            f"exec python {shlex.quote(os.path.abspath(__file__))} --method {method}"
+        )
+        self._process = subprocess.Popen(
+            command, shell=True, env=env, text=True, start_new_session=True,
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE
+        )
+
+        # Imported here, as the worker itself runs in the environment of the method
+        from .job_log import stream
+        self._output = stream(self._process.stderr, lambda: self.log)
+
+        # Wait until the procedure has been imported
+        if self._receive().get("status") != "ready":
+            raise RuntimeError(f"Worker for {method} failed to start")
+        logging.debug(f"Started worker for {method} with pid {self._process.pid}")
+
+    @property
+    def alive(self) -> bool:
+        return self._process.poll() is None
+
+    def _receive(self, time_limit: float = None, memory_limit: float = None) -> dict:
+        if time_limit is not None or memory_limit is not None:
+            # Imported here, as the worker itself runs in the environment of the method
+            from .supervisor import LimitExceeded, POLL_INTERVAL, check_limits
+
+            start_time = time.monotonic()
+            while not select.select([self._process.stdout], [], [], POLL_INTERVAL)[0]:
+                status = check_limits(self._process.pid, start_time, time_limit, memory_limit)
+                if status is not None:
+                    self.kill()
+                    self.close()
+                    raise LimitExceeded(status, f"Worker for {self.method} exceeded its "
+                                                f"{'time' if status == 'timeout' else 'memory'} limit")
+
+        line = self._process.stdout.readline()
+        if line == "":
+            self.close()
+            raise RuntimeError(f"Worker for {self.method} exited unexpectedly")
+        return json.loads(line)
+
+    def evaluate(self, data_path: str, work_dir: str, time_limit: float = None, memory_limit: float = None,
+                 profile: str = None, log=None, params: dict = None, seed: int = None, fold: str = None,
+                 sample: str = None, columns: list = None, dtype: str = None) -> dict:
+        """
+        Evaluate a dataset in the worker and return the response of the worker.
+        The response contains the result of the procedure under the key "result",
+        or an error message under the key "error" if the evaluation failed.
+        If the evaluation exceeds a limit, the worker is killed together with
+        all of its child processes and a LimitExceeded error is raised.
+
+        The function takes the following arguments:
+            data_path (string):   Absolute path to the dataset
+            work_dir (string):    Directory the procedure runs in
+            time_limit (float):   Wall-clock limit of the evaluation in seconds, None for no limit
+            memory_limit (float): Resident memory limit of the worker in GB, None for no limit
+            profile (string):     Profiler to profile the evaluation with, None for no profiling
+            log (JobLog):         Log to stream the output of the method during the evaluation to
+            params (dict):        Parameters overriding those of the method, None for no overrides
+            seed (int):           Seed of the split of the dataset, None for the default seed
+            fold (string):        Cross-validation fold to evaluate as i/K, None for a single split
+            sample (string):      Cap of the training rows as N or N:sampler, None for all training rows
+            columns (list):       The feature columns to read, None for all columns but the target
+            dtype (string):       The type of the features, None for float64
+        """
+        job = {"data_path": data_path, "work_dir": work_dir, "profile": profile, "params": params, "seed": seed,
+               "fold": fold, "sample": sample, "columns": columns, "dtype": dtype}
+        self.log = log
+        try:
+            self._process.stdin.write(json.dumps(job) + "\n")
+            self._process.stdin.flush()
+            return self._receive(time_limit, memory_limit)
+        finally:
+            self.log = None
+
+    def kill(self) -> None:
+        """
+        Kill the worker together with all of its child processes.
+        """
+        from .supervisor import kill_tree
+        kill_tree(self._process.pid)
+
+    def close(self) -> None:
+        """
+        Stop the worker, the worker exits when its input is closed.
+        """
+        try:
+            self._process.stdin.close()
+            self._process.wait(timeout=10)
+        except (OSError, subprocess.TimeoutExpired):
+            self._process.kill()
+            self._process.wait()
+        self._process.stdout.close()
+        self._output.join(timeout=10)
+        self._process.stderr.close()
+
+
+def load_procedure(method: str):
+    """
+    Import the procedure of a method and return its MethodEvaluator subclass.
+
+    The function takes the following arguments:
+        method (string): Method to load the procedure of
+    """
+    sys.path.append(os.path.join(os.path.dirname(__file__), '../../'))
+    from bench.utils.method_evaluator import MethodEvaluator
+
+    module = importlib.import_module(f"bench.methods.{method}.procedure")
+    for value in vars(module).values():
+        if inspect.isclass(value) and issubclass(value, MethodEvaluator) and value is not MethodEvaluator:
+            return value
+    raise ImportError(f"No MethodEvaluator subclass found in the procedure of {method}")
+
+
+def serve(method: str, verbose: int = 2) -> None:
+    """
+    Serve jobs for a method until the input is closed. Every job is a JSON line with the
+    dataset path, the working directory, the profiler, the parameters overriding those of
+    the method, the seed of the split, the cross-validation fold, the cap of the training rows, the feature columns
+    and their type, and a JSON line with the response is written for every job. The response contains the result
+    and the resource usage of the worker during the job. The output of the method is redirected to stderr, such
+    that it cannot interfere with the responses.
+
+    The function takes the following arguments:
+        method (string): Method to serve jobs for
+        verbose (int):   The level of verbosity of logging
+    """
+    responses = os.fdopen(os.dup(sys.stdout.fileno()), "w")
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+
+    procedure = load_procedure(method)
+    from bench.utils.supervisor import self_usage, usage_delta, reset_peak_rss, peak_rss
+    responses.write(json.dumps({"status": "ready"}) + "\n")
+    responses.flush()
+
+    for line in sys.stdin:
+        job = json.loads(line)
+        try:
+            if not os.path.exists(job["data_path"]):
+                raise FileNotFoundError(f"Invalid value for data_path: {job['data_path']} does not exist")
+            os.chdir(job["work_dir"])
+            before = self_usage()
+            reset_peak_rss()
+
+            # A new instance per job ensures that no state is shared between datasets
+            evaluator = procedure(verbose, params=job.get("params"))
+            result = evaluator.evaluate(job["data_path"], job.get("profile"), job.get("seed"), job.get("fold"),
+                                        job.get("sample"), job.get("columns"), job.get("dtype"))
+            if result == 1:
+                logging.error(f"Failed to evaluate {method} procedure with data from the path {job['data_path']}.")
+                result = {
+                    "method": f"{method} procedure failed with data from {job['data_path']}",
+                    "mse": 0,
+                    "equation": "No equation obtained"
+                }
+            usage = usage_delta(before, self_usage())
+            usage["peak_rss"] = peak_rss()
+            response = {"result": result, "usage": usage}
+        except Exception:
+            response = {"error": traceback.format_exc()}
+        responses.write(json.dumps(response, default=str) + "\n")
+        responses.flush()
+
+
+@click.command()
+@click.option(
+    '--method',
+    help='The method to serve jobs for.'
+)
+@click.option(
+    '--verbose',
+    type=int,
+    default=2,
+    help='Set the level of verbosity. 1 is the highest level and 5 is the lowest.'
+)
+def main(method: str, verbose: int) -> None:
+    serve(method, verbose)
+
+
+if __name__ == "__main__":
+    """
+    This script runs a worker serving jobs for a method in the environment of the method.
+    It is started by MethodWorker and should not be used directly.
+
+    The function takes the following arguments:
+        method (str):         The method to serve jobs for.
+        verbose (int):        Set the log level.
+    """
+    main()
@@ -0,0 +1,107 @@
+import os
+import sys
+import time
+import pstats
+import cProfile
+import logging
+import threading
+import contextlib
+from collections import Counter
+
+# Profilers available for procedures
+PROFILERS = ["cprofile", "sample"]
+
+# Directory in the working directory of a job where the artifacts of the job are saved
+ARTIFACTS_DIR = "artifacts"
+
+# Seconds between the stack samples of the sampling profiler
+SAMPLE_INTERVAL = 0.005
+
+
+class StackSampler:
+    """
+    Low-overhead sampling profiler recording the Python stack of a thread at a fixed interval
+    from a background thread. The samples are saved as collapsed stacks, one stack per line
+    followed by its number of samples, which is the input format of flamegraph.pl and speedscope.
+    Only Python frames are recorded, time spent in native code is attributed to the calling Python frame.
+
+    The function takes the following arguments:
+        interval (float): Seconds between samples
+        thread_id (int):  Identifier of the thread to sample, default is the thread creating the sampler
+    """
+    def __init__(self, interval: float = SAMPLE_INTERVAL, thread_id: int = None):
+        self.interval = interval
+        self.thread_id = thread_id if thread_id is not None else threading.get_ident()
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def save(self, path: str) -> None:
+        """
+        Save the samples as collapsed stacks.
+
+        The function takes the following arguments:
+            path (string): Path of the collapsed stacks file
+        """
+        with open(path, "w") as stacks_file:
+            for stack, count in self.stacks.most_common():
+                stacks_file.write(f"{stack} {count}\n")
+
+
+@contextlib.contextmanager
+def profiled(profiler: str = None, directory: str = ARTIFACTS_DIR):
+    """
+    Profile the enclosed code and save the profile in a directory.
+    The cprofile profiler is deterministic and saves the statistics as profile.pstats,
+    which can be read with pstats or snakeviz, together with a summary in profile.txt.
+    The sample profiler has a low overhead and saves collapsed stacks as profile.collapsed.
+
+    The function takes the following arguments:
+        profiler (string): Either cprofile or sample, default is no profiling
+        directory (string): Directory to save the profile in, created if it does not exist
+    """
+    if profiler is None:
+        yield
+        return
+    if profiler not in PROFILERS:
+        raise ValueError(f"Invalid profiler {profiler}. Valid profilers are {', '.join(PROFILERS)}.")
+
+    os.makedirs(directory, exist_ok=True)
+    start_time = time.perf_counter()
+    if profiler == "cprofile":
+        profile = cProfile.Profile()
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            profile.dump_stats(os.path.join(directory, "profile.pstats"))
+            with open(os.path.join(directory, "profile.txt"), "w") as summary_file:
+                pstats.Stats(profile, stream=summary_file).sort_stats("cumulative").print_stats(50)
+    else:
+        sampler = StackSampler()
+        sampler.start()
+        try:
+            yield
+        finally:
+            sampler.stop()
+            sampler.save(os.path.join(directory, "profile.collapsed"))
+    logging.info(f"Saved {profiler} profile of {time.perf_counter() - start_time:.1f} seconds to {directory}")
@@ -0,0 +1,164 @@
+import math
+from .budget import dotted_params
+from .split_cache import SPLIT_SEED
+from .result_sink import ResultSink
+
+# Confidence level of the intervals of the median of repeated runs
+CONFIDENCE = 0.95
+
+# Statistics of every (dataset, method) pair of repeated runs or folds, for the MSE and the wall time in seconds
+SUMMARY_COLUMNS = ["dataset", "method", "config", "runs", "ok"] + \
+                  [f"{column}_{statistic}" for column in ["mse", "wall_time"]
+                   for statistic in ["mean", "std", "median", "q1", "q3", "iqr", "ci_low", "ci_high"]] + \
+                  ["ci_coverage"]
+
+
+def repeat_seeds(repeats: int) -> list:
+    """
+    Seeds of the repeated runs of every method and dataset. A single run has no seed and
+    keeps the default split and the default seed of the method. Several runs seed both the split
+    and the method, see seed_params. The first of several runs uses the default split, but it only
+    reproduces a single run if the method is seeded with the same seed by default, e.g. not if the
+    method is unseeded by default.
+
+    The function takes the following arguments:
+        repeats (int): The number of runs of every method and dataset
+    """
+    if repeats < 1:
+        raise ValueError(f"The number of repeats must be at least 1, got {repeats}.")
+    if repeats == 1:
+        return [None]
+    return [SPLIT_SEED + repeat for repeat in range(repeats)]
+
+
+def cv_folds(folds: int) -> list:
+    """
+    Folds of the cross-validation of every method and dataset as i/K. A single fold is no
+    cross-validation but the default split into training and testing sets, given as None.
+
+    The function takes the following arguments:
+        folds (int): The number of folds of the cross-validation
+    """
+    if folds < 1:
+        raise ValueError(f"The number of folds must be at least 1, got {folds}.")
+    if folds == 1:
+        return [None]
+    return [f"{index}/{folds}" for index in range(1, folds + 1)]
+
+
+def seed_params(resources: dict, seed: int) -> dict:
+    """
+    Build the parameters seeding a method with the seed of a run. The name of the parameter
+    is declared as "seed_param" in the resources of the method, where a dotted name sets a
+    parameter of a nested configuration, e.g. "experiment.seed". Returns no parameters if the
+    run has no seed or the method has no seed, in which case only the split varies between runs.
+
+    The function takes the following arguments:
+        resources (dict): The resources of the method as read by read_resources
+        seed (int):       The seed of the run, None for a run without a seed
+    """
+    param = resources.get("seed_param")
+    if seed is None or not param:
+        return {}
+    return dotted_params(param, seed)
+
+
+def quantile(values: list, q: float) -> float:
+    """
+    Compute a quantile of sorted values by linear interpolation between the closest values.
+
+    The function takes the following arguments:
+        values (list): The sorted values
+        q (float):     The quantile between 0 and 1
+    """
+    position = (len(values) - 1) * q
+    low = math.floor(position)
+    high = min(low + 1, len(values) - 1)
+    return values[low] + (values[high] - values[low]) * (position - low)
+
+
+def median_interval(values: list, confidence: float = CONFIDENCE) -> tuple:
+    """
+    Distribution-free confidence interval of the median of sorted values, between the k-th smallest
+    and the k-th largest value, where k is the largest order whose interval covers the median
+    with at least the confidence, as the number of values below the median is binomial.
+    With fewer than six values no interval reaches 95%, and the interval is the smallest to the largest
+    value. Returns the interval and its actual coverage as (low, high, coverage).
+
+    The function takes the following arguments:
+        values (list):      The sorted values
+        confidence (float): The confidence level of the interval
+    """
+    count = len(values)
+    coefficients = [1]
+    for below in range(count):
+        coefficients.append(coefficients[-1] * (count - below) // (below + 1))
+
+    # The interval of order k misses the median if fewer than k values are below it
+    order = 1
+    while order < (count + 1) // 2 and sum(coefficients[:order + 1]) / 2 ** count <= (1 - confidence) / 2:
+        order += 1
+    coverage = 1.0 - 2 * sum(coefficients[:order]) / 2 ** count
+    return values[order - 1], values[count - order], max(coverage, 0.0)
+
+
+def summarize(rows: list) -> list:
+    """
+    Summarize the repeated runs and cross-validation folds of every method on every dataset by the mean,
+    the standard deviation, the median, the quartiles and a confidence interval of the median of the MSE
+    and the wall time of its successful runs, where every fold counts as a run. The runs of every
+    configuration of a sweep are summarized separately.
+    The columns are given by SUMMARY_COLUMNS, where "runs" is the number of runs and "ok" the number
+    of successful runs, and the statistics of a pair without successful runs are empty.
+
+    The function takes the following arguments:
+        rows (list): The rows of the result table, whose values may be strings as read from a csv table
+    """
+    groups = {}
+    for row in rows:
+        groups.setdefault((row.get("dataset"), row.get("method"), row.get("config")), []).append(row)
+
+    summary = []
+    for (dataset, method, config), group in sorted(groups.items(), key=lambda item: tuple(str(key) for key in item[0])):
+        ok = [row for row in group if row.get("status") == "ok"]
+        summary_row = {"dataset": dataset, "method": method, "config": config, "runs": len(group), "ok": len(ok)}
+        for column in ["mse", "wall_time"]:
+            values = sorted(float(row[column]) for row in ok if row.get(column) not in (None, ""))
+            if not values:
+                continue
+            low, high, coverage = median_interval(values)
+            q1, q3 = quantile(values, 0.25), quantile(values, 0.75)
+            mean = sum(values) / len(values)
+            summary_row.update({
+                f"{column}_mean": mean,
+                f"{column}_std": math.sqrt(sum((value - mean) ** 2 for value in values) / (len(values) - 1))
+                if len(values) > 1 else None,
+                f"{column}_median": quantile(values, 0.5),
+                f"{column}_q1": q1,
+                f"{column}_q3": q3,
+                f"{column}_iqr": q3 - q1,
+                f"{column}_ci_low": low,
+                f"{column}_ci_high": high,
+                "ci_coverage": coverage
+            })
+        summary.append(summary_row)
+    return summary
+
+
+def write_summary(rows: list, path: str, stdout: bool = False) -> int:
+    """
+    Write the summary of repeated runs and folds to a table, in JSON lines if the path ends with .jsonl and
+    csv otherwise. Returns the number of rows written.
+
+    The function takes the following arguments:
+        rows (list): The rows of the result table
+        path (string): Path of the summary table
+        stdout (bool): Whether to also echo each row to stdout as a JSON line
+    """
+    sink = ResultSink(path, SUMMARY_COLUMNS, stdout)
+    try:
+        for row in summarize(rows):
+            sink.write(row)
+    finally:
+        sink.close()
+    return sink.rows
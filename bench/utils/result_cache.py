@@ -0,0 +1,203 @@
+import os
+import json
+import time
+import glob
+import hashlib
+import logging
+from .dataset_reader import TARGET
+
+# Path of the parent folder
+PATH = os.path.dirname(os.path.abspath(__file__))[:-len("/utils")]
+
+# Default location and size limit in bytes of the cache
+CACHE_DIR = f"{PATH}/cache"
+MAX_SIZE = 1024 ** 3
+
+
+def file_digest(path: str) -> str:
+    """
+    Compute the SHA-256 digest of the content of a file.
+
+    The function takes the following arguments:
+        path (string): Path of the file
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(1024 ** 2), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def dataset_digest(path: str, target: str = None) -> str:
+    """
+    Compute the digest of a dataset as given, before it is decoded, see decode_datasets, such that its
+    cached results can be found from the file. The digest of a dataset read with another target column than
+    TARGET also depends on the name of the target, as its results differ.
+
+    The function takes the following arguments:
+        path (string):   Path of the dataset
+        target (string): The name of the target column, None for TARGET
+    """
+    digest = file_digest(path)
+    if target in (None, TARGET):
+        return digest
+    return hashlib.sha256(f"{digest}/target={target}".encode("utf-8")).hexdigest()
+
+
+def cache_key(method: str, dataset_digest: str, params: dict = None, seed: int = None, fold: str = None,
+              sample: str = None, columns: list = None, dtype: str = None) -> str:
+    """
+    Compute the key of a result from everything that determines it: the content of the
+    dataset, the config.json and procedure source of the method, the shared evaluator
+    that loads and splits the dataset, and any parameters overriding those of the
+    procedure. The hyperparameters of the procedures are defined in their source, so
+    changing them changes the key. Results of repeated runs are keyed by their seed,
+    results of cross-validation folds by their fold, and results on a sample of the training rows by the sample.
+    Results on some of the feature columns or on features downcast to float32 are keyed by the columns and type.
+
+    The function takes the following arguments:
+        method (string): Method producing the result
+        dataset_digest (string): Digest of the content of the dataset
+        params (dict): Parameters overriding those of the procedure
+        seed (int): Seed of the run, None for a run without a seed
+        fold (string): Cross-validation fold of the run as i/K, None for a single split
+        sample (string): Cap of the training rows as N or N:sampler, None for all training rows
+        columns (list): The feature columns of the run, None for all columns but the target
+        dtype (string): The type of the features of the run, None for float64
+    """
+    digest = hashlib.sha256()
+    digest.update(dataset_digest.encode("utf-8"))
+    for source in [f"{PATH}/methods/{method}/config.json",
+                   f"{PATH}/methods/{method}/procedure.py",
+                   f"{PATH}/utils/method_evaluator.py",
+                   f"{PATH}/utils/split_cache.py",
+                   f"{PATH}/utils/sampling.py",
+                   f"{PATH}/utils/dataset_reader.py"]:
+        digest.update(file_digest(source).encode("utf-8"))
+    digest.update(json.dumps(params or {}, sort_keys=True).encode("utf-8"))
+    if seed is not None:
+        digest.update(f"seed={seed}".encode("utf-8"))
+    if fold is not None:
+        digest.update(f"fold={fold}".encode("utf-8"))
+    if sample is not None:
+        digest.update(f"sample={sample}".encode("utf-8"))
+    if columns is not None:
+        digest.update(f"columns={json.dumps(list(columns))}".encode("utf-8"))
+    if dtype is not None:
+        digest.update(f"dtype={dtype}".encode("utf-8"))
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """
+    Content-addressed cache of benchmark results stored as one JSON file per result.
+    When the total size of the cache exceeds its limit, the least recently used
+    results are evicted.
+
+    The function takes the following arguments:
+        cache_dir (string): Directory of the cache
+        max_size (int):     Maximum size of the cache in bytes
+    """
+    def __init__(self, cache_dir: str = CACHE_DIR, max_size: int = MAX_SIZE):
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return f"{self.cache_dir}/{key}.json"
+
+    def entries(self) -> list:
+        return glob.glob(f"{self.cache_dir}/*.json")
+
+    def stats(self) -> list:
+        """
+        Return the path, modification time and size of every entry, skipping the entries
+        that another process sharing the cache removed since they were listed.
+        """
+        stats = []
+        for entry in self.entries():
+            try:
+                stat = os.stat(entry)
+            except FileNotFoundError:
+                continue
+            stats.append((entry, stat.st_mtime, stat.st_size))
+        return stats
+
+    def size(self) -> int:
+        return sum(size for _, _, size in self.stats())
+
+    def get(self, key: str):
+        """
+        Return the cached entry of a key or None if the key is not cached.
+
+        The function takes the following arguments:
+            key (string): Key of the result
+        """
+        try:
+            with open(self._path(key), "r") as entry_file:
+                entry = json.load(entry_file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        # Mark the entry as recently used, unless another process evicted it meanwhile
+        try:
+            os.utime(self._path(key))
+        except FileNotFoundError:
+            pass
+        return entry
+
+    def put(self, key: str, entry: dict) -> None:
+        """
+        Store an entry under a key and evict old entries if the cache is too large.
+
+        The function takes the following arguments:
+            key (string): Key of the result
+            entry (dict): The entry to store, must be JSON serializable
+        """
+        tmp_path = f"{self._path(key)}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as entry_file:
+            json.dump(dict(entry, created=time.time()), entry_file, default=str)
+        os.replace(tmp_path, self._path(key))
+        self.evict()
+
+    def evict(self) -> None:
+        """
+        Remove the least recently used entries until the cache is within its size limit.
+        """
+        entries = sorted(self.stats(), key=lambda stat: stat[1])
+        size = sum(entry_size for _, _, entry_size in entries)
+        while entries and size > self.max_size:
+            entry, _, entry_size = entries.pop(0)
+            size -= entry_size
+            try:
+                os.remove(entry)
+            except FileNotFoundError:
+                continue
+            logging.debug(f"Evicted {entry} from the cache")
+
+    def invalidate(self, methods: list = None, dataset_digest: str = None) -> int:
+        """
+        Remove the entries of the given methods and dataset, by default all entries.
+        Returns the number of removed entries.
+
+        The function takes the following arguments:
+            methods (list): Methods to remove the entries of, default is all
+            dataset_digest (string): Digest of the dataset to remove the entries of, default is all
+        """
+        removed = 0
+        for path in self.entries():
+            # Entries removed by another process since they were listed are skipped
+            try:
+                with open(path, "r") as entry_file:
+                    entry = json.load(entry_file)
+            except FileNotFoundError:
+                continue
+            if methods is not None and entry.get("method") not in methods:
+                continue
+            if dataset_digest is not None and entry.get("dataset_digest") != dataset_digest:
+                continue
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                continue
+            removed += 1
+        return removed
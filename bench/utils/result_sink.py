@@ -0,0 +1,71 @@
+import sys
+import csv
+import json
+
+
+class ResultSink:
+    """
+    Incremental writer of the result table. Every row is appended to the
+    result file and flushed as soon as it is written, such that partial results
+    can be inspected while the benchmark runs and no rows are held in memory.
+    The format is JSON lines if the path ends with .jsonl and csv otherwise.
+    Optionally, every row is also echoed as a JSON line to stdout for piping.
+
+    The function takes the following arguments:
+        path (string):  Path of the result file
+        columns (list): Columns of the result table, other keys of the rows are
+                        ignored in the csv format
+        echo (bool):    Whether to echo the rows to stdout
+    """
+    def __init__(self, path: str, columns: list, echo: bool = False):
+        self.path = path
+        self.columns = columns
+        self.echo = echo
+        self.rows = 0
+        self._file = open(path, "w", newline="", encoding="utf-8")
+        self._writer = None
+        if not path.endswith(".jsonl"):
+            self._writer = csv.DictWriter(self._file, fieldnames=columns, extrasaction="ignore")
+            self._writer.writeheader()
+            self._file.flush()
+
+    def write(self, row: dict) -> None:
+        """
+        Append a row to the result table.
+
+        The function takes the following arguments:
+            row (dict): The row to append
+        """
+        line = json.dumps(row, default=str)
+        if self._writer is not None:
+            self._writer.writerow(row)
+        else:
+            self._file.write(line + "\n")
+        self._file.flush()
+        self.rows += 1
+
+        if self.echo:
+            sys.stdout.write(line + "\n")
+            sys.stdout.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+
+def read_rows(path: str):
+    """
+    Iterate over the rows of a result table written by a ResultSink. The format is JSON
+    lines if the path ends with .jsonl and csv otherwise, in which case empty cells are
+    read as None and all other values as strings.
+
+    The function takes the following arguments:
+        path (string): Path of the result file
+    """
+    with open(path, "r", newline="", encoding="utf-8") as result_file:
+        if path.endswith(".jsonl"):
+            for line in result_file:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            for row in csv.DictReader(result_file):
+                yield {key: value if value != "" else None for key, value in row.items()}
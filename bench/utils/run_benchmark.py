@@ -1,47 +1,340 @@
 import os
+import json
+import atexit
 import time
+import signal
+import shutil
+import asyncio
+import tempfile
+import threading
 import subprocess
 import logging
-import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from .method_worker import MethodWorker
+from .supervisor import LimitExceeded, supervise
+from .profiler import ARTIFACTS_DIR
+from .job_log import JobLog, MAX_BYTES, stream_async
+from .scheduler import read_resources
+from .budget import cores_params
+from .method_evaluator import merge_params
 
 
 # Path of the parent folder
 PATH = os.path.dirname(os.path.abspath(__file__))[:-6]
 
 
-def run_benchmark(method: str, data_path: str, file_name: str) -> dict:
+# Environment variables limiting the threads of common parallel runtimes
+THREAD_VARIABLES = [
+    "OMP_NUM_THREADS",
+    "MKL_NUM_THREADS",
+    "OPENBLAS_NUM_THREADS",
+    "JULIA_NUM_THREADS"
+]
+
+
+# Equation reported by the procedures when the evaluation failed
+FAILED_EQUATION = "No equation obtained"
+
+
+# Idle warm workers of this process by method
+WORKERS = {}
+WORKERS_LOCK = threading.Lock()
+
+# Threads waiting for warm workers, as the workers are driven by blocking pipes
+WARM_EXECUTOR = ThreadPoolExecutor(max_workers=256, thread_name_prefix="warm")
+
+
+def acquire_worker(method: str, env: dict) -> MethodWorker:
+    """
+    Take an idle warm worker of a method in this process, or start a new one if none is idle.
+    A worker evaluates one dataset at a time, so concurrent jobs of a method get a worker each.
+
+    The function takes the following arguments:
+        method (string): Method to get the worker for
+        env (dict): Environment variables of the worker process
+    """
+    with WORKERS_LOCK:
+        idle = WORKERS.setdefault(method, [])
+        while idle:
+            worker = idle.pop()
+            if worker.alive:
+                return worker
+    logging.info(f"Starting warm worker for {method}")
+    return MethodWorker(method, env)
+
+
+def release_worker(worker: MethodWorker) -> None:
+    """
+    Return a warm worker to the idle workers of its method, unless it has exited.
+
+    The function takes the following arguments:
+        worker (MethodWorker): The worker to release
+    """
+    if worker.alive:
+        with WORKERS_LOCK:
+            WORKERS.setdefault(worker.method, []).append(worker)
+
+
+@atexit.register
+def close_workers() -> None:
+    """
+    Stop all idle warm workers of this process.
+    """
+    with WORKERS_LOCK:
+        for workers in WORKERS.values():
+            for worker in workers:
+                worker.close()
+        WORKERS.clear()
+
+
+def run_benchmark(method: str, data_path: str, file_name: str, **options) -> dict:
     """
-    Run the benchmark of a given method.
+    Run the benchmark of a given method in a new event loop, see run_benchmark_async.
 
     The function takes the following arguments:
         method (string): Method to evaluate
-        data_path (string): Relative path to a csv file containing the dataset
+        data_path (string): Absolute path to a csv file containing the dataset
         file_name (string): Name of the dataset csv file
+        options: Options of the job passed on to run_benchmark_async
     """
+    return asyncio.run(run_benchmark_async(method, data_path, file_name, **options))
+
+
+async def run_benchmark_async(method: str, data_path: str, file_name: str, scratch_dir: str = None,
+                              warm: bool = False, time_limit: float = None, memory_limit: float = None,
+                              profile: str = None, artifacts_dir: str = None, log_path: str = None,
+                              log_size: float = None, params: dict = None, seed: int = None,
+                              fold: str = None, sample: str = None, columns: list = None, dtype: str = None,
+                              cores: int = None) -> dict:
+    """
+    Run the benchmark of a given method and read the result it saved.
+    The method runs in its own scratch directory, such that everything it writes,
+    including the result, is private to the job and removed afterwards.
+    This allows the same method to run several datasets at the same time, and many jobs
+    can run concurrently in one event loop. If the job is cancelled, the method is killed.
+    The method is killed together with all of its child processes if it exceeds its
+    time or memory limit. The status of the job is "ok" if the method obtained an equation,
+    "failed" if it did not or could not be run, and "timeout" or "oom" if it was killed for exceeding a limit.
+    The wall time of the job is measured in seconds with a monotonic clock, and the usage
+    contains the CPU seconds, peak resident memory in MB, context switches and I/O bytes of the job.
+    The files the method saves in the artifacts folder of its scratch directory, such as profiles,
+    are copied to the artifacts directory of the job before the scratch directory is removed.
+    The output of the method is streamed to a size-capped rotating log file while the job runs.
+
+    The function takes the following arguments:
+        method (string): Method to evaluate
+        data_path (string): Absolute path to a csv file containing the dataset
+        file_name (string): Name of the dataset csv file
+        scratch_dir (string): Directory to create the scratch directory in, e.g. a tmpfs
+                              like /dev/shm, default is the system temporary directory
+        warm (bool): Whether to evaluate the dataset in a warm worker of the method, which
+                     is kept alive by this process and reused for the following datasets
+        time_limit (float): Wall-clock limit of the job in seconds, default is no limit
+        memory_limit (float): Limit of the resident memory of the job in GB, default is no limit
+        profile (string): Profiler to profile the method with, either cprofile or sample, default is no profiling
+        artifacts_dir (string): Directory to copy the artifacts of the job to, default is to discard them
+        log_path (string): Path of the log file of the output of the method, default is a log
+                           in the scratch directory, which is removed with it
+        log_size (float): Size in MB at which the log is rotated, default is 10 MB
+        params (dict): Parameters overriding those of the method, e.g. its native time limit
+        seed (int): Seed of the split of the dataset into training and testing sets, default is 42
+        fold (string): Cross-validation fold to evaluate as i/K instead of a single split, default is a single split
+        sample (string): Cap of the training rows as N or N:sampler, default is all training rows
+        columns (list): The feature columns to read, default is all columns but the target
+        dtype (string): The type of the features, float64 or float32, default is float64
+        cores (int): Number of cores granted to the method, if set the thread
+                     pools of OpenMP, BLAS and Julia are limited to this number, and so is the
+                     parameter of the method declared as its cores_param, see cores_params
+    """
+    work_dir = None
+    log = None
+    start_time = time.monotonic()
     try:
-        logging.info(f"Processing {method} with input {file_name}")
-        os.chdir(f"{PATH}/methods/{method}/")
+        method_dir = f"{PATH}/methods/{method}"
+        if not os.path.isdir(method_dir):
+            raise FileNotFoundError(f"No method directory found at {method_dir}")
+        work_dir = tempfile.mkdtemp(prefix=f"{method}-", dir=scratch_dir)
+        log = JobLog(
+            log_path if log_path is not None else f"{work_dir}/output.log",
+            int(log_size * 1024 ** 2) if log_size is not None else MAX_BYTES
+        )
+        logging.info(f"Processing {method} with input {file_name} in {work_dir}")
 
-        command = [f"unset PYENV_VERSION && python procedure.py --data_path {data_path}"]
+        # Limit the threads of the method to its core budget, where parameters given for the job take precedence
+        env = dict(os.environ)
+        if cores is not None:
+            env.update({variable: str(cores) for variable in THREAD_VARIABLES})
+            params = merge_params(cores_params(read_resources(method), cores), params or {}) or None
 
         # Run benchmark method
-        start_time = time.time()
-        output = subprocess.run(command, capture_output=True, shell=True)
-        elapsed_time = time.time() - start_time
-
-        # Check that the run was successful
-        error_result = output.stderr.decode('utf-8')
-        if "[Errno 2] No such file or directory" in error_result:
-            raise RuntimeError(error_result)
-        if "Error: Invalid value for '--data_path'" in error_result:
-            raise RuntimeError(error_result)
-
-        run_time = time.strftime("%H:%M:%S", time.gmtime(elapsed_time))
-        logging.info(f"Completed evaluation of {method}")
-        return {"method": method, "run_time": run_time}
+        if warm:
+            result, usage = await run_warm(method, data_path, work_dir, env, log, time_limit, memory_limit,
+                                           profile, params, seed, fold, sample, columns, dtype)
+        else:
+            result, usage = await run_cold(method, data_path, work_dir, env, log, time_limit, memory_limit,
+                                           profile, params, seed, fold, sample, columns, dtype)
+        wall_time = time.monotonic() - start_time
+
+        status = "ok" if result is not None and result.get("equation") != FAILED_EQUATION else "failed"
+        logging.info(f"Completed evaluation of {method} in {wall_time:.3f} seconds")
+        return {"method": method, "dataset": file_name, "status": status, "wall_time": wall_time,
+                "usage": usage, "result": result}
+    except LimitExceeded as e:
+        logging.error(f"Killed {method} on {file_name}: {e}")
+        return {"method": method, "dataset": file_name, "status": e.status, "wall_time": time.monotonic() - start_time,
+                "usage": e.usage, "result": None}
     except RuntimeError as e:
         logging.error(f"Failed to run {method}")
         logging.error(e)
-        return {"method": method, "run_time": None}
+        return {"method": method, "dataset": file_name, "status": "failed", "wall_time": None,
+                "usage": {}, "result": None}
+    except Exception:
+        # Any other error fails this job only, such that the other jobs of the run carry on
+        logging.exception(f"Failed to run {method} on {file_name}")
+        return {"method": method, "dataset": file_name, "status": "failed", "wall_time": None,
+                "usage": {}, "result": None}
+    finally:
+        if log is not None:
+            log.close()
+        if work_dir is not None:
+            if artifacts_dir is not None and os.path.isdir(f"{work_dir}/{ARTIFACTS_DIR}"):
+                shutil.copytree(f"{work_dir}/{ARTIFACTS_DIR}", artifacts_dir, dirs_exist_ok=True)
+                logging.info(f"Saved artifacts of {method} on {file_name} to {artifacts_dir}")
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+
+async def run_cold(method: str, data_path: str, work_dir: str, env: dict, log: JobLog,
+                   time_limit: float = None, memory_limit: float = None, profile: str = None, params: dict = None,
+                   seed: int = None, fold: str = None, sample: str = None, columns: list = None, dtype: str = None):
+    """
+    Evaluate a dataset by running the procedure of a method in a new process,
+    and return the result it saved or None if the result is missing, together with
+    the resource usage of the process tree of the procedure.
+    A RuntimeError is raised if the procedure could not be run, and a LimitExceeded
+    error if the procedure was killed for exceeding its time or memory limit.
+    The output of the procedure is streamed to the log, whose tail is checked for errors.
+
+    The function takes the following arguments:
+        method (string): Method to evaluate
+        data_path (string): Absolute path to the dataset
+        work_dir (string): Directory to run the procedure in
+        env (dict): Environment variables of the procedure
+        log (JobLog): Log to stream the output of the procedure to
+        time_limit (float): Wall-clock limit in seconds, None for no limit
+        memory_limit (float): Resident memory limit in GB, None for no limit
+        profile (string): Profiler to profile the procedure with, None for no profiling
+        params (dict): Parameters overriding those of the method, None for no overrides
+        seed (int): Seed of the split of the dataset, None for the default seed
+        fold (string): Cross-validation fold to evaluate as i/K, None for a single split
+        sample (string): Cap of the training rows as N or N:sampler, None for all training rows
+        columns (list): The feature columns to read, None for all columns but the target
+        dtype (string): The type of the features, None for float64
+    """
+    method_dir = f"{PATH}/methods/{method}"
+
+    # PYENV_DIR selects the environment of the method while running in the scratch directory.
+    # The procedure runs in its own session, such that its whole process tree can be killed.
+    env = dict(env, PYENV_DIR=method_dir)
+    env.pop("PYENV_VERSION", None)
+    command = ["python", f"{method_dir}/procedure.py", "--data_path", data_path]
+    if profile is not None:
+        command += ["--profile", profile]
+    if params:
+        command += ["--params", json.dumps(params)]
+    if seed is not None:
+        command += ["--seed", str(seed)]
+    if fold is not None:
+        command += ["--fold", fold]
+    if sample is not None:
+        command += ["--sample", sample]
+    if columns is not None:
+        command += ["--columns", ",".join(columns)]
+    if dtype is not None:
+        command += ["--dtype", dtype]
+    try:
+        process = subprocess.Popen(
+            command, env=env, cwd=work_dir, start_new_session=True,
+            stdout=subprocess.PIPE, stderr=subprocess.STDOUT
+        )
+    except FileNotFoundError as e:
+        raise RuntimeError(e)
+    output = asyncio.ensure_future(stream_async(process.stdout, log))
+
+    # Wait for the procedure while checking its limits, and finish streaming its output when it exits
+    async def finish_output():
+        try:
+            await asyncio.wait_for(asyncio.shield(output), 10)
+        except asyncio.TimeoutError:
+            logging.warning(f"Output of {method} is still open after it exited")
+
+    try:
+        usage = await supervise(process, time_limit, memory_limit, on_exit=finish_output)
+    finally:
+        output.cancel()
+
+    # A procedure killed by SIGKILL without exceeding a limit was most likely killed by the kernel OOM killer
+    if process.returncode == -signal.SIGKILL:
+        raise LimitExceeded("oom", f"{method} was killed by SIGKILL, presumably by the out of memory killer", usage)
+
+    # Check that the run was successful
+    error_result = log.tail()
+    if "[Errno 2] No such file or directory" in error_result:
+        raise RuntimeError(error_result)
+    if "Error: Invalid value for '--data_path'" in error_result:
+        raise RuntimeError(error_result)
+
+    try:
+        with open(f"{work_dir}/result.json", "r") as result_file:
+            return json.load(result_file), usage
+    except FileNotFoundError as e:
+        logging.error(f"Result missing for {method}, the output ended with:\n{log.tail(2048)}")
+        logging.error(e)
+        return None, usage
+
+
+async def run_warm(method: str, data_path: str, work_dir: str, env: dict, log: JobLog,
+                   time_limit: float = None, memory_limit: float = None, profile: str = None,
+                   params: dict = None, seed: int = None, fold: str = None, sample: str = None,
+                   columns: list = None, dtype: str = None) -> tuple:
+    """
+    Evaluate a dataset in the warm worker of a method and return the result
+    together with the resource usage reported by the worker.
+    A RuntimeError is raised if the worker failed to evaluate the dataset, and a
+    LimitExceeded error if the worker was killed for exceeding the time or memory limit,
+    in which case a new worker is started for the next dataset. The worker is taken from
+    the idle workers of the method and returned to them after the evaluation.
+
+    The function takes the following arguments:
+        method (string): Method to evaluate
+        data_path (string): Absolute path to the dataset
+        work_dir (string): Directory to run the procedure in
+        env (dict): Environment variables used if the worker has to be started
+        log (JobLog): Log to stream the output of the worker during the evaluation to
+        time_limit (float): Wall-clock limit in seconds, None for no limit
+        memory_limit (float): Resident memory limit in GB, None for no limit
+        profile (string): Profiler to profile the evaluation with, None for no profiling
+        params (dict): Parameters overriding those of the method, None for no overrides
+        seed (int): Seed of the split of the dataset, None for the default seed
+        fold (string): Cross-validation fold to evaluate as i/K, None for a single split
+        sample (string): Cap of the training rows as N or N:sampler, None for all training rows
+        columns (list): The feature columns to read, None for all columns but the target
+        dtype (string): The type of the features, None for float64
+    """
+    loop = asyncio.get_running_loop()
+    worker = await loop.run_in_executor(WARM_EXECUTOR, acquire_worker, method, env)
+    evaluation = loop.run_in_executor(
+        WARM_EXECUTOR, worker.evaluate, data_path, work_dir, time_limit, memory_limit, profile, log,
+        params, seed, fold, sample, columns, dtype
+    )
+    try:
+        response = await asyncio.shield(evaluation)
+    except asyncio.CancelledError:
+        # The evaluation cannot be interrupted, so the worker is killed and its evaluation fails
+        evaluation.add_done_callback(lambda future: future.cancelled() or future.exception())
+        worker.kill()
+        raise
     finally:
-        os.chdir(PATH)
+        release_worker(worker)
+    if "error" in response:
+        raise RuntimeError(response["error"])
+    return response["result"], response["usage"]
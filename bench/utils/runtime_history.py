@@ -0,0 +1,163 @@
+import os
+import math
+import time
+import sqlite3
+import logging
+import statistics
+from .dataset_reader import read_shape
+
+# Path of the parent folder
+PATH = os.path.dirname(os.path.abspath(__file__))[:-len("/utils")]
+
+# Default location of the runtime history
+HISTORY_PATH = f"{PATH}/results/runtime_history.db"
+
+# Expected wall time in seconds of a job of a method without past runtimes or a time limit
+DEFAULT_COST = 60.0
+
+# Number of past runs of the most similar datasets the expected wall time is the median of
+NEIGHBOURS = 3
+
+# Statuses of jobs whose wall time is recorded, a timeout records the time limit as a lower bound
+RECORDED_STATUSES = ["ok", "timeout"]
+
+# Seconds to wait for the lock of the history database
+LOCK_TIMEOUT = 60.0
+
+
+def dataset_shape(path: str) -> tuple:
+    """
+    Determine the number of rows and features of a dataset without parsing it, see read_shape.
+    The shape is (0, 0) if the metadata of a binary dataset cannot be read, e.g. because pyarrow
+    is not installed for a Parquet dataset.
+
+    The function takes the following arguments:
+        path (string): Path of the dataset
+    """
+    try:
+        return read_shape(path)
+    except ImportError as e:
+        logging.warning(f"Unable to determine the shape of {path}: {e}")
+        return 0, 0
+
+
+class RuntimeHistory:
+    """
+    History of the wall times of past jobs stored in an SQLite database, keyed by the method and
+    the number of rows and features of the dataset. The expected wall time of a job is the median
+    wall time of the past runs of its method on the datasets most similar in size, measured as the
+    distance between the logarithms of the numbers of rows and features, such that a dataset twice
+    as large is as similar as one half as large. Without past runs of the method, the expected
+    wall time is the time limit of the method, and otherwise DEFAULT_COST.
+
+    The function takes the following arguments:
+        path (string): Path of the history database, created if it does not exist
+    """
+    def __init__(self, path: str = HISTORY_PATH):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self._connection = sqlite3.connect(path, timeout=LOCK_TIMEOUT, isolation_level=None)
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS runs ("
+            "method TEXT NOT NULL, "
+            "rows INTEGER NOT NULL, "
+            "features INTEGER NOT NULL, "
+            "wall_time REAL NOT NULL, "
+            "status TEXT NOT NULL, "
+            "created REAL NOT NULL)"
+        )
+        self._connection.execute("CREATE INDEX IF NOT EXISTS runs_method ON runs (method)")
+        self._runs = {}
+
+    def record(self, method: str, rows: int, features: int, wall_time: float, status: str) -> None:
+        """
+        Record the wall time of a job. Only jobs with a status in RECORDED_STATUSES are recorded,
+        as failed jobs usually fail early and do not predict the wall time of a successful run.
+
+        The function takes the following arguments:
+            method (string): Method of the job
+            rows (int): Number of rows of the dataset
+            features (int): Number of features of the dataset
+            wall_time (float): Wall time of the job in seconds
+            status (string): Status of the job
+        """
+        if status not in RECORDED_STATUSES or wall_time is None:
+            return
+        self._connection.execute(
+            "INSERT INTO runs (method, rows, features, wall_time, status, created) VALUES (?, ?, ?, ?, ?, ?)",
+            (method, rows, features, wall_time, status, time.time())
+        )
+        self._runs.pop(method, None)
+
+    def runs(self, method: str) -> list:
+        """
+        Return the past runs of a method as (rows, features, wall time) tuples.
+
+        The function takes the following arguments:
+            method (string): Method to return the runs of
+        """
+        if method not in self._runs:
+            self._runs[method] = self._connection.execute(
+                "SELECT rows, features, wall_time FROM runs WHERE method = ?", (method,)
+            ).fetchall()
+        return self._runs[method]
+
+    def expected_time(self, method: str, rows: int, features: int, time_limit: float = None) -> float:
+        """
+        Predict the wall time of a job in seconds, which is at most the time limit of the job.
+
+        The function takes the following arguments:
+            method (string): Method of the job
+            rows (int): Number of rows of the dataset
+            features (int): Number of features of the dataset
+            time_limit (float): The wall-clock limit of the job in seconds, None for no limit
+        """
+        runs = self.runs(method)
+        if runs:
+            def distance(run):
+                return math.hypot(math.log1p(run[0]) - math.log1p(rows), math.log1p(run[1]) - math.log1p(features))
+
+            nearest = sorted(runs, key=distance)[:NEIGHBOURS]
+            expected = statistics.median(run[2] for run in nearest)
+        elif time_limit:
+            expected = float(time_limit)
+        else:
+            expected = DEFAULT_COST
+        if time_limit:
+            expected = min(expected, float(time_limit))
+        return expected
+
+    def close(self) -> None:
+        self._connection.close()
+
+
+def format_duration(seconds: float) -> str:
+    """
+    Format a duration in seconds as h:mm:ss.
+
+    The function takes the following arguments:
+        seconds (float): The duration in seconds
+    """
+    seconds = int(round(seconds))
+    return f"{seconds // 3600}:{seconds // 60 % 60:02d}:{seconds % 60:02d}"
+
+
+def log_plan(specs: list, schedule: list) -> float:
+    """
+    Log the predicted makespan of a run and the time at which the last job of every method is
+    expected to complete. Returns the predicted makespan in seconds.
+
+    The function takes the following arguments:
+        specs (list): The planned jobs with the method under the key "method" and the expected
+                      wall time in seconds under the key "expected"
+        schedule (list): The predicted (start, end) times in seconds of the jobs
+    """
+    methods = {}
+    for spec, (start, end) in zip(specs, schedule):
+        jobs, total, eta = methods.get(spec["method"], (0, 0.0, 0.0))
+        methods[spec["method"]] = (jobs + 1, total + spec["expected"], max(eta, end))
+    makespan = max((end for _, end in schedule), default=0.0)
+    logging.info(f"Predicted makespan of {len(specs)} jobs: {format_duration(makespan)}")
+    for method, (jobs, total, eta) in sorted(methods.items(), key=lambda item: item[1][2]):
+        logging.info(f"  {method}: {jobs} jobs, {format_duration(total)} in total, completed after {format_duration(eta)}")
+    return makespan
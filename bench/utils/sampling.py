@@ -0,0 +1,136 @@
+import numpy as np
+
+# Samplers of the training rows of an evaluation
+SAMPLERS = ["random", "stratified", "coreset"]
+
+# Number of strata of the target of stratified sampling
+STRATA = 10
+
+# Number of candidate rows per sampled row of coreset sampling, which bounds its cost on large datasets
+CORESET_POOL = 4
+
+
+def parse_sample(sample: str) -> tuple:
+    """
+    Parse a cap of the training rows given as N or N:sampler into the pair (N, sampler),
+    where the sampler is random if none is given.
+
+    The function takes the following arguments:
+        sample (string): The cap as N or N:sampler, e.g. 10000:coreset
+    """
+    rows, _, sampler = str(sample).partition(":")
+    sampler = sampler or "random"
+    try:
+        rows = int(rows)
+    except ValueError:
+        raise ValueError(f"Invalid sample {sample}. The sample must be given as N or N:sampler, e.g. 10000:coreset.")
+    if rows < 1:
+        raise ValueError(f"Invalid sample {sample}. The number of rows must be at least 1.")
+    if sampler not in SAMPLERS:
+        raise ValueError(f"Invalid sampler {sampler}. Valid samplers are {', '.join(SAMPLERS)}.")
+    return rows, sampler
+
+
+def random_sample(count: int, rows: int, generator: np.random.RandomState) -> np.ndarray:
+    """
+    Sample rows uniformly without replacement.
+
+    The function takes the following arguments:
+        count (int):             The number of rows to sample from
+        rows (int):              The number of rows to sample
+        generator (RandomState): The random generator
+    """
+    return generator.choice(count, rows, replace=False)
+
+
+def stratified_sample(y: np.ndarray, rows: int, generator: np.random.RandomState) -> np.ndarray:
+    """
+    Sample rows such that every quantile range of the target keeps its share of the rows, so the
+    tails of the target are represented even in a small sample. The rows are sorted by the target
+    and split into equally large strata, and every stratum is sampled uniformly in proportion to its size.
+
+    The function takes the following arguments:
+        y (ndarray):             The target of the rows
+        rows (int):              The number of rows to sample
+        generator (RandomState): The random generator
+    """
+    strata = np.array_split(np.argsort(y, kind="stable"), min(STRATA, rows))
+    shares = np.array([rows * len(stratum) / len(y) for stratum in strata])
+    counts = np.floor(shares).astype(int)
+
+    # The rows left by rounding down go to the strata with the largest remainders
+    for index in np.argsort(counts - shares, kind="stable")[:rows - counts.sum()]:
+        counts[index] += 1
+    return np.concatenate([generator.choice(stratum, count, replace=False)
+                           for stratum, count in zip(strata, counts)])
+
+
+def coreset_sample(x: np.ndarray, y: np.ndarray, rows: int, generator: np.random.RandomState) -> np.ndarray:
+    """
+    Sample rows that cover the space of the features and the target, by greedily adding the row farthest
+    from the rows sampled so far, the k-center coreset. The distances are measured between standardized
+    features and target, and the rows are chosen from a random pool of CORESET_POOL candidates per sampled
+    row, which keeps the cost linear in the size of the dataset.
+
+    The function takes the following arguments:
+        x (ndarray):             The features of the rows
+        y (ndarray):             The target of the rows
+        rows (int):              The number of rows to sample
+        generator (RandomState): The random generator
+    """
+    pool = random_sample(len(y), min(len(y), rows * CORESET_POOL), generator)
+    points = np.column_stack([x[pool], y[pool]]).astype(np.float64)
+    scale = points.std(axis=0)
+    points = (points - points.mean(axis=0)) / np.where(scale > 0, scale, 1.0)
+
+    chosen = [generator.randint(len(pool))]
+    distances = np.square(points - points[chosen[0]]).sum(axis=1)
+    for _ in range(rows - 1):
+        chosen.append(int(np.argmax(distances)))
+        distances = np.minimum(distances, np.square(points - points[chosen[-1]]).sum(axis=1))
+    return pool[chosen]
+
+
+def sample_rows(x: np.ndarray, y: np.ndarray, rows: int, sampler: str = "random", seed: int = 0) -> np.ndarray:
+    """
+    Select at most the given number of training rows with a sampler, one of SAMPLERS.
+    Returns the sorted positions of the selected rows, all rows if there are not more than the cap.
+
+    The function takes the following arguments:
+        x (ndarray):      The features of the rows
+        y (ndarray):      The target of the rows
+        rows (int):       The maximum number of rows
+        sampler (string): The sampler, random, stratified or coreset
+        seed (int):       The seed of the sampler
+    """
+    if sampler not in SAMPLERS:
+        raise ValueError(f"Invalid sampler {sampler}. Valid samplers are {', '.join(SAMPLERS)}.")
+    if len(y) <= rows:
+        return np.arange(len(y))
+    generator = np.random.RandomState(seed)
+    if sampler == "random":
+        positions = random_sample(len(y), rows, generator)
+    elif sampler == "stratified":
+        positions = stratified_sample(np.asarray(y), rows, generator)
+    else:
+        positions = coreset_sample(np.asarray(x), np.asarray(y), rows, generator)
+    return np.sort(positions)
+
+
+def train_sample(resources: dict, max_train_samples: int = None, sampler: str = None):
+    """
+    Determine the cap of the training rows of a method as N:sampler. The cap of a method is declared as
+    "max_train_samples" in its resources, following the convention of srbench, together with an optional
+    "sampler", and a cap given for the run overrides it, where a cap of 0 uses all training rows.
+    Returns None if the training rows of the method are not capped.
+
+    The function takes the following arguments:
+        resources (dict):        The resources of the method as read by read_resources
+        max_train_samples (int): The cap of the training rows of the run, None for the cap of the method
+        sampler (string):        The sampler of the run, None for the sampler of the method or random
+    """
+    rows = max_train_samples if max_train_samples is not None else resources.get("max_train_samples")
+    if not rows:
+        return None
+    sampler = sampler or resources.get("sampler") or "random"
+    return f"{rows}:{sampler}"
@@ -0,0 +1,185 @@
+import os
+import json
+import heapq
+import asyncio
+import logging
+
+# Path of the parent folder
+PATH = os.path.dirname(os.path.abspath(__file__))[:-len("/utils")]
+
+# Budget used for methods that do not declare resources in their config.json
+DEFAULT_RESOURCES = {
+    "cores": 1,
+    "memory": 0
+}
+
+
+def read_resources(method: str) -> dict:
+    """
+    Reads the declared resource budget of a method from the optional
+    "resources" entry of its config.json. The budget consists of the
+    number of cores and the memory in GB the method is expected to use.
+    A core budget of -1 means that the method uses all cores of the machine,
+    and a memory budget of 0 means that the memory use is not declared.
+    Optionally, the entry declares a wall-clock limit in seconds as "time_limit"
+    and a resident memory limit in GB as "memory_limit", beyond which the method is killed.
+    A method with a native time limit declares the name of its parameter as "time_limit_param",
+    such that a share of the budget of a run can be pushed into it, and a method with a seed
+    declares the name of its seed parameter as "seed_param", such that repeated runs are seeded.
+
+    The function takes the following arguments:
+        method (string): Method to read the resource budget for
+    """
+    with open(f"{PATH}/methods/{method}/config.json", "r") as config_file:
+        config = json.load(config_file)
+
+    resources = dict(DEFAULT_RESOURCES)
+    resources.update(config.get("resources", {}))
+    return resources
+
+
+def machine_capacity(cores: int = None, memory: float = None) -> dict:
+    """
+    Determine the capacity of the machine available for benchmarking.
+    The number of cores is the number of cores this process may run on,
+    and the memory is the physical memory in GB.
+
+    The function takes the following arguments:
+        cores (int):    Override the number of cores available
+        memory (float): Override the memory in GB available
+    """
+    if cores is None:
+        cores = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count()
+    if memory is None:
+        memory = os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES") / 1024 ** 3
+    if cores < 1:
+        raise ValueError(f"The number of cores must be at least 1, got {cores}.")
+    return {"cores": cores, "memory": memory}
+
+
+def fit_budget(resources: dict, capacity: dict) -> dict:
+    """
+    Fit a resource budget within the capacity of the machine such that
+    a job can always be scheduled, even if it declares more than available.
+
+    The function takes the following arguments:
+        resources (dict): The declared resource budget
+        capacity (dict):  The capacity of the machine
+    """
+    cores = resources["cores"]
+    if cores == -1 or cores > capacity["cores"]:
+        cores = capacity["cores"]
+    memory = min(resources["memory"], capacity["memory"])
+    if memory < resources["memory"]:
+        logging.warning(
+            f"Memory budget of {resources['memory']} GB exceeds the capacity "
+            f"of {capacity['memory']:.1f} GB and has been reduced."
+        )
+    return {"cores": max(int(cores), 1), "memory": memory}
+
+
+async def iter_jobs(function, jobs: list, capacity: dict):
+    """
+    Run jobs concurrently in the event loop such that the sum of the resource budgets of
+    the running jobs never exceeds the capacity of the machine. Jobs are
+    started in the given order, but a later job is started ahead of
+    an earlier one if only the later one fits in the remaining capacity.
+    This is an asynchronous generator yielding the index and result of each job as soon as
+    it completes, such that results can be consumed while the jobs run.
+    If the generator is closed or cancelled, the running jobs are cancelled.
+
+    The function takes the following arguments:
+        function (callable): The coroutine function to run for each job, the number of cores
+                             granted to the job is passed as the keyword cores
+        jobs (list):         A list of (args, budget) tuples where args is the
+                             argument tuple of the function, or a dictionary of
+                             its keyword arguments, and budget is the resource
+                             budget of the job
+        capacity (dict):     The capacity of the machine
+    """
+    pending = [(index, args, fit_budget(budget, capacity)) for index, (args, budget) in enumerate(jobs)]
+    used = {"cores": 0, "memory": 0}
+    running = {}
+
+    try:
+        while pending or running:
+            # Start every pending job that fits in the remaining capacity
+            for job in list(pending):
+                index, args, budget = job
+                if (used["cores"] + budget["cores"] > capacity["cores"]
+                        or used["memory"] + budget["memory"] > capacity["memory"]):
+                    continue
+                pending.remove(job)
+                used["cores"] += budget["cores"]
+                used["memory"] += budget["memory"]
+                logging.debug(f"Starting job {index} with budget {budget}")
+                if isinstance(args, dict):
+                    task = asyncio.ensure_future(function(**args, cores=budget["cores"]))
+                else:
+                    task = asyncio.ensure_future(function(*args, cores=budget["cores"]))
+                running[task] = (index, budget)
+
+            # Wait for a job to finish and release its budget
+            done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                index, budget = running.pop(task)
+                used["cores"] -= budget["cores"]
+                used["memory"] -= budget["memory"]
+                yield index, task.result()
+    finally:
+        for task in running:
+            task.cancel()
+        await asyncio.gather(*running, return_exceptions=True)
+
+
+def simulate_jobs(durations: list, budgets: list, capacity: dict) -> list:
+    """
+    Predict when every job starts and ends if the jobs are run by iter_jobs in the given order
+    and every job takes its expected duration. Returns the (start, end) times of the jobs in seconds.
+
+    The function takes the following arguments:
+        durations (list): The expected duration of every job in seconds
+        budgets (list):   The resource budget of every job
+        capacity (dict):  The capacity of the machine
+    """
+    pending = [(index, fit_budget(budget, capacity)) for index, budget in enumerate(budgets)]
+    used = {"cores": 0, "memory": 0}
+    running = []
+    schedule = [None] * len(durations)
+    now = 0.0
+    while pending or running:
+        for job in list(pending):
+            index, budget = job
+            if (used["cores"] + budget["cores"] > capacity["cores"]
+                    or used["memory"] + budget["memory"] > capacity["memory"]):
+                continue
+            pending.remove(job)
+            used["cores"] += budget["cores"]
+            used["memory"] += budget["memory"]
+            schedule[index] = (now, now + durations[index])
+            heapq.heappush(running, (now + durations[index], index, budget))
+
+        # Advance to the next job to finish and release its budget
+        now, index, budget = heapq.heappop(running)
+        used["cores"] -= budget["cores"]
+        used["memory"] -= budget["memory"]
+    return schedule
+
+
+def run_jobs(function, jobs: list, capacity: dict) -> list:
+    """
+    Run jobs within the capacity of the machine like iter_jobs in a new event loop,
+    and return the results in the order of the jobs.
+
+    The function takes the following arguments:
+        function (callable): The coroutine function to run for each job
+        jobs (list):         A list of (args, budget) tuples
+        capacity (dict):     The capacity of the machine
+    """
+    async def collect():
+        results = [None] * len(jobs)
+        async for index, result in iter_jobs(function, jobs, capacity):
+            results[index] = result
+        return results
+
+    return asyncio.run(collect())
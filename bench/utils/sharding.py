@@ -0,0 +1,110 @@
+import os
+import json
+import hashlib
+import logging
+
+
+def parse_shard(shard: str) -> tuple:
+    """
+    Parse a shard given as i/N, the i-th of N shards counting from 1, into the pair (i, N).
+
+    The function takes the following arguments:
+        shard (string): The shard as i/N
+    """
+    try:
+        index, count = (int(part) for part in shard.split("/"))
+    except ValueError:
+        raise ValueError(f"Invalid shard {shard}. The shard must be given as i/N, e.g. 1/4.")
+    if count < 1 or not 1 <= index <= count:
+        raise ValueError(f"Invalid shard {shard}. The shard index must be between 1 and the number of shards.")
+    return index, count
+
+
+def partition(costs: dict, count: int) -> list:
+    """
+    Partition jobs into shards of balanced expected cost. The jobs are assigned
+    longest first to the shard with the least total cost so far, the longest
+    processing time rule, which keeps the longest shard within 4/3 of the optimum.
+    Ties are broken by the identifiers of the jobs and the order of the shards,
+    such that the partition only depends on the costs.
+    Returns a list with the sorted identifiers of the jobs of every shard.
+
+    The function takes the following arguments:
+        costs (dict): A dictionary mapping the identifier of every job to its expected cost
+        count (int): The number of shards
+    """
+    shards = [[] for _ in range(count)]
+    loads = [0.0] * count
+    for job in sorted(costs, key=lambda job: (-costs[job], job)):
+        shard = min(range(count), key=lambda index: (loads[index], index))
+        shards[shard].append(job)
+        loads[shard] += costs[job]
+    return [sorted(jobs) for jobs in shards]
+
+
+def shard_plan(directory: str, name: str, costs: dict, count: int) -> dict:
+    """
+    Partition the jobs of a run of a benchmark into shards once and save the partition, such that every
+    shard task of the run uses the same partition, even if the past runtimes change while the tasks start
+    one after another. The partition is saved as shards-<name>-<N>-<digest>.json, where the digest
+    identifies the set of jobs. The first task to save the partition wins, and every other task loads it.
+    The partition is removed once every shard of the run has completed, see finish_shard, such that the
+    next run partitions its jobs afresh by the runtimes recorded since. Returns the saved plan with the
+    jobs of every shard under the key "shards", the expected cost of every shard under the key "costs"
+    and the path of the saved partition under the key "path".
+
+    The function takes the following arguments:
+        directory (string): The directory to save the partition in, shared by the shard tasks
+        name (string): The name of the benchmark
+        costs (dict): A dictionary mapping the identifier of every job to its expected cost
+        count (int): The number of shards
+    """
+    digest = hashlib.sha256(json.dumps(sorted(costs)).encode("utf-8")).hexdigest()[:12]
+    path = f"{directory}/shards-{name}-{count}-{digest}.json"
+    if not os.path.exists(path):
+        shards = partition(costs, count)
+        plan = {
+            "name": name,
+            "shards": shards,
+            "costs": [sum(costs[job] for job in jobs) for jobs in shards]
+        }
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as plan_file:
+            json.dump(plan, plan_file, indent=1)
+        try:
+            # Linking fails if another task saved its partition first, also on network filesystems
+            os.link(tmp_path, path)
+            logging.info(f"Saved partition into {count} shards to {path}")
+        except FileExistsError:
+            pass
+        finally:
+            os.remove(tmp_path)
+    with open(path, "r") as plan_file:
+        plan = json.load(plan_file)
+    plan["path"] = path
+    return plan
+
+
+def finish_shard(path: str, index: int, count: int) -> bool:
+    """
+    Record that a shard of a run has completed, by saving the marker <path>.done<i> next to the partition.
+    Once every shard of the run has completed, the partition and the markers are removed, such that the
+    next run of the benchmark partitions its jobs afresh. Returns whether the partition was removed.
+
+    The function takes the following arguments:
+        path (string): The path of the saved partition, see shard_plan
+        index (int): The index of the completed shard, counting from 1
+        count (int): The number of shards
+    """
+    open(f"{path}.done{index}", "w").close()
+    markers = [f"{path}.done{other}" for other in range(1, count + 1)]
+    if not all(os.path.exists(marker) for marker in markers):
+        return False
+    # Shards completing at the same time may both remove the partition
+    for marker_path in [path] + markers:
+        try:
+            os.remove(marker_path)
+        except FileNotFoundError:
+            pass
+    logging.info(f"Removed the partition {path}, as every shard of the run has completed")
+    return True
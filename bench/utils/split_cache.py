@@ -0,0 +1,234 @@
+import os
+import glob
+import json
+import shutil
+import hashlib
+import logging
+import tempfile
+import numpy as np
+import pandas as pd
+from sklearn.model_selection import train_test_split, KFold
+from .dataset_reader import TARGET, read_dataset
+
+# Path of the parent folder
+PATH = os.path.dirname(os.path.abspath(__file__))[:-len("/utils")]
+
+# Default location and size limit in bytes of the cache of splits
+SPLIT_DIR = f"{PATH}/cache/splits"
+MAX_SIZE = 10 * 1024 ** 3
+
+# Seed of the train and test split of an evaluation without a seed
+SPLIT_SEED = 42
+
+# Fraction of a dataset in the testing set of a split without folds
+TEST_SIZE = 0.2
+
+# Arrays of a split as saved in the cache, the features and targets of the training and testing sets
+# and the row labels of the dataset in each set
+PARTS = ["train_x", "test_x", "train_y", "test_y", "train_index", "test_index"]
+
+
+def parse_fold(fold: str) -> tuple:
+    """
+    Parse a fold of a cross-validation given as i/K, the i-th of K folds counting from 1, into the pair (i, K).
+
+    The function takes the following arguments:
+        fold (string): The fold as i/K
+    """
+    try:
+        index, count = (int(part) for part in fold.split("/"))
+    except ValueError:
+        raise ValueError(f"Invalid fold {fold}. The fold must be given as i/K, e.g. 1/5.")
+    if count < 2 or not 1 <= index <= count:
+        raise ValueError(f"Invalid fold {fold}. There must be at least two folds and the index must be between "
+                         f"1 and the number of folds.")
+    return index, count
+
+
+def split_dataset(x: pd.DataFrame, y: pd.Series, seed: int = None, fold: str = None) -> tuple:
+    """
+    Split a dataset into training and testing sets, or into the training and testing sets of a fold i/K,
+    where the i-th of K folds of the shuffled dataset is the testing set. Returns the tuple
+    (train_x, test_x, train_y, test_y).
+
+    The function takes the following arguments:
+        x (DataFrame): The features of the dataset
+        y (Series):    The target of the dataset
+        seed (int):    The seed of the split, None for the default seed
+        fold (string): The cross-validation fold as i/K, None for a single split
+    """
+    seed = SPLIT_SEED if seed is None else seed
+    if fold is None:
+        return tuple(train_test_split(x, y, test_size=TEST_SIZE, random_state=seed))
+    index, count = parse_fold(fold)
+    train_index, test_index = list(KFold(count, shuffle=True, random_state=seed).split(x))[index - 1]
+    return x.iloc[train_index], x.iloc[test_index], y.iloc[train_index], y.iloc[test_index]
+
+
+def split_key(dataset_digest: str, seed: int = None, fold: str = None, columns: list = None,
+              dtype: str = None) -> str:
+    """
+    Compute the key of a split from the content of the dataset, its seed and its fold,
+    and the feature columns and their type.
+
+    The function takes the following arguments:
+        dataset_digest (string): Digest of the content of the dataset
+        seed (int):              Seed of the split, None for the default seed
+        fold (string):           Cross-validation fold as i/K, None for a single split
+        columns (list):          The feature columns of the split, None for all columns but the target
+        dtype (string):          The type of the features, None for float64
+    """
+    digest = hashlib.sha256()
+    digest.update(dataset_digest.encode("utf-8"))
+    digest.update(f"seed={SPLIT_SEED if seed is None else seed}".encode("utf-8"))
+    digest.update(f"fold={fold}/test_size={TEST_SIZE}".encode("utf-8"))
+    if columns is not None:
+        digest.update(f"columns={json.dumps(list(columns))}".encode("utf-8"))
+    if dtype not in (None, "float64"):
+        digest.update(f"dtype={dtype}".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def is_split(path: str) -> bool:
+    """
+    Whether a path is a split materialised in the cache rather than a dataset.
+
+    The function takes the following arguments:
+        path (string): Path of the dataset or split
+    """
+    return os.path.isdir(path) and os.path.isfile(f"{path}/columns.json")
+
+
+def attach_split(path: str) -> tuple:
+    """
+    Attach to a split materialised in the cache without copying it. The arrays are memory-mapped
+    read-only, such that all processes evaluating the split share one copy in the page cache.
+    Returns the tuple (train_x, test_x, train_y, test_y) with the row labels of the dataset.
+
+    The function takes the following arguments:
+        path (string): Directory of the split
+    """
+    with open(f"{path}/columns.json", "r") as columns_file:
+        columns = json.load(columns_file)
+    arrays = {part: np.load(f"{path}/{part}.npy", mmap_mode="r") for part in PARTS}
+    return (
+        pd.DataFrame(arrays["train_x"], columns=columns, index=arrays["train_index"], copy=False),
+        pd.DataFrame(arrays["test_x"], columns=columns, index=arrays["test_index"], copy=False),
+        pd.Series(arrays["train_y"], index=arrays["train_index"], name=TARGET, copy=False),
+        pd.Series(arrays["test_y"], index=arrays["test_index"], name=TARGET, copy=False)
+    )
+
+
+class SplitCache:
+    """
+    Content-addressed cache of the splits of datasets into training and testing sets, stored as
+    one directory of .npy files per split. The orchestrator of a run reads and splits every dataset
+    once, and every method attaches to the split read-only, see attach_split, instead of parsing
+    and splitting the dataset itself. When the total size of the cache exceeds its limit,
+    the least recently used splits are evicted.
+
+    The function takes the following arguments:
+        cache_dir (string): Directory of the cache
+        max_size (int):     Maximum size of the cache in bytes
+    """
+    def __init__(self, cache_dir: str = SPLIT_DIR, max_size: int = MAX_SIZE):
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return f"{self.cache_dir}/{key}"
+
+    def entries(self) -> list:
+        return [path for path in glob.glob(f"{self.cache_dir}/*") if is_split(path)]
+
+    @staticmethod
+    def entry_size(path: str) -> int:
+        size = 0
+        for file in glob.glob(f"{path}/*"):
+            # The files of a split removed by another process sharing the cache are skipped
+            try:
+                size += os.path.getsize(file)
+            except FileNotFoundError:
+                continue
+        return size
+
+    def size(self) -> int:
+        return sum(self.entry_size(entry) for entry in self.entries())
+
+    def materialise(self, data_path: str, dataset_digest: str, splits: list, columns: list = None) -> dict:
+        """
+        Materialise the splits of a dataset that are not cached yet. The dataset is read at most once
+        for all of its splits, and a split is written to a temporary directory and renamed into place,
+        such that a split in the cache is always complete. The features of a split of type float32 are
+        downcast when the split is written. Returns a dictionary mapping every split to its directory.
+
+        The function takes the following arguments:
+            data_path (string):      Path of the dataset
+            dataset_digest (string): Digest of the content of the dataset
+            splits (list):           The splits of the dataset as (seed, fold, dtype), where a dtype of None is float64
+            columns (list):          The feature columns to read, None for all columns but the target
+        """
+        paths = {}
+        dataset = None
+        for seed, fold, dtype in splits:
+            path = self._path(split_key(dataset_digest, seed, fold, columns, dtype))
+            paths[(seed, fold, dtype)] = path
+            if is_split(path):
+                # Mark the split as recently used, unless another process evicted it meanwhile
+                try:
+                    os.utime(path)
+                    continue
+                except FileNotFoundError:
+                    pass
+            if dataset is None:
+                dataset = read_dataset(data_path, columns)
+            x, y = dataset
+            train_x, test_x, train_y, test_y = split_dataset(x, y, seed, fold)
+            tmp_path = tempfile.mkdtemp(prefix=".split-", dir=self.cache_dir)
+            try:
+                # The features are saved in Fortran order, such that every column is contiguous when mapped
+                np.save(f"{tmp_path}/train_x.npy", np.asfortranarray(train_x.to_numpy(dtype=dtype or np.float64)))
+                np.save(f"{tmp_path}/test_x.npy", np.asfortranarray(test_x.to_numpy(dtype=dtype or np.float64)))
+                np.save(f"{tmp_path}/train_y.npy", train_y.to_numpy(dtype=np.float64))
+                np.save(f"{tmp_path}/test_y.npy", test_y.to_numpy(dtype=np.float64))
+                np.save(f"{tmp_path}/train_index.npy", train_x.index.to_numpy())
+                np.save(f"{tmp_path}/test_index.npy", test_x.index.to_numpy())
+                with open(f"{tmp_path}/columns.json", "w") as columns_file:
+                    json.dump([str(column) for column in x.columns], columns_file)
+                os.rename(tmp_path, path)
+                logging.debug(f"Materialised the split of {data_path} with seed {seed} and fold {fold} in {path}")
+            except OSError:
+                # Another run materialised the same split first
+                if not is_split(path):
+                    raise
+            finally:
+                shutil.rmtree(tmp_path, ignore_errors=True)
+        return paths
+
+    def evict(self, keep=()) -> None:
+        """
+        Remove the least recently used splits until the cache is within its size limit.
+        The splits of the current run are kept, as its jobs attach to them.
+
+        The function takes the following arguments:
+            keep (container): The directories of the splits to keep
+        """
+        times = {}
+        for entry in self.entries():
+            # The splits removed by another process sharing the cache are skipped
+            try:
+                times[entry] = os.path.getmtime(entry)
+            except FileNotFoundError:
+                continue
+        entries = sorted(times, key=times.get)
+        sizes = {entry: self.entry_size(entry) for entry in entries}
+        size = sum(sizes.values())
+        for entry in entries:
+            if size <= self.max_size:
+                break
+            if entry in keep:
+                continue
+            size -= sizes[entry]
+            shutil.rmtree(entry, ignore_errors=True)
+            logging.debug(f"Evicted {entry} from the cache of splits")
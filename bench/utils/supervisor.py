@@ -0,0 +1,338 @@
+import os
+import time
+import signal
+import asyncio
+import logging
+import resource
+
+# Seconds between checks of the limits of a supervised process
+POLL_INTERVAL = 1.0
+
+# Seconds a process tree is given to exit after SIGTERM before it is killed
+GRACE_PERIOD = 5.0
+
+
+# Resource usage recorded for every job
+USAGE_KEYS = [
+    "user_time",
+    "system_time",
+    "peak_rss",
+    "voluntary_switches",
+    "involuntary_switches",
+    "read_bytes",
+    "write_bytes"
+]
+
+
+class LimitExceeded(RuntimeError):
+    """
+    Raised when a supervised process exceeded a limit and has been killed.
+    The status is either "timeout" or "oom", and the resource usage of the
+    process until it was killed is given if it is known.
+    """
+    def __init__(self, status: str, message: str, usage: dict = None):
+        super().__init__(message)
+        self.status = status
+        self.usage = usage if usage is not None else {}
+
+
+def _stat(pid: int) -> list:
+    """
+    Read the fields of /proc/<pid>/stat following the command name.
+    """
+    with open(f"/proc/{pid}/stat", "r") as stat_file:
+        return stat_file.read().rsplit(")", 1)[1].split()
+
+
+# Snapshot of the children of all processes shared by the processes being supervised
+_CHILDREN = {"time": None, "children": {}}
+
+
+def _children(max_age: float = 0.0) -> dict:
+    """
+    Map every process id to the ids of its children, reusing the previous snapshot
+    if it is younger than max_age seconds, such that supervising many processes
+    does not scan /proc once per process.
+    """
+    if _CHILDREN["time"] is not None and time.monotonic() - _CHILDREN["time"] <= max_age:
+        return _CHILDREN["children"]
+
+    children = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            parent = int(_stat(int(entry))[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(parent, []).append(int(entry))
+    _CHILDREN.update(time=time.monotonic(), children=children)
+    return children
+
+
+def process_tree(pid: int, max_age: float = 0.0) -> list:
+    """
+    Find a process and all of its descendants.
+
+    The function takes the following arguments:
+        pid (int): Process id of the root of the tree
+        max_age (float): Seconds a snapshot of the process table may be reused
+    """
+    children = _children(max_age)
+    tree = [pid]
+    for member in tree:
+        tree.extend(children.get(member, []))
+    return tree
+
+
+def alive(pid: int) -> bool:
+    """
+    Check whether a process is running, processes that exited but have not been reaped are not running.
+
+    The function takes the following arguments:
+        pid (int): Process id
+    """
+    try:
+        return _stat(pid)[0] != "Z"
+    except (OSError, IndexError):
+        return False
+
+
+def tree_rss(pid: int, max_age: float = 0.0) -> int:
+    """
+    Sum the resident set size in bytes of a process and all of its descendants.
+
+    The function takes the following arguments:
+        pid (int): Process id of the root of the tree
+        max_age (float): Seconds a snapshot of the process table may be reused
+    """
+    rss = 0
+    for member in process_tree(pid, max_age):
+        try:
+            with open(f"/proc/{member}/statm", "r") as statm_file:
+                rss += int(statm_file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        except (OSError, IndexError, ValueError):
+            continue
+    return rss
+
+
+def kill_tree(pid: int, grace: float = GRACE_PERIOD) -> None:
+    """
+    Terminate a process started in its own session together with all of its descendants.
+    The processes are sent SIGTERM and are killed with SIGKILL if they have not exited
+    within the grace period.
+
+    The function takes the following arguments:
+        pid (int): Process id of the root of the tree, which is also its process group id
+        grace (float): Seconds to wait for the processes to exit after SIGTERM
+    """
+    members = process_tree(pid)
+    for sig in [signal.SIGTERM, signal.SIGKILL]:
+        try:
+            os.killpg(pid, sig)
+        except (ProcessLookupError, PermissionError):
+            pass
+        for member in members:
+            try:
+                os.kill(member, sig)
+            except (ProcessLookupError, PermissionError):
+                pass
+
+        deadline = time.monotonic() + grace
+        while any(alive(member) for member in members) and time.monotonic() < deadline:
+            time.sleep(0.1)
+        if not any(alive(member) for member in members):
+            return
+
+
+def check_limits(pid: int, start_time: float, time_limit: float = None, memory_limit: float = None,
+                 max_age: float = 0.0):
+    """
+    Check a process tree against its limits and return the exceeded limit as
+    "timeout" or "oom", or None if the process is within its limits.
+
+    The function takes the following arguments:
+        pid (int): Process id of the root of the tree
+        start_time (float): Start time of the job from time.monotonic()
+        time_limit (float): Wall-clock limit in seconds, None for no limit
+        memory_limit (float): Resident memory limit of the tree in GB, None for no limit
+        max_age (float): Seconds a snapshot of the process table may be reused
+    """
+    if time_limit is not None and time.monotonic() - start_time > time_limit:
+        logging.warning(f"Process {pid} exceeded the time limit of {time_limit} seconds")
+        return "timeout"
+    if memory_limit is not None and tree_rss(pid, max_age) > memory_limit * 1024 ** 3:
+        logging.warning(f"Process {pid} exceeded the memory limit of {memory_limit} GB")
+        return "oom"
+    return None
+
+
+def io_counters(pid="self") -> dict:
+    """
+    Read the bytes passed through read and write system calls by a process and
+    its reaped child processes from /proc/<pid>/io. The counters are zero if they are unavailable.
+
+    The function takes the following arguments:
+        pid (int): Process id, default is this process
+    """
+    counters = {"read_bytes": 0, "write_bytes": 0}
+    try:
+        with open(f"/proc/{pid}/io", "r") as io_file:
+            for line in io_file:
+                key, value = line.split(":")
+                if key == "rchar":
+                    counters["read_bytes"] = int(value)
+                elif key == "wchar":
+                    counters["write_bytes"] = int(value)
+    except (OSError, ValueError):
+        pass
+    return counters
+
+
+def self_usage() -> dict:
+    """
+    Read the cumulative CPU time in seconds, context switches and I/O bytes
+    of this process and its reaped child processes.
+    """
+    usage = {key: 0 for key in USAGE_KEYS if key != "peak_rss"}
+    for who in [resource.RUSAGE_SELF, resource.RUSAGE_CHILDREN]:
+        rusage = resource.getrusage(who)
+        usage["user_time"] += rusage.ru_utime
+        usage["system_time"] += rusage.ru_stime
+        usage["voluntary_switches"] += rusage.ru_nvcsw
+        usage["involuntary_switches"] += rusage.ru_nivcsw
+    usage.update(io_counters())
+    return usage
+
+
+def usage_delta(before: dict, after: dict) -> dict:
+    """
+    Compute the resource usage between two readings of self_usage.
+
+    The function takes the following arguments:
+        before (dict): Reading at the start of the job
+        after (dict):  Reading at the end of the job
+    """
+    return {key: after[key] - before[key] for key in before}
+
+
+def reset_peak_rss() -> None:
+    """
+    Reset the peak resident set size of this process, such that the peak of the next job
+    can be measured in a long-lived process. Requires Linux 4.0 or later.
+    """
+    try:
+        with open("/proc/self/clear_refs", "w") as clear_refs_file:
+            clear_refs_file.write("5")
+    except OSError:
+        logging.debug("Unable to reset the peak resident set size")
+
+
+def peak_rss() -> float:
+    """
+    Read the peak resident set size in MB of this process since it started or since reset_peak_rss.
+    """
+    try:
+        with open("/proc/self/status", "r") as status_file:
+            for line in status_file:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+async def _wait_exit(pid: int, timeout: float) -> None:
+    """
+    Wait until a child process has exited or the timeout has passed, without reaping it.
+    A pidfd becomes readable when the process exits, such that the exit is noticed immediately.
+    """
+    if not hasattr(os, "pidfd_open"):
+        await asyncio.sleep(min(timeout, 0.05))
+        return
+
+    loop = asyncio.get_running_loop()
+    exited = loop.create_future()
+    pidfd = os.pidfd_open(pid)
+    loop.add_reader(pidfd, lambda: exited.done() or exited.set_result(None))
+    try:
+        await asyncio.wait_for(exited, timeout)
+    except asyncio.TimeoutError:
+        pass
+    finally:
+        loop.remove_reader(pidfd)
+        os.close(pidfd)
+
+
+def _kill_and_reap(process) -> None:
+    """
+    Kill the process tree of a supervised process and reap the process, such that it is not left as a zombie.
+    """
+    kill_tree(process.pid)
+    try:
+        _, wait_status = os.waitpid(process.pid, 0)
+        process.returncode = os.waitstatus_to_exitcode(wait_status)
+    except ChildProcessError:
+        pass
+
+
+async def supervise(process, time_limit: float = None, memory_limit: float = None, on_exit=None) -> dict:
+    """
+    Wait for a process started in its own session while enforcing its limits, and return
+    its resource usage. The process is reaped with wait4, such that its CPU time and context
+    switches include all of its descendants, and the peak resident set size is the larger of the
+    peak of the largest process and the sampled total of the process tree. The I/O is read from
+    the exited process before it is reaped, which also includes its reaped descendants. If a limit is exceeded
+    or the wait is cancelled, the process tree is killed, and a LimitExceeded error carrying the usage
+    is raised if a limit was exceeded. The process must be a child of this process and is reaped by this function.
+    Many processes can be supervised concurrently in one event loop.
+
+    The function takes the following arguments:
+        process (Popen):      The process to supervise
+        time_limit (float):   Wall-clock limit in seconds, None for no limit
+        memory_limit (float): Resident memory limit of the process tree in GB, None for no limit
+        on_exit (coroutine function): Awaited when the process has exited and has been reaped,
+                                      e.g. to finish forwarding the output of the process
+    """
+    loop = asyncio.get_running_loop()
+    start_time = time.monotonic()
+    sampled_rss = 0
+    status = None
+
+    try:
+        while True:
+            # Check for the exit without reaping the process, such that its I/O can still be read
+            if os.waitid(os.P_PID, process.pid, os.WEXITED | os.WNOHANG | os.WNOWAIT) is not None:
+                io = io_counters(process.pid)
+                _, wait_status, rusage = os.wait4(process.pid, 0)
+                break
+            if status is None:
+                sampled_rss = max(sampled_rss, tree_rss(process.pid, POLL_INTERVAL / 2))
+                status = check_limits(process.pid, start_time, time_limit, memory_limit, POLL_INTERVAL / 2)
+                if status is not None:
+                    await loop.run_in_executor(None, kill_tree, process.pid)
+                    continue
+            await _wait_exit(process.pid, POLL_INTERVAL)
+    except BaseException:
+        # Do not leave the process running if the wait is interrupted or cancelled. The kill waits for
+        # the grace period, so it runs in a thread, and is shielded such that a second cancellation cannot skip it
+        await asyncio.shield(loop.run_in_executor(None, _kill_and_reap, process))
+        raise
+    process.returncode = os.waitstatus_to_exitcode(wait_status)
+    if on_exit is not None:
+        await on_exit()
+
+    usage = {
+        "user_time": rusage.ru_utime,
+        "system_time": rusage.ru_stime,
+        "peak_rss": max(rusage.ru_maxrss * 1024, sampled_rss) / 1024 ** 2,
+        "voluntary_switches": rusage.ru_nvcsw,
+        "involuntary_switches": rusage.ru_nivcsw,
+        "read_bytes": io["read_bytes"],
+        "write_bytes": io["write_bytes"]
+    }
+    if status is not None:
+        raise LimitExceeded(
+            status, f"Process {process.pid} exceeded its {'time' if status == 'timeout' else 'memory'} limit", usage
+        )
+    return usage
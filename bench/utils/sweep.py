@@ -0,0 +1,149 @@
+import math
+import json
+import random
+import hashlib
+import itertools
+from .budget import dotted_params
+from .method_evaluator import merge_params
+
+# Searches of a search space
+SEARCHES = ["grid", "random", "sobol"]
+
+# Number of configurations sampled by a random or Sobol search without a number of samples
+SAMPLES = 16
+
+# Factor by which successive halving reduces the configurations and increases the resource of every rung
+ETA = 3
+
+
+def config_id(config: dict) -> str:
+    """
+    Identify a configuration of the parameters of a method by the digest of its content,
+    such that identical configurations have the same identifier.
+
+    The function takes the following arguments:
+        config (dict): The parameters of the configuration
+    """
+    return hashlib.sha256(json.dumps(config, sort_keys=True).encode("utf-8")).hexdigest()[:8]
+
+
+def build_config(values: dict) -> dict:
+    """
+    Build the parameters of a configuration from values of parameters given by their names,
+    where a dotted name sets a parameter of a nested configuration, e.g. "training.batch_size".
+
+    The function takes the following arguments:
+        values (dict): A dictionary mapping the name of every parameter to its value
+    """
+    config = {}
+    for param, value in values.items():
+        config = merge_params(config, dotted_params(param, value))
+    return config
+
+
+def param_value(domain, position: float):
+    """
+    Map a position between 0 and 1 to a value of the domain of a parameter. A domain is either a list
+    of choices or a range {"low": ..., "high": ...}, which is sampled on a logarithmic scale if "log" is
+    true and rounded to an integer if "integer" is true.
+
+    The function takes the following arguments:
+        domain (list or dict): The domain of the parameter
+        position (float): The position between 0 and 1
+    """
+    if isinstance(domain, list):
+        return domain[min(int(position * len(domain)), len(domain) - 1)]
+    low, high = domain["low"], domain["high"]
+    if domain.get("log", False):
+        value = math.exp(math.log(low) + position * (math.log(high) - math.log(low)))
+    else:
+        value = low + position * (high - low)
+    if domain.get("integer", False):
+        return int(min(max(round(value), low), high))
+    return value
+
+
+def sample_configs(space: dict, seed: int = 0) -> list:
+    """
+    Sample the configurations of a search space of a method. The space declares the domain of every
+    parameter under the key "params", see param_value, and the search under the key "search":
+    "grid" for every combination of the choices of the parameters, "random" for independent uniform
+    samples, or "sobol" for a scrambled Sobol sequence covering the space more evenly than random samples.
+    The number of samples of a random or Sobol search is given under the key "samples". Duplicate
+    configurations are only returned once. Returns the configurations as parameter dictionaries.
+
+    The function takes the following arguments:
+        space (dict): The search space of the method
+        seed (int): The seed of a random or Sobol search
+    """
+    search = space.get("search", "grid")
+    if search not in SEARCHES:
+        raise ValueError(f"Invalid search {search}. Valid searches are {', '.join(SEARCHES)}.")
+    domains = space.get("params", {})
+    names = sorted(domains)
+    samples = space.get("samples", SAMPLES)
+
+    if search == "grid":
+        for name in names:
+            if not isinstance(domains[name], list):
+                raise ValueError(f"The grid search needs a list of choices for the parameter {name}.")
+        points = [dict(zip(names, values)) for values in itertools.product(*(domains[name] for name in names))]
+    elif search == "random":
+        generator = random.Random(seed)
+        points = [{name: param_value(domains[name], generator.random()) for name in names} for _ in range(samples)]
+    else:
+        # Imported here, as only Sobol searches need scipy
+        from scipy.stats import qmc
+        sequence = qmc.Sobol(len(names), scramble=True, seed=seed).random(samples) if names else [[]] * samples
+        points = [{name: param_value(domains[name], float(position)) for name, position in zip(names, point)}
+                  for point in sequence]
+
+    configs = {}
+    for point in points:
+        config = build_config(point)
+        configs.setdefault(config_id(config), config)
+    return list(configs.values())
+
+
+def halving_rungs(minimum: float, maximum: float, eta: float = ETA) -> list:
+    """
+    Resources of the rungs of successive halving, increasing by a factor eta from the minimum up to
+    the maximum, which is the resource of the last rung. The resources are integers if both bounds are.
+
+    The function takes the following arguments:
+        minimum (float): The resource of the first rung
+        maximum (float): The resource of the last rung
+        eta (float): The factor between the resources of consecutive rungs
+    """
+    if not 0 < minimum <= maximum or eta <= 1:
+        raise ValueError("Successive halving needs 0 < min <= max and eta > 1.")
+    count = int(math.floor(math.log(maximum / minimum, eta) + 1e-9)) + 1
+    rungs = [maximum * eta ** (rung - count + 1) for rung in range(count)]
+    if isinstance(minimum, int) and isinstance(maximum, int):
+        rungs = [max(int(round(resource)), 1) for resource in rungs]
+    return rungs
+
+
+def rank_configs(scores: dict) -> list:
+    """
+    Rank configurations by their mean rank across datasets, where the configurations are ranked by
+    their MSE on every dataset and a configuration without an MSE on a dataset, e.g. because it
+    failed or timed out, ranks last on it. Ranking per dataset rather than averaging the MSE keeps
+    a dataset with a large MSE from deciding the ranking alone. Returns the pairs of configuration
+    identifier and mean rank, best first.
+
+    The function takes the following arguments:
+        scores (dict): A dictionary mapping the identifier of every configuration to a dictionary
+                       mapping the label of every dataset to the MSE of the configuration or None
+    """
+    datasets = sorted({dataset for results in scores.values() for dataset in results})
+    ranks = {config: 0.0 for config in scores}
+    for dataset in datasets:
+        def error(config):
+            mse = scores[config].get(dataset)
+            return math.inf if mse is None or math.isnan(mse) else mse
+
+        for rank, config in enumerate(sorted(scores, key=lambda config: (error(config), config))):
+            ranks[config] += rank + 1
+    return sorted(((config, rank / max(len(datasets), 1)) for config, rank in ranks.items()),
+                  key=lambda item: (item[1], item[0]))
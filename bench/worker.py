@@ -0,0 +1,160 @@
+import os
+import sys
+import asyncio
+import logging
+import click
+
+# Local imports
+sys.path.append(os.path.join(os.path.dirname(__file__), ''))
+from utils.run_benchmark import run_benchmark_async
+from utils.scheduler import machine_capacity
+from utils.result_cache import ResultCache
+from utils.result_sink import ResultSink
+from utils.job_queue import JobQueue, drain, LEASE_TIME, POLL_INTERVAL
+from utils.runtime_history import RuntimeHistory
+from utils.repeats import write_summary
+from evaluate_dataset import COLUMNS, finish_job
+
+# Set log level
+logging.basicConfig(level=logging.INFO)
+
+
+async def run_job(job: dict, cores: int = None) -> tuple:
+    """
+    Run a job of the queue and return its status and row of the result table.
+    Successful results are cached if the job was enqueued with caching enabled,
+    and the wall time of the job is recorded in the runtime history.
+
+    The function takes the following arguments:
+        job (dict): The job as planned by evaluate_dataset
+        cores (int): The number of cores granted to the job
+    """
+    method_result = await run_benchmark_async(**job["args"], cores=cores)
+    result_cache = None
+    if job.get("key") is not None:
+        result_cache = ResultCache(max_size=int(job.get("cache_size", 1) * 1024 ** 3))
+    history = RuntimeHistory()
+    try:
+        row = finish_job(method_result, job, result_cache, history)
+    finally:
+        history.close()
+    return method_result["status"], row
+
+
+def run_worker(queue: str, cores: int = None, memory: float = None, lease_time: float = LEASE_TIME,
+               wait: bool = False, poll_interval: float = POLL_INTERVAL) -> int:
+    """
+    Run jobs from a shared job queue within the capacity of this node until the queue is drained.
+    Any number of workers can drain the same queue, on this node or on other nodes sharing the filesystem.
+    Returns the number of jobs run by the worker.
+
+    The function takes the following arguments:
+        queue (string): Path of the queue database
+        cores (int): The number of cores available, default is all
+        memory (float): The memory in GB available, default is all
+        lease_time (float): Seconds a claimed job is leased to this worker between heartbeats
+        wait (bool): Whether to keep waiting for new jobs when the queue is drained
+        poll_interval (float): Seconds between polls for new jobs
+    """
+    capacity = machine_capacity(cores, memory)
+    job_queue = JobQueue(queue, lease_time)
+    try:
+        return asyncio.run(drain(job_queue, run_job, capacity, wait=wait, poll_interval=poll_interval))
+    finally:
+        job_queue.close()
+
+
+def export_results(queue: str, path: str, stdout: bool = False) -> int:
+    """
+    Write the rows of the result table of the completed jobs of a queue to a result file.
+    The format is JSON lines if the path ends with .jsonl and csv otherwise.
+    If the queue holds repeated runs or cross-validation folds, the runs are also summarized in a summary
+    table next to the result file, named like it with the suffix -summary.
+    Returns the number of rows written.
+
+    The function takes the following arguments:
+        queue (string): Path of the queue database
+        path (string): Path of the result file
+        stdout (bool): Whether to also echo each row to stdout as a JSON line
+    """
+    job_queue = JobQueue(queue)
+    sink = ResultSink(path, COLUMNS, stdout)
+    try:
+        rows = list(job_queue.rows())
+        for row in rows:
+            sink.write(row)
+        logging.info(f"Saved {sink.rows} results to {path}, the queue holds {job_queue.counts()} jobs by state")
+        if any(row.get("seed") is not None or row.get("fold") is not None for row in rows):
+            root, extension = os.path.splitext(path)
+            write_summary(rows, f"{root}-summary{extension}")
+            logging.info(f"Saved the summary of the repeated runs and folds to {root}-summary{extension}")
+    finally:
+        sink.close()
+        job_queue.close()
+    return sink.rows
+
+
+@click.command()
+@click.option(
+    "--queue",
+    required=True,
+    help="Path of the shared job queue database to run jobs from."
+)
+@click.option(
+    "--cores",
+    type=int,
+    default=None,
+    help="Number of cores available for the jobs of this worker. Default is all cores."
+)
+@click.option(
+    "--memory",
+    type=float,
+    default=None,
+    help="Memory in GB available for the jobs of this worker. Default is all physical memory."
+)
+@click.option(
+    "--lease_time",
+    type=float,
+    default=LEASE_TIME,
+    help="Seconds a claimed job is leased to this worker. The lease is renewed every third of the lease time, "
+         "and a job whose lease expired is run again by another worker."
+)
+@click.option(
+    "--wait",
+    type=bool,
+    default=False,
+    help="If true, keep waiting for new jobs when the queue is drained."
+)
+@click.option(
+    "--export",
+    default=None,
+    help="Instead of running jobs, write the results of the completed jobs of the queue to this .csv or .jsonl file."
+)
+def main(queue: str, export: str = None, **options) -> None:
+    """
+    CLI entry point for running a worker of a shared job queue.
+
+    The function takes the following arguments:
+        queue (string): Path of the queue database
+        export (string): Path of a result file to export the results of the queue to
+        options: Options of the worker such as cores, memory, lease_time and wait
+    """
+    if export is not None:
+        export_results(queue, export)
+    else:
+        run_worker(queue, **options)
+
+
+if __name__ == "__main__":
+    """
+    This function runs a worker draining a shared job queue filled by evaluate_dataset.py --queue.
+
+    The function takes the following arguments:
+        queue (string): Path of the queue database
+        cores (int): The number of cores available
+        memory (float): The memory in GB available
+        lease_time (float): Seconds a claimed job is leased to this worker
+        wait (bool): Whether to keep waiting for new jobs
+        export (string): Path of a result file to export the results of the queue to
+    """
+    main()
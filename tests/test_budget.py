@@ -0,0 +1,62 @@
+import os
+import sys
+import glob
+import json
+from unittest import TestCase
+
+# Method to test
+sys.path.append(os.path.join(os.path.dirname(__file__),'../'))
+from bench.utils.budget import split_budget, native_params, cores_params, predicted_makespan, NATIVE_FRACTION
+
+METHODS_DIR = os.path.join(os.path.dirname(__file__), '../bench/methods')
+
+
+class TestBudget(TestCase):
+
+    def setUp(self) -> None:
+        self.capacity = {"cores": 2, "memory": 10}
+        self.budgets = [{"cores": 1, "memory": 0}] * 4
+
+    def test_predicted_makespan(self):
+        self.assertEqual(predicted_makespan([1, 10, 2, 3], self.budgets, self.capacity), 10)
+
+    def test_budget_not_binding(self):
+        self.assertIsNone(split_budget(100, [1, 10, 2, 3], self.budgets, self.capacity))
+        self.assertIsNone(split_budget(10 * 3600, [3 * 3600, 3600], self.budgets[:2], self.capacity))
+
+    def test_budget_shortens_long_jobs_only(self):
+        expected = [100, 100, 1, 1]
+        share = split_budget(50, expected, self.budgets, self.capacity)
+        self.assertAlmostEqual(share, 49, places=3)
+        self.assertLessEqual(predicted_makespan([min(time, share) for time in expected], self.budgets,
+                                                self.capacity), 50)
+
+    def test_invalid_budget(self):
+        with self.assertRaises(ValueError):
+            split_budget(0, [1], self.budgets[:1], self.capacity)
+
+    def test_native_params(self):
+        self.assertEqual(native_params({"time_limit_param": "t"}, 100), {"t": int(100 * NATIVE_FRACTION)})
+        self.assertEqual(native_params({"time_limit_param": "training.time_limit"}, 100),
+                         {"training": {"time_limit": int(100 * NATIVE_FRACTION)}})
+        self.assertEqual(native_params({}, 100), {})
+
+    def test_cores_params(self):
+        self.assertEqual(cores_params({"cores_param": "n_threads"}, 8), {"n_threads": 8})
+        self.assertEqual(cores_params({"cores_param": "training.n_cores_batch"}, 8),
+                         {"training": {"n_cores_batch": 8}})
+        self.assertEqual(cores_params({"cores_param": "n_threads"}, None), {})
+        self.assertEqual(cores_params({}, 8), {})
+
+    def test_declared_params(self):
+        # A parameter passed to the estimator as a keyword must be a parameter of its procedure,
+        # while a dotted parameter may set a key of the default configuration of the method
+        for config_path in glob.glob(f"{METHODS_DIR}/*/config.json"):
+            with open(config_path, "r") as config_file:
+                resources = json.load(config_file)["resources"]
+            with open(f"{os.path.dirname(config_path)}/procedure.py", "r") as procedure_file:
+                procedure = procedure_file.read()
+            for key in ["time_limit_param", "cores_param"]:
+                param = resources.get(key)
+                if param is not None and "." not in param:
+                    self.assertTrue(f'"{param}"' in procedure or f"'{param}'" in procedure, f"{config_path}: {key}")
@@ -0,0 +1,190 @@
+import os
+import sys
+import gzip
+import lzma
+import shutil
+import pathlib
+import logging
+import tempfile
+import importlib.util
+import numpy as np
+import pandas as pd
+from unittest import TestCase, skipUnless
+from unittest.mock import patch
+
+# Method to test
+sys.path.append(os.path.join(os.path.dirname(__file__),'../'))
+from bench.utils.dataset_reader import dataset_format, dataset_stem, read_dataset, read_shape, decode_dataset
+from bench.utils.dataset_reader import evict_decoded
+
+logging.basicConfig(level=logging.CRITICAL)
+PATH = pathlib.Path(__file__).parent.resolve()
+PYARROW = importlib.util.find_spec("pyarrow") is not None
+ZSTANDARD = importlib.util.find_spec("zstandard") is not None
+
+
+class TestDatasetReader(TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.mkdtemp()
+        self.frame = pd.read_csv(f"{PATH}/utils/test_dataset.csv")
+        self.features = [name for name in self.frame.columns if name != "target"]
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.directory)
+
+    def assert_dataset(self, path):
+        x, y = read_dataset(path)
+        self.assertEqual(x.shape, (len(self.frame), len(self.features)))
+        np.testing.assert_allclose(x.to_numpy(), self.frame[self.features].to_numpy(dtype=np.float64))
+        np.testing.assert_allclose(y.to_numpy(), self.frame["target"].to_numpy(dtype=np.float64))
+        self.assertEqual(set(x.dtypes), {np.dtype(np.float64)})
+        self.assertTrue(x.to_numpy().flags.f_contiguous)
+        self.assertTrue(y.to_numpy().flags.c_contiguous)
+        self.assertEqual(read_shape(path) if not path.endswith(".csv") else x.shape,
+                         (len(self.frame), len(self.features)))
+        return x, y
+
+    def test_dataset_format(self):
+        self.assertEqual(dataset_format("/data/a.CSV"), "csv")
+        self.assertEqual(dataset_format("/data/a.pq"), "parquet")
+        self.assertEqual(dataset_format("/data/a.feather"), "arrow")
+        self.assertEqual(dataset_format("/data/a.tsv"), "tsv")
+        self.assertEqual(dataset_format("/data/a.tsv.gz"), "tsv")
+        self.assertEqual(dataset_format("/data/a.csv.XZ"), "csv")
+        with self.assertRaises(TypeError):
+            dataset_format("/data/a.json")
+        with self.assertRaises(TypeError):
+            dataset_format("/data/a.npy.gz")
+
+    def test_dataset_stem(self):
+        self.assertEqual(dataset_stem("/data/192_vineyard.tsv.gz"), "192_vineyard")
+        self.assertEqual(dataset_stem("/data/a.b.csv"), "a.b")
+
+    def test_csv(self):
+        x, _ = self.assert_dataset(f"{PATH}/utils/test_dataset.csv")
+        self.assertEqual(list(x.columns), self.features)
+
+    @patch("bench.utils.dataset_reader.CHUNK_ROWS", 2)
+    def test_csv_in_chunks(self):
+        path = f"{self.directory}/data.csv"
+        with open(f"{PATH}/utils/test_dataset.csv", "r") as source, open(path, "w") as data_file:
+            data_file.write(source.read() + "\n\n")
+        self.assert_dataset(path)
+
+    def test_compressed_text(self):
+        for separator, extension in [(",", "csv"), ("\t", "tsv")]:
+            text = self.frame.to_csv(sep=separator, index=False).encode("utf-8")
+            for compression, opener in [("gz", gzip.open), ("xz", lzma.open)]:
+                path = f"{self.directory}/data.{extension}.{compression}"
+                with opener(path, "wb") as data_file:
+                    data_file.write(text)
+                x, _ = self.assert_dataset(path)
+                self.assertEqual(list(x.columns), self.features)
+
+    @skipUnless(ZSTANDARD, "zstandard is not installed")
+    def test_zstandard(self):
+        import zstandard
+        path = f"{self.directory}/data.tsv.zst"
+        with open(path, "wb") as data_file:
+            data_file.write(zstandard.ZstdCompressor().compress(self.frame.to_csv(sep="\t", index=False).encode()))
+        self.assert_dataset(path)
+
+    def test_target_column(self):
+        path = f"{self.directory}/data.tsv"
+        self.frame.rename(columns={"target": "y"}).to_csv(path, sep="\t", index=False)
+        x, y = read_dataset(path, target="y")
+        self.assertEqual(list(x.columns), self.features)
+        self.assertEqual(y.name, "target")
+        np.testing.assert_allclose(y.to_numpy(), self.frame["target"].to_numpy(dtype=np.float64))
+        with self.assertRaises(ValueError):
+            read_dataset(path)
+
+    def test_decode_dataset(self):
+        path = f"{self.directory}/data.tsv.gz"
+        with gzip.open(path, "wt") as data_file:
+            data_file.write(self.frame.rename(columns={"target": "y"}).to_csv(sep="\t", index=False))
+        decoded_path = decode_dataset(path, "digest", f"{self.directory}/decoded", "y")
+        self.assertTrue(decoded_path.endswith(".npy"))
+        x, _ = self.assert_dataset(decoded_path)
+        self.assertEqual(list(x.columns), self.features)
+        self.assertEqual(os.listdir(f"{self.directory}/decoded"), [os.path.basename(decoded_path)])
+
+        # The decoded dataset is not decoded again
+        with patch("bench.utils.dataset_reader.read_dataset", side_effect=AssertionError):
+            self.assertEqual(decode_dataset(path, "digest", f"{self.directory}/decoded", "y"), decoded_path)
+        self.assertNotEqual(decode_dataset(path, "other", f"{self.directory}/decoded", "y"), decoded_path)
+
+    def test_target_clash(self):
+        path = f"{self.directory}/data.csv"
+        self.frame.assign(y=self.frame["target"]).to_csv(path, index=False)
+        with self.assertRaises(ValueError):
+            decode_dataset(path, "digest", f"{self.directory}/decoded", "y")
+
+        # The features can still be selected without the clashing column
+        x, _ = read_dataset(path, self.features, target="y")
+        self.assertEqual(list(x.columns), self.features)
+
+    def test_evict_decoded(self):
+        path = f"{self.directory}/data.tsv.gz"
+        with gzip.open(path, "wt") as data_file:
+            data_file.write(self.frame.to_csv(sep="\t", index=False))
+        decoded_paths = [decode_dataset(path, digest, f"{self.directory}/decoded") for digest in ["a", "b", "c"]]
+        for age, decoded_path in enumerate(decoded_paths):
+            os.utime(decoded_path, (1000 + age, 1000 + age))
+        size = os.path.getsize(decoded_paths[0])
+
+        # The least recently used decoded datasets are removed first, unless they are kept
+        evict_decoded(f"{self.directory}/decoded", 2 * size, keep={decoded_paths[0]})
+        self.assertEqual([os.path.exists(decoded_path) for decoded_path in decoded_paths], [True, False, True])
+        evict_decoded(f"{self.directory}/decoded", 0)
+        self.assertEqual(os.listdir(f"{self.directory}/decoded"), [])
+        evict_decoded(f"{self.directory}/missing", 0)
+
+    def test_columns_and_dtype(self):
+        for path in [f"{PATH}/utils/test_dataset.csv", f"{self.directory}/data.npz"]:
+            np.savez(f"{self.directory}/data.npz", **{name: self.frame[name].to_numpy() for name in self.frame.columns})
+            x, y = read_dataset(path, ["z"], "float32")
+            self.assertEqual(list(x.columns), ["z"])
+            self.assertEqual(x["z"].dtype, np.float32)
+            self.assertEqual(y.dtype, np.float64)
+            np.testing.assert_allclose(x["z"].to_numpy(), self.frame["z"].to_numpy(), rtol=1e-6)
+            with self.assertRaises(ValueError):
+                read_dataset(path, ["missing"])
+            with self.assertRaises(ValueError):
+                read_dataset(path, dtype="int8")
+
+    def test_npy_structured(self):
+        path = f"{self.directory}/data.npy"
+        np.save(path, self.frame.to_records(index=False))
+        x, _ = self.assert_dataset(path)
+        self.assertEqual(list(x.columns), self.features)
+
+    def test_npy_matrix(self):
+        path = f"{self.directory}/data.npy"
+        np.save(path, self.frame[self.features + ["target"]].to_numpy(dtype=np.float32))
+        x, _ = self.assert_dataset(path)
+        self.assertEqual(list(x.columns), [f"x{index}" for index in range(len(self.features))])
+
+    def test_npz_columns(self):
+        path = f"{self.directory}/data.npz"
+        np.savez(path, **{name: self.frame[name].to_numpy() for name in self.frame.columns})
+        self.assert_dataset(path)
+
+    def test_npz_features_and_target(self):
+        path = f"{self.directory}/data.npz"
+        np.savez_compressed(path, X=self.frame[self.features].to_numpy(), y=self.frame["target"].to_numpy())
+        self.assert_dataset(path)
+
+    def test_missing_target(self):
+        path = f"{self.directory}/data.npz"
+        np.savez(path, a=np.zeros(3), b=np.zeros(3))
+        with self.assertRaises(ValueError):
+            read_dataset(path)
+
+    @skipUnless(PYARROW, "pyarrow is not installed")
+    def test_parquet_and_arrow(self):
+        self.frame.to_parquet(f"{self.directory}/data.parquet")
+        self.frame.to_feather(f"{self.directory}/data.feather")
+        self.assert_dataset(f"{self.directory}/data.parquet")
+        self.assert_dataset(f"{self.directory}/data.feather")
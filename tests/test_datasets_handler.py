@@ -0,0 +1,69 @@
+import os
+import sys
+import gzip
+import shutil
+import pathlib
+import logging
+import tempfile
+from unittest import TestCase
+
+# Method to test
+sys.path.append(os.path.join(os.path.dirname(__file__),'../'))
+from bench.utils.datasets_handler import datasets_handler
+
+logging.basicConfig(level=logging.CRITICAL)
+PATH = pathlib.Path(__file__).parent.resolve()
+
+
+class TestDatasetsHandler(TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.mkdtemp()
+        os.makedirs(f"{self.directory}/nested")
+        shutil.copy(f"{PATH}/utils/test_dataset.csv", f"{self.directory}/a.csv")
+        shutil.copy(f"{PATH}/utils/test_dataset.csv", f"{self.directory}/nested/b.csv")
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.directory)
+
+    def test_directory(self):
+        result = datasets_handler(self.directory)
+        self.assertEqual(list(result.keys()), ["a.csv", "nested/b.csv"])
+        self.assertEqual(result["a.csv"], f"{self.directory}/a.csv")
+
+    def test_compressed(self):
+        with open(f"{PATH}/utils/test_dataset.csv", "rb") as source:
+            with gzip.open(f"{self.directory}/c.csv.gz", "wb") as data_file:
+                data_file.write(source.read())
+        result = datasets_handler(self.directory)
+        self.assertEqual(list(result.keys()), ["a.csv", "c.csv.gz", "nested/b.csv"])
+
+    def test_manifest(self):
+        manifest = f"{self.directory}/manifest.txt"
+        with open(manifest, "w") as manifest_file:
+            manifest_file.write(f"# Datasets\n\nnested/b.csv\n{PATH}/utils/test_dataset.csv\n")
+        result = datasets_handler(manifest)
+        self.assertEqual(result["nested/b.csv"], f"{self.directory}/nested/b.csv")
+        self.assertEqual(len(result), 2)
+
+    def test_manifest_missing_dataset(self):
+        manifest = f"{self.directory}/manifest.txt"
+        with open(manifest, "w") as manifest_file:
+            manifest_file.write("missing.csv\n")
+        with self.assertRaises(FileNotFoundError):
+            datasets_handler(manifest)
+
+    def test_manifest_wrong_type(self):
+        manifest = f"{self.directory}/manifest.txt"
+        with open(manifest, "w") as manifest_file:
+            manifest_file.write("data.json\n")
+        with self.assertRaises(TypeError):
+            datasets_handler(manifest)
+
+    def test_empty_directory(self):
+        with self.assertRaises(ValueError):
+            datasets_handler(tempfile.mkdtemp(dir=self.directory))
+
+    def test_missing_path(self):
+        with self.assertRaises(FileNotFoundError):
+            datasets_handler(f"{self.directory}/does_not_exist")
@@ -0,0 +1,229 @@
+import os
+import sys
+import glob
+import logging
+import pandas as pd
+from unittest import TestCase
+from unittest.mock import patch
+
+# Method to test
+sys.path.append(os.path.join(os.path.dirname(__file__), '../'))
+import bench.evaluate_dataset as evaluate_dataset
+from bench.evaluate_dataset import COLUMNS, result_row, finish_job, plan_jobs
+from bench.utils.run_benchmark import FAILED_EQUATION
+from bench.utils.result_sink import read_rows
+from bench.utils.repeats import repeat_seeds
+from tests.utils.helper_functions import isolate_bench, write_dataset
+
+logging.basicConfig(level=logging.CRITICAL)
+
+
+class TestResultRows(TestCase):
+
+    def setUp(self) -> None:
+        self.spec = {"seed": None, "fold": None, "config": None, "sample": None}
+
+    def test_result_row(self):
+        row = result_row({"method": "Template", "mse": 1.5, "equation": "x0", "phases": {"load": 0.5}},
+                         dataset="test.csv", method="template")
+        self.assertEqual(row["method"], "template")
+        self.assertEqual(row["method_name"], "Template")
+        self.assertEqual(row["phase_load"], 0.5)
+        self.assertNotIn("phases", row)
+        self.assertTrue(set(row) <= set(COLUMNS))
+
+    def test_finish_ok(self):
+        method_result = {"method": "template", "dataset": "test.csv", "status": "ok", "wall_time": 1.0,
+                         "usage": {"user_time": 0.5}, "result": {"method": "Template", "mse": 1.5, "equation": "x0"}}
+        row = finish_job(method_result, self.spec)
+        self.assertEqual((row["method"], row["method_name"], row["mse"]), ("template", "Template", 1.5))
+
+    def test_finish_failed(self):
+        # A warm worker describes a failed evaluation in the method of its result
+        method_result = {"method": "template", "dataset": "test.csv", "status": "failed", "wall_time": 1.0,
+                         "usage": {}, "result": {"method": "template procedure failed with data from test.csv",
+                                                 "mse": 0, "equation": FAILED_EQUATION}}
+        row = finish_job(method_result, self.spec)
+        self.assertEqual(row["method"], "template")
+        self.assertIsNone(row["method_name"])
+        self.assertEqual(row["equation"], FAILED_EQUATION)
+        self.assertNotIn("mse", row)
+
+        method_result.update({"status": "timeout", "result": None})
+        self.assertEqual(finish_job(method_result, self.spec)["method"], "template")
+
+
+class TestEvaluateDatasets(TestCase):
+    """
+    End-to-end runs of the benchmark with the template method, whose results, caches and
+    runtime history are redirected to a temporary directory, see isolate_bench.
+    """
+
+    def setUp(self) -> None:
+        self.directory = isolate_bench(self, evaluate_dataset)
+        os.makedirs(f"{self.directory}/data")
+        self.datasets = {
+            "a.csv": write_dataset(f"{self.directory}/data/a.csv", seed=1),
+            "b.csv": write_dataset(f"{self.directory}/data/b.csv", seed=2)
+        }
+        self.options = {"cores": 2, "memory": 4, "output_format": "jsonl"}
+        self.runs = patch.object(evaluate_dataset, "run_benchmark_async", wraps=evaluate_dataset.run_benchmark_async)
+        self.run_benchmark = self.runs.start()
+        self.addCleanup(self.runs.stop)
+
+    def results(self, pattern: str = "result-*") -> list:
+        paths = sorted(glob.glob(f"{self.directory}/results/{pattern}"), key=os.path.getmtime)
+        return list(read_rows(paths[-1]))
+
+    def test_plan_jobs(self):
+        jobs = list(plan_jobs(["template"], self.datasets, "test", "ts", done={"template/b.csv"}))
+        self.assertEqual([job["job"] for job in jobs], ["template/a.csv"])
+        self.assertEqual([jobs[0]["args"][key] for key in ["method", "data_path", "file_name"]],
+                         ["template", self.datasets["a.csv"], "a.csv"])
+        self.assertEqual((jobs[0]["rows"], jobs[0]["features"]), (40, 2))
+        self.assertEqual(jobs[0]["args"]["artifacts_dir"], f"{self.directory}/results/artifacts/test-ts/template/a.csv")
+
+        # A share of the budget only reduces a time limit it is below
+        for share, limit in [(500, 100), (50, 50)]:
+            [job] = plan_jobs(["template"], {"a.csv": self.datasets["a.csv"]}, "test", "ts", time_limit=100,
+                              shares={"template": share})
+            self.assertEqual(job["args"]["time_limit"], limit)
+
+    def test_batch(self):
+        evaluate_dataset.evaluate_batch(f"{self.directory}/data", "template", **self.options)
+        rows = self.results()
+        self.assertEqual(sorted(row["dataset"] for row in rows), ["a.csv", "b.csv"])
+        for row in rows:
+            self.assertEqual((row["method"], row["method_name"], row["status"]), ("template", "Template", "ok"))
+            self.assertLess(row["mse"], 1e-10)
+            self.assertFalse(row["cached"])
+        self.assertEqual(self.run_benchmark.call_count, 2)
+        self.assertTrue(os.path.isfile(f"{self.directory}/results/journal-batch-data.jsonl"))
+
+    def test_cache_hit(self):
+        datasets = {"a.csv": self.datasets["a.csv"]}
+        evaluate_dataset.evaluate_datasets(datasets, "first", "template", **self.options)
+        evaluate_dataset.evaluate_datasets(datasets, "second", "template", **self.options)
+        self.assertEqual(self.run_benchmark.call_count, 1)
+        [row] = self.results("result-second-*")
+        self.assertTrue(row["cached"])
+        self.assertEqual(row["status"], "ok")
+        self.assertLess(row["mse"], 1e-10)
+
+        # Without the cache the job is run again
+        evaluate_dataset.evaluate_datasets(datasets, "third", "template", cache=False, **self.options)
+        self.assertEqual(self.run_benchmark.call_count, 2)
+        self.assertFalse(self.results("result-third-*")[0]["cached"])
+
+    def test_resume(self):
+        options = dict(self.options, cache=False)
+        evaluate_dataset.evaluate_datasets({"a.csv": self.datasets["a.csv"]}, "test", "template", **options)
+        evaluate_dataset.evaluate_datasets(self.datasets, "test", "template", resume=True, **options)
+        self.assertEqual(self.run_benchmark.call_count, 2)
+        self.assertEqual(self.run_benchmark.call_args.kwargs["file_name"], "b.csv")
+        rows = self.results()
+        self.assertEqual(sorted(row["dataset"] for row in rows), ["a.csv", "b.csv"])
+        self.assertEqual([row["status"] for row in rows], ["ok", "ok"])
+
+        # Without resuming, the journal is started over
+        evaluate_dataset.evaluate_datasets({"a.csv": self.datasets["a.csv"]}, "test", "template", **options)
+        self.assertEqual(self.run_benchmark.call_count, 3)
+
+    def test_resume_summary(self):
+        options = dict(self.options, cache=False, repeats=2)
+        evaluate_dataset.evaluate_datasets(self.datasets, "test", "template", **options)
+        self.assertEqual(self.run_benchmark.call_count, 4)
+        self.assertEqual(len(self.results("summary-test-*")), 2)
+
+        # Only the journaled runs of the planned jobs are saved and summarized
+        evaluate_dataset.evaluate_datasets({"a.csv": self.datasets["a.csv"]}, "test", "template", resume=True,
+                                           **options)
+        self.assertEqual(self.run_benchmark.call_count, 4)
+        rows = self.results()
+        self.assertEqual([row["dataset"] for row in rows], ["a.csv", "a.csv"])
+        self.assertEqual(sorted(row["seed"] for row in rows), repeat_seeds(2))
+        [summary] = self.results("summary-test-*")
+        self.assertEqual((summary["dataset"], summary["method"]), ("a.csv", "template"))
+
+    def test_plan(self):
+        datasets = {"a.csv": self.datasets["a.csv"]}
+        options = dict(self.options, cache=False)
+        evaluate_dataset.evaluate_datasets(datasets, "test", "template", plan=True, **options)
+        self.assertFalse(self.run_benchmark.called)
+        self.assertEqual(glob.glob(f"{self.directory}/results/result-*"), [])
+
+        # The wall time of a run is recorded and predicts the wall time of the next run
+        evaluate_dataset.evaluate_datasets(datasets, "test", "template", **options)
+        [row] = self.results()
+        history = evaluate_dataset.RuntimeHistory()
+        try:
+            [job] = plan_jobs(["template"], datasets, "test", "ts", history=history)
+        finally:
+            history.close()
+        self.assertAlmostEqual(job["expected"], row["wall_time"], places=3)
+
+    def test_budget(self):
+        options = dict(self.options, cache=False)
+
+        # Without a history, every job is expected to take the default cost, which exceeds the budget
+        evaluate_dataset.evaluate_datasets(self.datasets, "test", "template", budget=30, **options)
+        for call in self.run_benchmark.call_args_list:
+            self.assertLessEqual(call.kwargs["time_limit"], 30)
+        self.assertEqual([row["status"] for row in self.results()], ["ok", "ok"])
+        self.run_benchmark.reset_mock()
+
+        # A run expected to fit in the budget keeps the time limits of the methods
+        evaluate_dataset.evaluate_datasets(self.datasets, "long", "template", budget=3600, **options)
+        self.assertEqual([call.kwargs["time_limit"] for call in self.run_benchmark.call_args_list], [None, None])
+
+        # A job exceeding its share of the budget is killed
+        evaluate_dataset.evaluate_datasets({"a.csv": self.datasets["a.csv"]}, "short", "template", budget=0.2,
+                                           **options)
+        self.assertLessEqual(self.run_benchmark.call_args.kwargs["time_limit"], 0.2)
+        self.assertEqual(self.results("result-short-*")[0]["status"], "timeout")
+
+    def test_folds(self):
+        datasets = {"a.csv": self.datasets["a.csv"]}
+        evaluate_dataset.evaluate_datasets(datasets, "test", "template", folds=2, **self.options)
+        self.assertEqual(sorted(call.kwargs["fold"] for call in self.run_benchmark.call_args_list), ["1/2", "2/2"])
+        rows = self.results()
+        self.assertEqual(sorted(row["fold"] for row in rows), ["1/2", "2/2"])
+        self.assertEqual({row["status"] for row in rows}, {"ok"})
+        [summary] = self.results("summary-test-*")
+        self.assertEqual((summary["dataset"], summary["method"]), ("a.csv", "template"))
+
+    def test_share_splits(self):
+        datasets = {"a.csv": self.datasets["a.csv"]}
+        options = dict(self.options, cache=False, repeats=2)
+        evaluate_dataset.evaluate_datasets(datasets, "shared", "template", **options)
+        split_paths = {call.kwargs["data_path"] for call in self.run_benchmark.call_args_list}
+        self.assertEqual(len(split_paths), 2)
+        for split_path in split_paths:
+            self.assertTrue(split_path.startswith(f"{self.directory}/cache/splits/"))
+
+        # The methods see the same splits as when they read and split the dataset themselves
+        evaluate_dataset.evaluate_datasets(datasets, "own", "template", split_cache=False, **options)
+        self.assertEqual(self.run_benchmark.call_args.kwargs["data_path"], self.datasets["a.csv"])
+        shared, own = [sorted(self.results(f"result-{name}-*"), key=lambda row: row["seed"])
+                       for name in ["shared", "own"]]
+        self.assertEqual([row["seed"] for row in shared], repeat_seeds(2))
+        self.assertEqual([row["equation"] for row in shared], [row["equation"] for row in own])
+
+    def test_decode_datasets(self):
+        path = f"{self.directory}/data/c.tsv.gz"
+        frame = pd.read_csv(self.datasets["a.csv"]).rename(columns={"target": "y"})
+        frame.to_csv(path, sep="\t", index=False, compression="gzip")
+        evaluate_dataset.evaluate_datasets({"c.tsv.gz": path}, "test", "template", target="y", **self.options)
+        [decoded_path] = glob.glob(f"{self.directory}/cache/datasets/*.npy")
+        self.assertEqual(self.run_benchmark.call_args.kwargs["file_name"], "c.tsv.gz")
+        [row] = self.results()
+        self.assertEqual((row["dataset"], row["status"]), ("c.tsv.gz", "ok"))
+        self.assertLess(row["mse"], 1e-10)
+
+        # The decoded dataset is reused by the next run
+        modified = os.path.getmtime(decoded_path)
+        evaluate_dataset.evaluate_datasets({"c.tsv.gz": path}, "again", "template", target="y", cache=False,
+                                           **self.options)
+        self.assertEqual(glob.glob(f"{self.directory}/cache/datasets/*.npy"), [decoded_path])
+        self.assertGreaterEqual(os.path.getmtime(decoded_path), modified)
+        self.assertEqual(self.results("result-again-*")[0]["status"], "ok")
@@ -0,0 +1,62 @@
+import os
+import sys
+import glob
+import logging
+import pandas as pd
+from unittest import TestCase
+
+# Method to test
+sys.path.append(os.path.join(os.path.dirname(__file__), '../'))
+import bench.evaluate_dataset as evaluate_dataset
+import bench.invalidate_cache as invalidate_cache
+from bench.utils.result_sink import read_rows
+from tests.utils.helper_functions import isolate_bench, write_dataset
+
+logging.basicConfig(level=logging.CRITICAL)
+
+
+class TestInvalidateCache(TestCase):
+
+    def setUp(self) -> None:
+        self.directory = isolate_bench(self, evaluate_dataset, invalidate_cache)
+        self.options = {"cores": 1, "memory": 4, "output_format": "jsonl"}
+
+    def cached(self, name: str) -> bool:
+        [path] = glob.glob(f"{self.directory}/results/result-{name}-*")
+        return [row["cached"] for row in read_rows(path)] == [True]
+
+    def test_invalidate_dataset(self):
+        path = write_dataset(f"{self.directory}/a.csv")
+        other_path = write_dataset(f"{self.directory}/b.csv", seed=1)
+        evaluate_dataset.evaluate_datasets({"a.csv": path}, "first", "template", **self.options)
+        self.assertEqual(invalidate_cache.invalidate_cache("template", other_path), 0)
+        evaluate_dataset.evaluate_datasets({"a.csv": path}, "second", "template", **self.options)
+        self.assertTrue(self.cached("second"))
+
+        self.assertEqual(invalidate_cache.invalidate_cache("template", path), 1)
+        evaluate_dataset.evaluate_datasets({"a.csv": path}, "third", "template", **self.options)
+        self.assertFalse(self.cached("third"))
+
+    def test_invalidate_all(self):
+        for seed, label in enumerate(["a", "b"]):
+            path = write_dataset(f"{self.directory}/{label}.csv", seed=seed)
+            evaluate_dataset.evaluate_datasets({f"{label}.csv": path}, label, "template", **self.options)
+        self.assertEqual(invalidate_cache.invalidate_cache(), 2)
+        self.assertEqual(invalidate_cache.invalidate_cache(), 0)
+
+    def test_invalidate_compressed_dataset(self):
+        # The results of a decoded dataset are invalidated by the dataset as given
+        path = f"{self.directory}/a.csv.gz"
+        pd.read_csv(write_dataset(f"{self.directory}/a.csv")).to_csv(path, index=False, compression="gzip")
+        evaluate_dataset.evaluate_datasets({"a.csv.gz": path}, "first", "template", **self.options)
+        self.assertEqual(invalidate_cache.invalidate_cache("template", path), 1)
+
+    def test_invalidate_target(self):
+        path = f"{self.directory}/a.tsv.gz"
+        frame = pd.read_csv(write_dataset(f"{self.directory}/a.csv")).rename(columns={"target": "y"})
+        frame.to_csv(path, sep="\t", index=False, compression="gzip")
+        evaluate_dataset.evaluate_datasets({"a.tsv.gz": path}, "first", "template", target="y", **self.options)
+        self.assertEqual(invalidate_cache.invalidate_cache("template", path), 0)
+        self.assertEqual(invalidate_cache.invalidate_cache("template", path, "y"), 1)
+        evaluate_dataset.evaluate_datasets({"a.tsv.gz": path}, "second", "template", target="y", **self.options)
+        self.assertFalse(self.cached("second"))
@@ -0,0 +1,56 @@
+import os
+import sys
+import shutil
+import tempfile
+import subprocess
+from unittest import TestCase
+
+# Method to test
+sys.path.append(os.path.join(os.path.dirname(__file__),'../'))
+from bench.utils.job_log import JobLog, stream
+
+
+class TestJobLog(TestCase):
+
+    def setUp(self) -> None:
+        self.log_dir = tempfile.mkdtemp()
+        self.path = f"{self.log_dir}/method/dataset.log"
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.log_dir)
+
+    def test_write_and_tail(self):
+        log = JobLog(self.path)
+        log.write(b"first line\n")
+        log.write(b"last line\n")
+        self.assertEqual(log.tail(10), "last line\n")
+        self.assertEqual(log.bytes, 21)
+        log.close()
+
+    def test_rotate(self):
+        log = JobLog(self.path, max_bytes=10, backup_count=2)
+        for index in range(5):
+            log.write(f"line {index}\n".encode())
+        log.close()
+        self.assertEqual(sorted(os.listdir(os.path.dirname(self.path))),
+                         ["dataset.log", "dataset.log.1", "dataset.log.2"])
+        with open(self.path, "r") as log_file:
+            self.assertEqual(log_file.read(), "line 4\n")
+        self.assertEqual(log.tail(14), "line 3\nline 4\n")
+
+    def test_rotate_without_backups(self):
+        log = JobLog(self.path, max_bytes=10, backup_count=0)
+        for index in range(3):
+            log.write(f"line {index}\n".encode())
+        log.close()
+        self.assertEqual(os.listdir(os.path.dirname(self.path)), ["dataset.log"])
+
+    def test_stream(self):
+        log = JobLog(self.path)
+        process = subprocess.Popen("echo output; echo error >&2", shell=True,
+                                   stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+        stream(process.stdout, log).join(timeout=10)
+        process.wait()
+        process.stdout.close()
+        self.assertEqual(sorted(log.tail().split()), ["error", "output"])
+        log.close()
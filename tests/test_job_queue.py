@@ -0,0 +1,160 @@
+import os
+import sys
+import time
+import shutil
+import asyncio
+import tempfile
+import logging
+import multiprocessing
+from unittest import TestCase
+
+# Method to test
+sys.path.append(os.path.join(os.path.dirname(__file__),'../'))
+from bench.utils.job_queue import JobQueue, drain, MAX_ATTEMPTS
+
+logging.basicConfig(level=logging.CRITICAL)
+
+
+def spec(job: str, cores: int = 1, memory: float = 0) -> dict:
+    return {"job": job, "budget": {"cores": cores, "memory": memory}}
+
+
+async def sleep_job(job: dict, cores: int) -> tuple:
+    await asyncio.sleep(0.05)
+    return "ok", {"job": job["job"], "pid": os.getpid(), "cores": cores}
+
+
+def run_worker(path: str) -> None:
+    queue = JobQueue(path)
+    asyncio.run(drain(queue, sleep_job, {"cores": 2, "memory": 10}, poll_interval=0.05))
+    queue.close()
+
+
+class TestJobQueue(TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.mkdtemp()
+        self.path = f"{self.directory}/queue.db"
+        self.queue = JobQueue(self.path)
+
+    def tearDown(self) -> None:
+        self.queue.close()
+        shutil.rmtree(self.directory)
+
+    def test_put_is_idempotent(self):
+        self.assertTrue(self.queue.put(spec("a")))
+        self.assertFalse(self.queue.put(spec("a")))
+        self.assertEqual(self.queue.counts(), {"queued": 1})
+
+    def test_put_done_job(self):
+        self.queue.put(spec("a"), {"status": "ok", "mse": 1})
+        self.assertEqual(self.queue.counts(), {"done": 1})
+        self.assertIsNone(self.queue.claim("worker"))
+        self.assertEqual(list(self.queue.rows()), [{"status": "ok", "mse": 1}])
+
+    def test_claim_in_order(self):
+        self.queue.put(spec("a"))
+        self.queue.put(spec("b"))
+        self.assertEqual(self.queue.claim("worker")["job"], "a")
+        self.assertEqual(self.queue.claim("worker")["job"], "b")
+        self.assertIsNone(self.queue.claim("worker"))
+
+    def test_claim_within_capacity(self):
+        self.queue.put(spec("big", cores=4))
+        self.queue.put(spec("small", cores=1))
+        capacity = {"cores": 4, "memory": 10}
+        self.assertEqual(self.queue.claim("worker", capacity, {"cores": 2, "memory": 0})["job"], "small")
+        self.assertEqual(self.queue.claim("worker", capacity)["budget"], {"cores": 4, "memory": 0})
+
+    def test_complete_and_fail(self):
+        self.queue.put(spec("a"))
+        self.queue.put(spec("b"))
+        self.queue.claim("worker")
+        self.queue.claim("worker")
+        self.assertTrue(self.queue.complete("worker", "a", "ok", {"job": "a"}))
+        self.assertTrue(self.queue.complete("worker", "b", "failed", {"job": "b"}))
+        self.assertEqual(self.queue.counts(), {"done": 1, "failed": 1})
+        self.assertEqual(list(self.queue.rows()), [{"job": "a"}, {"job": "b"}])
+
+        # Failed jobs are queued again
+        self.assertFalse(self.queue.put(spec("a")))
+        self.assertTrue(self.queue.put(spec("b")))
+        self.assertEqual(self.queue.counts(), {"done": 1, "queued": 1})
+
+    def test_expired_lease_is_claimed_again(self):
+        queue = JobQueue(self.path, lease_time=0)
+        queue.put(spec("a"))
+        self.assertEqual(queue.claim("first")["job"], "a")
+        time.sleep(0.01)
+        self.assertEqual(queue.claim("second")["job"], "a")
+
+        # The first worker lost the job
+        self.assertEqual(queue.heartbeat("first", ["a"]), set())
+        self.assertFalse(queue.complete("first", "a", "ok", {}))
+        self.assertTrue(queue.complete("second", "a", "ok", {}))
+        queue.close()
+
+    def test_heartbeat_renews_lease(self):
+        queue = JobQueue(self.path, lease_time=0.2)
+        queue.put(spec("a"))
+        queue.claim("first")
+        time.sleep(0.1)
+        self.assertEqual(queue.heartbeat("first", ["a"]), {"a"})
+        time.sleep(0.15)
+        self.assertIsNone(queue.claim("second"))
+        queue.close()
+
+    def test_job_is_given_up_after_max_attempts(self):
+        queue = JobQueue(self.path, lease_time=0)
+        queue.put(spec("a"))
+        for attempt in range(MAX_ATTEMPTS):
+            self.assertIsNotNone(queue.claim(f"worker-{attempt}"))
+            time.sleep(0.01)
+        self.assertIsNone(queue.claim("last"))
+        self.assertEqual(queue.counts(), {"failed": 1})
+        queue.close()
+
+    def test_release(self):
+        self.queue.put(spec("a"))
+        self.queue.claim("worker")
+        self.queue.release("worker", ["a"])
+        self.assertEqual(self.queue.counts(), {"queued": 1})
+
+    def test_drain(self):
+        for index in range(5):
+            self.queue.put(spec(str(index)))
+        completed = asyncio.run(drain(self.queue, sleep_job, {"cores": 2, "memory": 10}, poll_interval=0.01))
+        self.assertEqual(completed, 5)
+        self.assertEqual(self.queue.counts(), {"done": 5})
+
+    def test_drain_cancelled_releases_jobs(self):
+        async def slow_job(job: dict, cores: int) -> tuple:
+            await asyncio.sleep(10)
+
+        async def cancel():
+            task = asyncio.ensure_future(drain(self.queue, slow_job, {"cores": 2, "memory": 10}))
+            await asyncio.sleep(0.1)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+        self.queue.put(spec("a"))
+        asyncio.run(cancel())
+        self.assertEqual(self.queue.counts(), {"queued": 1})
+
+    def test_several_worker_processes(self):
+        jobs = [str(index) for index in range(40)]
+        for job in jobs:
+            self.queue.put(spec(job))
+        workers = [multiprocessing.Process(target=run_worker, args=(self.path,)) for _ in range(4)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join(timeout=60)
+            self.assertEqual(worker.exitcode, 0)
+
+        # Every job was run exactly once
+        rows = list(self.queue.rows())
+        self.assertEqual(sorted(row["job"] for row in rows), sorted(jobs))
+        self.assertEqual(self.queue.counts(), {"done": len(jobs)})
+        self.assertGreater(len({row["pid"] for row in rows}), 1)
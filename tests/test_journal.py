@@ -0,0 +1,79 @@
+import os
+import sys
+import shutil
+import logging
+import tempfile
+from unittest import TestCase
+
+# Method to test
+sys.path.append(os.path.join(os.path.dirname(__file__),'../'))
+from bench.utils.journal import Journal, completed_jobs
+
+logging.basicConfig(level=logging.CRITICAL)
+
+
+class TestJournal(TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.mkdtemp()
+        self.path = f"{self.directory}/journal.jsonl"
+        self.row = {"dataset": "test.csv", "method": "Template", "mse": 1.0}
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.directory)
+
+    def test_write_and_resume(self):
+        journal = Journal(self.path)
+        journal.write("template/test.csv", self.row)
+        journal.close()
+
+        resumed = Journal(self.path, resume=True)
+        self.assertTrue("template/test.csv" in resumed)
+        self.assertEqual(list(resumed.rows()), [self.row])
+        resumed.close()
+
+    def test_rows_of_jobs(self):
+        journal = Journal(self.path)
+        journal.write("template/test.csv/seed42", self.row)
+        journal.write("template/test.csv/fold1of2", self.row)
+        self.assertEqual(len(list(journal.rows())), 2)
+        self.assertEqual(len(list(journal.rows({"template/test.csv/fold1of2"}))), 1)
+        journal.close()
+
+    def test_written_before_close(self):
+        journal = Journal(self.path)
+        journal.write("template/test.csv", self.row)
+        with open(self.path, "r") as journal_file:
+            self.assertEqual(len(journal_file.readlines()), 1)
+        journal.close()
+
+    def test_start_over_without_resume(self):
+        journal = Journal(self.path)
+        journal.write("template/test.csv", self.row)
+        journal.close()
+
+        new = Journal(self.path)
+        new.close()
+        self.assertFalse("template/test.csv" in new)
+        self.assertEqual(os.path.getsize(self.path), 0)
+
+    def test_resume_skips_incomplete_line(self):
+        journal = Journal(self.path)
+        journal.write("template/test.csv", self.row)
+        journal.close()
+        with open(self.path, "a") as journal_file:
+            journal_file.write('{"job": "ffx/te')
+
+        resumed = Journal(self.path, resume=True)
+        self.assertEqual(resumed.jobs, {"template/test.csv"})
+        self.assertEqual(list(resumed.rows()), [self.row])
+        resumed.close()
+
+    def test_completed_jobs(self):
+        self.assertEqual(completed_jobs(self.path), set())
+        journal = Journal(self.path)
+        journal.write("template/test.csv", self.row)
+        journal.close()
+        self.assertEqual(completed_jobs(self.path), {"template/test.csv"})
+        # Reading the completed jobs does not start the journal over
+        self.assertEqual(completed_jobs(self.path), {"template/test.csv"})
@@ -0,0 +1,51 @@
+import os
+import sys
+import glob
+import logging
+from unittest import TestCase
+
+# Method to test
+sys.path.append(os.path.join(os.path.dirname(__file__), '../'))
+import bench.evaluate_dataset as evaluate_dataset
+from bench.merge_results import merge_results
+from bench.utils.result_sink import ResultSink, read_rows
+from tests.utils.helper_functions import isolate_bench, write_dataset
+
+logging.basicConfig(level=logging.CRITICAL)
+
+
+class TestMergeResults(TestCase):
+
+    def setUp(self) -> None:
+        self.directory = isolate_bench(self, evaluate_dataset)
+
+    def test_merge_shards(self):
+        datasets = {label: write_dataset(f"{self.directory}/{label}", seed=seed)
+                    for seed, label in enumerate(["a.csv", "b.csv", "c.csv"])}
+        for shard in ["1/2", "2/2"]:
+            evaluate_dataset.evaluate_datasets(datasets, "test", "template", cores=2, memory=4, shard=shard)
+        paths = [glob.glob(f"{self.directory}/results/result-test-shard{index}of2-*")[0] for index in [1, 2]]
+        shards = [{row["dataset"] for row in read_rows(path)} for path in paths]
+        self.assertFalse(shards[0] & shards[1])
+        self.assertEqual(shards[0] | shards[1], set(datasets))
+        # The partition is removed once both shards have completed
+        self.assertEqual(glob.glob(f"{self.directory}/results/shards-*"), [])
+
+        output = f"{self.directory}/results/merged.csv"
+        self.assertEqual(merge_results(paths, output), 3)
+        rows = list(read_rows(output))
+        self.assertEqual(sorted(row["dataset"] for row in rows), sorted(datasets))
+        self.assertEqual({row["status"] for row in rows}, {"ok"})
+        self.assertFalse(os.path.exists(f"{self.directory}/results/merged-summary.csv"))
+
+    def test_last_table_wins(self):
+        paths = [f"{self.directory}/first.jsonl", f"{self.directory}/second.csv"]
+        for path, mse in zip(paths, [2.0, 1.0]):
+            sink = ResultSink(path, evaluate_dataset.COLUMNS)
+            sink.write({"dataset": "a.csv", "method": "template", "status": "ok", "mse": mse})
+            sink.write({"dataset": f"{mse}.csv", "method": "template", "status": "ok", "mse": mse})
+            sink.close()
+        self.assertEqual(merge_results(paths, f"{self.directory}/merged.jsonl"), 3)
+        rows = {row["dataset"]: row for row in read_rows(f"{self.directory}/merged.jsonl")}
+        self.assertEqual(sorted(rows), ["1.0.csv", "2.0.csv", "a.csv"])
+        self.assertEqual(rows["a.csv"]["mse"], "1.0")
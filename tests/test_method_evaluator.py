@@ -1,14 +1,20 @@
 import os
 import sys
+import json
+import shutil
 import pathlib
 import logging
-import subprocess
+import tempfile
 import pandas as pd
 from unittest import TestCase
+from unittest.mock import patch
+from click import command
+from click.testing import CliRunner
 
 # Method to test
 sys.path.append(os.path.join(os.path.dirname(__file__),'../'))
-from bench.utils.method_evaluator import MethodEvaluator
+from bench.utils.method_evaluator import MethodEvaluator, PHASES, merge_params, method_options
+from bench.utils.split_cache import SplitCache
 
 PATH = pathlib.Path(__file__).parent.resolve()
 
@@ -84,10 +90,140 @@ class TestMethodEvaluator(TestCase):
 
     def test_evaluate_valid_path(self):
         result = self.initiated_evaluator.evaluate(self.dataset)
+        phases = result.pop("phases")
         self.assertEqual(result, self.expected_result)
+        for phase in ["load", "split", "procedure"]:
+            self.assertGreaterEqual(phases[phase], 0)
+        self.assertTrue(set(phases) <= set(PHASES))
+
+    def test_evaluate_times_method(self):
+        class Method:
+            def fit(self, x, y):
+                return self
+
+            def predict(self, x):
+                return x
+
+        class Procedure(MethodEvaluator):
+            def __init__(self):
+                super().__init__()
+                self._method = Method()
+
+            def format_output(self):
+                return "x0"
+
+            def procedure(self, train_x, test_x, train_y, test_y) -> dict:
+                self._method.fit(train_x, train_y)
+                self._method.predict(test_x)
+                self._method.predict(test_x)
+                return {"method": "Procedure", "mse": 0, "equation": self.format_output()}
+
+        procedure = Procedure()
+        phases = procedure.evaluate(self.dataset)["phases"]
+        for phase in ["fit", "predict", "format_output"]:
+            self.assertGreater(phases[phase], 0)
+
+        # The methods are restored after the evaluation
+        self.assertNotIn("fit", vars(procedure._method))
+        self.assertNotIn("format_output", vars(procedure))
+
+    def test_seed_changes_split(self):
+        load = self.initiated_evaluator._MethodEvaluator__load
+        default_test_y = load(self.dataset)[3]
+        self.assertEqual(load(self.dataset, 42)[3].to_dict(), default_test_y.to_dict())
+        test_sets = [load(self.dataset, seed)[3].to_dict() for seed in range(10)]
+        self.assertTrue(any(test_y != default_test_y.to_dict() for test_y in test_sets))
+
+    def test_folds_partition_dataset(self):
+        load = self.initiated_evaluator._MethodEvaluator__load
+        folds = [load(self.dataset, 1, f"{index}/2") for index in [1, 2]]
+        test_index = sorted(index for fold in folds for index in fold[1].index)
+        self.assertEqual(test_index, [0, 1, 2, 3, 4])
+        for train_x, test_x, train_y, test_y in folds:
+            self.assertEqual(len(train_x) + len(test_x), 5)
+            self.assertFalse(set(train_x.index) & set(test_x.index))
+            self.assertEqual(list(train_y.index), list(train_x.index))
+        self.assertEqual(load(self.dataset, 1, "1/2")[1].to_dict(), folds[0][1].to_dict())
+
+    def test_dataset_is_loaded_once(self):
+        load = self.initiated_evaluator._MethodEvaluator__load
+        load(self.dataset, 1)
+        with patch("bench.utils.method_evaluator.read_dataset") as read_dataset:
+            load(self.dataset, 2)
+        read_dataset.assert_not_called()
+
+    def test_attaches_materialised_split(self):
+        directory = tempfile.mkdtemp()
+        try:
+            path = SplitCache(directory).materialise(self.dataset, "digest", [(1, None, None)])[(1, None, None)]
+            load = self.initiated_evaluator._MethodEvaluator__load
+            with patch("bench.utils.method_evaluator.read_dataset") as read_dataset:
+                attached = load(path)
+            read_dataset.assert_not_called()
+            for part, expected in zip(attached, load(self.dataset, 1)):
+                self.assertEqual(part.to_dict(), expected.to_dict())
+        finally:
+            shutil.rmtree(directory)
+
+    def test_sample_caps_training_rows(self):
+        directory = tempfile.mkdtemp()
+        cwd = os.getcwd()
+        try:
+            os.chdir(directory)
+            data = self.initiated_evaluator._MethodEvaluator__load(self.dataset)
+            sampled = self.initiated_evaluator._MethodEvaluator__sample(data, "2:stratified")
+            self.assertEqual((len(sampled[0]), len(sampled[2])), (2, 2))
+            self.assertEqual(sampled[1].to_dict(), data[1].to_dict())
+            with open(f"{directory}/artifacts/train_sample.json", "r") as sample_file:
+                record = json.load(sample_file)
+            self.assertEqual(record["index"], list(sampled[0].index))
+            self.assertEqual((record["sampler"], record["rows"], record["train_rows"]), ("stratified", 2, 4))
+
+            # A training set within the cap is not sampled
+            self.assertIs(self.initiated_evaluator._MethodEvaluator__sample(data, "10"), data)
+        finally:
+            os.chdir(cwd)
+            shutil.rmtree(directory)
+
+    def test_columns_and_dtype(self):
+        class Procedure(MethodEvaluator):
+            def procedure(self, train_x, test_x, train_y, test_y) -> dict:
+                self.train_x = train_x
+                return {"method": "Procedure", "mse": 0, "equation": "x0"}
+
+        procedure = Procedure()
+        procedure.evaluate(self.dataset, columns="z", dtype="float32")
+        self.assertEqual(list(procedure.train_x.columns), ["z"])
+        self.assertEqual(procedure.train_x["z"].dtype, "float32")
+        procedure.evaluate(self.dataset)
+        self.assertEqual(list(procedure.train_x.columns), ["val", "z"])
+
+    def test_merge_params(self):
+        params = {"niterations": 10, "training": {"n_samples": 100, "batch_size": 10}}
+        result = merge_params(params, {"niterations": 2, "training": {"n_samples": 5}})
+        self.assertEqual(result, {"niterations": 2, "training": {"n_samples": 5, "batch_size": 10}})
+        self.assertEqual(params["training"]["n_samples"], 100)
+
+    def test_override_params(self):
+        evaluator = MethodEvaluator(params={"timeout": 5})
+        self.assertEqual(evaluator.override_params({"timeout": 100, "depth": 3}), {"timeout": 5, "depth": 3})
+        self.assertEqual(MethodEvaluator().override_params({"timeout": 100}), {"timeout": 100})
 
     def test_evaluate_invalid_path(self):
         logging.disable(logging.CRITICAL)
         result = self.initiated_evaluator.evaluate("/wrong.json")
         logging.disable(logging.NOTSET)
         self.assertEqual(result, 1)
+
+    def test_method_options(self):
+        calls = []
+
+        @command()
+        @method_options
+        def main(params, evaluation):
+            calls.append((params, evaluation))
+
+        result = CliRunner().invoke(main, ["--params", '{"timeout": 5}', "--seed", "3", "--fold", "1/2"])
+        self.assertEqual(result.exit_code, 0)
+        self.assertEqual(calls, [({"timeout": 5}, {"profile": None, "seed": 3, "fold": "1/2", "sample": None,
+                                                   "columns": None, "dtype": None})])
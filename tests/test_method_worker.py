@@ -0,0 +1,50 @@
+import os
+import sys
+import pathlib
+import tempfile
+from unittest import TestCase
+
+# Method to test
+sys.path.append(os.path.join(os.path.dirname(__file__),'../'))
+from bench.utils.method_worker import MethodWorker, load_procedure
+from bench.methods.template.procedure import TemplateProcedure
+
+PATH = pathlib.Path(__file__).parent.resolve()
+
+
+class TestMethodWorker(TestCase):
+
+    def setUp(self) -> None:
+        self.dataset = f"{PATH}/utils/test_dataset.csv"
+        self.work_dir = tempfile.mkdtemp()
+        self.worker = MethodWorker("template")
+
+    def tearDown(self) -> None:
+        self.worker.close()
+        os.rmdir(self.work_dir)
+
+    def test_load_procedure(self):
+        self.assertEqual(load_procedure("template").__name__, TemplateProcedure.__name__)
+
+    def test_invalid_method(self):
+        with self.assertRaises(FileNotFoundError):
+            MethodWorker("wrong")
+
+    def test_evaluate_datasets_back_to_back(self):
+        first = self.worker.evaluate(self.dataset, self.work_dir)
+        second = self.worker.evaluate(self.dataset, self.work_dir)
+        self.assertEqual(first["result"]["method"], "Template")
+        self.assertEqual(first["result"]["equation"], second["result"]["equation"])
+        self.assertIn("startup", first["result"]["phases"])
+        self.assertNotIn("startup", second["result"]["phases"])
+        self.assertIn("peak_rss", second["usage"])
+        self.assertTrue(self.worker.alive)
+
+    def test_evaluate_missing_dataset(self):
+        response = self.worker.evaluate("/wrong.csv", self.work_dir)
+        self.assertTrue("data_path" in response["error"])
+        self.assertTrue(self.worker.alive)
+
+    def test_close(self):
+        self.worker.close()
+        self.assertFalse(self.worker.alive)
@@ -0,0 +1,57 @@
+import os
+import sys
+import time
+import pstats
+import shutil
+import tempfile
+from unittest import TestCase
+
+# Method to test
+sys.path.append(os.path.join(os.path.dirname(__file__),'../'))
+from bench.utils.profiler import profiled, StackSampler
+
+
+def busy(seconds: float) -> None:
+    end_time = time.perf_counter() + seconds
+    while time.perf_counter() < end_time:
+        pass
+
+
+class TestProfiler(TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.directory)
+
+    def test_no_profile(self):
+        with profiled(None, self.directory):
+            busy(0.01)
+        self.assertEqual(os.listdir(self.directory), [])
+
+    def test_cprofile(self):
+        with profiled("cprofile", self.directory):
+            busy(0.01)
+        self.assertEqual(sorted(os.listdir(self.directory)), ["profile.pstats", "profile.txt"])
+        functions = [function for _, _, function in pstats.Stats(f"{self.directory}/profile.pstats").stats]
+        self.assertIn("busy", functions)
+
+    def test_sample(self):
+        with profiled("sample", self.directory):
+            busy(0.2)
+        with open(f"{self.directory}/profile.collapsed", "r") as stacks_file:
+            stacks = stacks_file.read()
+        self.assertIn("busy (test_profiler.py", stacks)
+
+    def test_invalid_profiler(self):
+        with self.assertRaises(ValueError):
+            with profiled("wrong", self.directory):
+                pass
+
+    def test_stack_sampler_counts(self):
+        sampler = StackSampler(interval=0.001)
+        sampler.start()
+        busy(0.1)
+        sampler.stop()
+        self.assertGreater(sum(sampler.stacks.values()), 0)
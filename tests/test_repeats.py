@@ -0,0 +1,73 @@
+import os
+import sys
+import glob
+import json
+from unittest import TestCase
+
+# Method to test
+sys.path.append(os.path.join(os.path.dirname(__file__),'../'))
+from bench.utils.repeats import repeat_seeds, cv_folds, seed_params, quantile, median_interval, summarize
+from bench.utils.split_cache import SPLIT_SEED
+
+METHODS_DIR = os.path.join(os.path.dirname(__file__), '../bench/methods')
+
+
+class TestRepeats(TestCase):
+
+    def test_repeat_seeds(self):
+        self.assertEqual(repeat_seeds(1), [None])
+        self.assertEqual(repeat_seeds(3), [SPLIT_SEED, SPLIT_SEED + 1, SPLIT_SEED + 2])
+        with self.assertRaises(ValueError):
+            repeat_seeds(0)
+
+    def test_cv_folds(self):
+        self.assertEqual(cv_folds(1), [None])
+        self.assertEqual(cv_folds(3), ["1/3", "2/3", "3/3"])
+        with self.assertRaises(ValueError):
+            cv_folds(0)
+
+    def test_seed_params(self):
+        self.assertEqual(seed_params({"seed_param": "random_state"}, 7), {"random_state": 7})
+        self.assertEqual(seed_params({"seed_param": "experiment.seed"}, 7), {"experiment": {"seed": 7}})
+        self.assertEqual(seed_params({"seed_param": "random_state"}, None), {})
+        self.assertEqual(seed_params({}, 7), {})
+
+    def test_declared_seed_params(self):
+        # A seed parameter passed to the estimator as a keyword must be a parameter of its procedure,
+        # while a dotted parameter may set a key of the default configuration of the method
+        for config_path in glob.glob(f"{METHODS_DIR}/*/config.json"):
+            with open(config_path, "r") as config_file:
+                param = json.load(config_file)["resources"].get("seed_param")
+            if param is None or "." in param:
+                continue
+            with open(f"{os.path.dirname(config_path)}/procedure.py", "r") as procedure_file:
+                procedure = procedure_file.read()
+            self.assertTrue(f'"{param}"' in procedure or f"'{param}'" in procedure, config_path)
+
+    def test_quantile(self):
+        self.assertEqual(quantile([1.0, 2.0, 3.0, 4.0], 0.5), 2.5)
+        self.assertEqual(quantile([1.0, 2.0, 3.0, 4.0, 5.0], 0.25), 2.0)
+        self.assertEqual(quantile([3.0], 0.75), 3.0)
+
+    def test_median_interval(self):
+        # Five values cannot reach 95%, so the interval spans all of them
+        self.assertEqual(median_interval([1, 2, 3, 4, 5]), (1, 5, 1 - 2 / 32))
+        low, high, coverage = median_interval(list(range(20)))
+        self.assertEqual((low, high), (5, 14))
+        self.assertGreaterEqual(coverage, 0.95)
+        self.assertEqual(median_interval([1]), (1, 1, 0.0))
+
+    def test_summarize(self):
+        rows = [{"dataset": "a", "method": "m", "status": "ok", "mse": str(mse), "wall_time": 10.0}
+                for mse in [1, 2, 3, 4]]
+        rows.append({"dataset": "a", "method": "m", "status": "timeout", "mse": None, "wall_time": 100.0})
+        rows.append({"dataset": "b", "method": "m", "status": "failed", "mse": None, "wall_time": None})
+        summary = summarize(rows)
+        self.assertEqual([(row["dataset"], row["runs"], row["ok"]) for row in summary], [("a", 5, 4), ("b", 1, 0)])
+        self.assertEqual(summary[0]["mse_median"], 2.5)
+        self.assertEqual(summary[0]["mse_mean"], 2.5)
+        self.assertAlmostEqual(summary[0]["mse_std"], (5 / 3) ** 0.5)
+        self.assertEqual(summary[0]["mse_iqr"], 1.5)
+        self.assertEqual((summary[0]["mse_ci_low"], summary[0]["mse_ci_high"]), (1.0, 4.0))
+        self.assertEqual(summary[0]["wall_time_median"], 10.0)
+        self.assertNotIn("mse_median", summary[1])
@@ -0,0 +1,100 @@
+import os
+import sys
+import time
+import shutil
+import pathlib
+import tempfile
+from unittest import TestCase
+from unittest.mock import patch
+
+# Method to test
+sys.path.append(os.path.join(os.path.dirname(__file__),'../'))
+from bench.utils.result_cache import ResultCache, file_digest, dataset_digest, cache_key
+
+PATH = pathlib.Path(__file__).parent.resolve()
+
+
+class TestResultCache(TestCase):
+
+    def setUp(self) -> None:
+        self.cache_dir = tempfile.mkdtemp()
+        self.cache = ResultCache(self.cache_dir)
+        self.digest = file_digest(f"{PATH}/utils/test_dataset.csv")
+        self.entry = {
+            "method": "template",
+            "dataset_digest": self.digest,
+            "result": {"method": "Template", "mse": 1.0, "equation": "x0"},
+            "wall_time": 1.25
+        }
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.cache_dir)
+
+    def test_file_digest(self):
+        self.assertEqual(len(self.digest), 64)
+        self.assertEqual(self.digest, file_digest(f"{PATH}/utils/test_dataset.csv"))
+
+    def test_dataset_digest(self):
+        self.assertEqual(dataset_digest(f"{PATH}/utils/test_dataset.csv"), self.digest)
+        self.assertEqual(dataset_digest(f"{PATH}/utils/test_dataset.csv", "target"), self.digest)
+        self.assertNotEqual(dataset_digest(f"{PATH}/utils/test_dataset.csv", "y"), self.digest)
+        self.assertEqual(len(dataset_digest(f"{PATH}/utils/test_dataset.csv", "y")), 64)
+
+    def test_cache_key_depends_on_inputs(self):
+        key = cache_key("template", self.digest)
+        self.assertEqual(key, cache_key("template", self.digest))
+        self.assertNotEqual(key, cache_key("ffx", self.digest))
+        self.assertNotEqual(key, cache_key("template", "other"))
+        self.assertNotEqual(key, cache_key("template", self.digest, {"fit_intercept": False}))
+        self.assertNotEqual(key, cache_key("template", self.digest, seed=43))
+        self.assertNotEqual(cache_key("template", self.digest, seed=42), cache_key("template", self.digest, seed=43))
+        self.assertNotEqual(cache_key("template", self.digest, fold="1/5"), cache_key("template", self.digest, fold="2/5"))
+        self.assertNotEqual(cache_key("template", self.digest), cache_key("template", self.digest, sample="2:random"))
+        self.assertNotEqual(cache_key("template", self.digest), cache_key("template", self.digest, columns=["val"]))
+        self.assertNotEqual(cache_key("template", self.digest), cache_key("template", self.digest, dtype="float32"))
+
+    def test_get_missing(self):
+        self.assertIsNone(self.cache.get("missing"))
+
+    def test_put_and_get(self):
+        self.cache.put("key", self.entry)
+        entry = self.cache.get("key")
+        self.assertEqual(entry["result"], self.entry["result"])
+        self.assertEqual(entry["wall_time"], 1.25)
+
+    def test_evict_least_recently_used(self):
+        self.cache.put("old", self.entry)
+        self.cache.put("new", self.entry)
+        os.utime(f"{self.cache_dir}/old.json", (time.time() - 100, time.time() - 100))
+        self.cache.max_size = os.path.getsize(f"{self.cache_dir}/new.json")
+        self.cache.evict()
+        self.assertIsNone(self.cache.get("old"))
+        self.assertIsNotNone(self.cache.get("new"))
+
+    def test_invalidate_method(self):
+        self.cache.put("template", self.entry)
+        self.cache.put("ffx", dict(self.entry, method="ffx"))
+        self.assertEqual(self.cache.invalidate(["ffx"]), 1)
+        self.assertIsNone(self.cache.get("ffx"))
+        self.assertIsNotNone(self.cache.get("template"))
+
+    def test_invalidate_dataset(self):
+        self.cache.put("template", self.entry)
+        self.assertEqual(self.cache.invalidate(dataset_digest="other"), 0)
+        self.assertEqual(self.cache.invalidate(dataset_digest=self.digest), 1)
+        self.assertEqual(self.cache.size(), 0)
+
+
+    def test_vanished_entries(self):
+        # Entries removed by another process sharing the cache since they were listed are skipped
+        self.cache.put("key", self.entry)
+        path = f"{self.cache_dir}/key.json"
+        vanished = f"{self.cache_dir}/vanished.json"
+        with patch.object(self.cache, "entries", return_value=[vanished, path]):
+            self.assertEqual(self.cache.size(), os.path.getsize(path))
+            self.assertEqual(self.cache.invalidate(["ffx"]), 0)
+        with patch.object(self.cache, "stats", return_value=[(vanished, 0.0, 2 * 1024 ** 3)] + self.cache.stats()):
+            self.cache.evict()
+        self.assertIsNotNone(self.cache.get("key"))
+        with patch.object(self.cache, "entries", return_value=[vanished, path]):
+            self.assertEqual(self.cache.invalidate(), 1)
@@ -0,0 +1,57 @@
+import os
+import sys
+import json
+import shutil
+import tempfile
+from io import StringIO
+from unittest import TestCase
+from unittest.mock import patch
+
+# Method to test
+sys.path.append(os.path.join(os.path.dirname(__file__),'../'))
+from bench.utils.result_sink import ResultSink, read_rows
+
+
+class TestResultSink(TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.mkdtemp()
+        self.columns = ["dataset", "method", "mse"]
+        self.row = {"dataset": "test.csv", "method": "Template", "mse": 1.5, "extra": 1}
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.directory)
+
+    def test_csv_rows_visible_before_close(self):
+        sink = ResultSink(f"{self.directory}/result.csv", self.columns)
+        sink.write(self.row)
+        with open(f"{self.directory}/result.csv", "r") as result_file:
+            lines = result_file.read().splitlines()
+        sink.close()
+        self.assertEqual(lines, ["dataset,method,mse", "test.csv,Template,1.5"])
+        self.assertEqual(sink.rows, 1)
+
+    def test_jsonl(self):
+        sink = ResultSink(f"{self.directory}/result.jsonl", self.columns)
+        sink.write(self.row)
+        sink.close()
+        with open(f"{self.directory}/result.jsonl", "r") as result_file:
+            self.assertEqual(json.loads(result_file.readline()), self.row)
+
+    def test_echo(self):
+        with patch("sys.stdout", new_callable=StringIO) as stdout:
+            sink = ResultSink(f"{self.directory}/result.csv", self.columns, echo=True)
+            sink.write(self.row)
+            sink.close()
+        self.assertEqual(json.loads(stdout.getvalue()), self.row)
+
+    def test_read_rows(self):
+        for extension in ["csv", "jsonl"]:
+            sink = ResultSink(f"{self.directory}/result.{extension}", self.columns)
+            sink.write(self.row)
+            sink.write({"dataset": "other.csv", "method": "Template"})
+            sink.close()
+            rows = list(read_rows(f"{self.directory}/result.{extension}"))
+            self.assertEqual(len(rows), 2)
+            self.assertEqual(rows[0]["dataset"], "test.csv")
+            self.assertIsNone(rows[1].get("mse"))
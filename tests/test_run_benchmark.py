@@ -1,14 +1,17 @@
 import os
 import sys
 import pathlib
+import shutil
+import asyncio
 import logging
-import subprocess
-from unittest import TestCase, mock
+import tempfile
+from unittest import TestCase
 from unittest.mock import patch
 
 # Method to test
 sys.path.append(os.path.join(os.path.dirname(__file__),'../'))
-from bench.utils.run_benchmark import run_benchmark
+from bench.utils.run_benchmark import run_benchmark, run_benchmark_async, close_workers, WORKERS
+from bench.utils.scheduler import iter_jobs
 
 logging.basicConfig(level=logging.CRITICAL)
 PATH = pathlib.Path(__file__).parent.resolve()
@@ -24,23 +27,254 @@ class TestRunBenchmark(TestCase):
         }
 
     def test_invalid_path(self):
-        expected_result = {"method": "template", "run_time": None}
+        expected_result = {"method": "template", "dataset": "test.csv", "status": "failed", "wall_time": None,
+                           "usage": {}, "result": None}
         result = run_benchmark(**self.kwargs)
         self.assertEqual(result, expected_result)
 
+    def test_valid_path_reads_result(self):
+        kwargs = {
+            "method": "template",
+            "data_path": f"{PATH}/utils/test_dataset.csv",
+            "file_name": "test_dataset.csv"
+        }
+        result = run_benchmark(**kwargs)
+        self.assertEqual(result["dataset"], "test_dataset.csv")
+        self.assertEqual(result["status"], "ok")
+        self.assertEqual(result["result"]["method"], "Template")
+        self.assertGreater(result["wall_time"], 0)
+        self.assertGreater(result["usage"]["user_time"] + result["usage"]["system_time"], 0)
+        self.assertGreater(result["usage"]["peak_rss"], 0)
+        self.assertFalse(os.path.exists(f"{PATH}/../bench/methods/template/result.json"))
+
+    def test_scratch_dir_is_removed(self):
+        scratch_dir = tempfile.mkdtemp()
+        kwargs = {
+            "method": "template",
+            "data_path": f"{PATH}/utils/test_dataset.csv",
+            "file_name": "test_dataset.csv",
+            "scratch_dir": scratch_dir
+        }
+        result = run_benchmark(**kwargs)
+        self.assertIsNotNone(result["result"])
+        self.assertEqual(os.listdir(scratch_dir), [])
+        os.rmdir(scratch_dir)
+
+    def test_warm_worker_is_reused(self):
+        kwargs = {
+            "method": "template",
+            "data_path": f"{PATH}/utils/test_dataset.csv",
+            "file_name": "test_dataset.csv",
+            "warm": True
+        }
+        first = run_benchmark(**kwargs)
+        worker = WORKERS["template"][0]
+        second = run_benchmark(**kwargs)
+        self.assertEqual(first["result"]["equation"], second["result"]["equation"])
+        self.assertGreater(second["usage"]["peak_rss"], 0)
+        self.assertEqual(WORKERS["template"], [worker])
+        close_workers()
+        self.assertEqual(WORKERS, {})
+
+    def test_warm_invalid_path(self):
+        result = run_benchmark(**self.kwargs, warm=True)
+        close_workers()
+        self.assertIsNone(result["wall_time"])
+
+    def test_output_is_logged(self):
+        log_dir = tempfile.mkdtemp()
+        kwargs = {
+            "method": "template",
+            "data_path": f"{PATH}/utils/test_dataset.csv",
+            "file_name": "test_dataset.csv",
+            "log_path": f"{log_dir}/template/test_dataset.log"
+        }
+        for warm in [False, True]:
+            result = run_benchmark(**kwargs, warm=warm)
+            self.assertEqual(result["status"], "ok")
+            with open(kwargs["log_path"], "r") as log_file:
+                self.assertIn("Template MSE is", log_file.read())
+        close_workers()
+        shutil.rmtree(log_dir)
+
+    def test_profile_artifacts_are_saved(self):
+        artifacts_dir = tempfile.mkdtemp()
+        kwargs = {
+            "method": "template",
+            "data_path": f"{PATH}/utils/test_dataset.csv",
+            "file_name": "test_dataset.csv",
+            "profile": "cprofile",
+            "artifacts_dir": artifacts_dir
+        }
+        result = run_benchmark(**kwargs)
+        self.assertEqual(result["status"], "ok")
+        self.assertIn("profile.pstats", os.listdir(artifacts_dir))
+        shutil.rmtree(artifacts_dir)
+
+    def test_params_override_method(self):
+        kwargs = {
+            "method": "template",
+            "data_path": f"{PATH}/utils/test_dataset.csv",
+            "file_name": "test_dataset.csv"
+        }
+        default = run_benchmark(**kwargs)
+        for warm in [False, True]:
+            result = run_benchmark(**kwargs, warm=warm, params={"fit_intercept": False})
+            self.assertEqual(result["status"], "ok")
+            self.assertNotEqual(result["result"]["mse"], default["result"]["mse"])
+        close_workers()
+
+    @patch('bench.utils.run_benchmark.read_resources', return_value={"cores_param": "n_jobs"})
+    def test_cores_are_passed_as_params(self, mock_resources):
+        kwargs = {
+            "method": "template",
+            "data_path": f"{PATH}/utils/test_dataset.csv",
+            "file_name": "test_dataset.csv"
+        }
+        with patch('bench.utils.run_benchmark.run_cold', return_value=({"equation": "x0"}, {})) as mock_run:
+            asyncio.run(run_benchmark_async(**kwargs, cores=3))
+            self.assertEqual(mock_run.call_args[0][8], {"n_jobs": 3})
+            asyncio.run(run_benchmark_async(**kwargs, params={"n_jobs": 1}, cores=3))
+            self.assertEqual(mock_run.call_args[0][8], {"n_jobs": 1})
+        result = asyncio.run(run_benchmark_async(**kwargs, cores=2))
+        self.assertEqual(result["status"], "ok")
+
+    def test_seed_changes_split(self):
+        kwargs = {
+            "method": "template",
+            "data_path": f"{PATH}/utils/test_dataset.csv",
+            "file_name": "test_dataset.csv"
+        }
+        default = run_benchmark(**kwargs)
+        for warm in [False, True]:
+            self.assertEqual(run_benchmark(**kwargs, warm=warm, seed=42)["result"]["mse"], default["result"]["mse"])
+            results = [run_benchmark(**kwargs, warm=warm, seed=seed)["result"]["mse"] for seed in range(3)]
+            self.assertTrue(any(mse != default["result"]["mse"] for mse in results))
+        close_workers()
+
+    def test_fold_is_evaluated(self):
+        kwargs = {
+            "method": "template",
+            "data_path": f"{PATH}/utils/test_dataset.csv",
+            "file_name": "test_dataset.csv"
+        }
+        for warm in [False, True]:
+            results = [run_benchmark(**kwargs, warm=warm, fold=f"{index}/2") for index in [1, 2]]
+            self.assertEqual([result["status"] for result in results], ["ok", "ok"])
+            self.assertNotEqual(results[0]["result"]["mse"], results[1]["result"]["mse"])
+            self.assertEqual(run_benchmark(**kwargs, warm=warm, fold="3/2")["status"], "failed")
+        close_workers()
+
+    def test_sample_is_recorded(self):
+        kwargs = {
+            "method": "template",
+            "data_path": f"{PATH}/utils/test_dataset.csv",
+            "file_name": "test_dataset.csv",
+            "sample": "3:coreset"
+        }
+        for warm in [False, True]:
+            artifacts_dir = tempfile.mkdtemp()
+            result = run_benchmark(**kwargs, warm=warm, artifacts_dir=artifacts_dir)
+            self.assertEqual(result["status"], "ok")
+            self.assertIn("sample", result["result"]["phases"])
+            self.assertIn("train_sample.json", os.listdir(artifacts_dir))
+            shutil.rmtree(artifacts_dir)
+        close_workers()
+
+    @patch('bench.utils.supervisor.POLL_INTERVAL', 0.01)
+    def test_time_limit_kills_job(self):
+        kwargs = {
+            "method": "template",
+            "data_path": f"{PATH}/utils/test_dataset.csv",
+            "file_name": "test_dataset.csv",
+            "time_limit": 0
+        }
+        result = run_benchmark(**kwargs)
+        self.assertEqual(result["status"], "timeout")
+        self.assertIsNone(result["result"])
+        self.assertGreater(result["wall_time"], 0)
+        self.assertIn("user_time", result["usage"])
+
+    def test_cancelled_job_is_cleaned_up(self):
+        scratch_dir = tempfile.mkdtemp()
+        kwargs = {
+            "method": "template",
+            "data_path": f"{PATH}/utils/test_dataset.csv",
+            "file_name": "test_dataset.csv",
+            "scratch_dir": scratch_dir
+        }
+
+        async def cancel():
+            task = asyncio.ensure_future(run_benchmark_async(**kwargs))
+            await asyncio.sleep(0.2)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(cancel())
+        self.assertEqual(os.listdir(scratch_dir), [])
+        os.rmdir(scratch_dir)
+
+    def test_memory_limit_kills_warm_worker(self):
+        kwargs = {
+            "method": "template",
+            "data_path": f"{PATH}/utils/test_dataset.csv",
+            "file_name": "test_dataset.csv",
+            "warm": True
+        }
+        run_benchmark(**kwargs)
+        worker = WORKERS["template"][0]
+        with patch('bench.utils.supervisor.POLL_INTERVAL', 0), \
+                patch('bench.utils.supervisor.tree_rss', return_value=2 * 1024 ** 3):
+            result = run_benchmark(**kwargs, memory_limit=1)
+        self.assertEqual(result["status"], "oom")
+        self.assertFalse(worker.alive)
+        result = run_benchmark(**kwargs, memory_limit=1)
+        self.assertEqual(result["status"], "ok")
+        self.assertNotIn(worker, WORKERS["template"])
+        close_workers()
+
     def test_invalid_method(self):
-        with self.assertRaises(FileNotFoundError):
-            kwargs = {
-                "method": "wrong",
-                "data_path": "test.path",
-                "file_name": "test.csv"
-            }
-            run_benchmark(**kwargs)
-
-    @patch('subprocess.run')
-    def test_shell_command_is_run(self, mock_run):
-        mock_run.side_effect = None
+        kwargs = {
+            "method": "wrong",
+            "data_path": "test.path",
+            "file_name": "test.csv"
+        }
+        result = run_benchmark(**kwargs)
+        self.assertEqual((result["method"], result["status"], result["result"]), ("wrong", "failed", None))
+
+    def test_failed_job_does_not_stop_run(self):
+        # A job failing with any error is recorded as failed, and the other jobs of the run carry on
+        budget = {"cores": 1, "memory": 1}
+        jobs = [(("wrong", f"{PATH}/utils/test_dataset.csv", "test_dataset.csv"), budget),
+                (("template", f"{PATH}/utils/test_dataset.csv", "test_dataset.csv"), budget)]
+
+        async def run_jobs():
+            return {index: result async for index, result in iter_jobs(run_benchmark_async, jobs,
+                                                                         {"cores": 2, "memory": 2})}
+
+        results = asyncio.run(run_jobs())
+        self.assertEqual((results[0]["status"], results[1]["status"]), ("failed", "ok"))
+
+        with patch('bench.utils.run_benchmark.run_cold', side_effect=ValueError("Truncated result")):
+            result = run_benchmark("template", f"{PATH}/utils/test_dataset.csv", "test_dataset.csv")
+        self.assertEqual(result["status"], "failed")
+
+    @patch('bench.utils.run_benchmark.stream_async')
+    @patch('bench.utils.run_benchmark.supervise')
+    @patch('subprocess.Popen')
+    def test_shell_command_is_run(self, mock_popen, mock_supervise, mock_stream):
+        mock_popen.return_value.returncode = 0
+        mock_supervise.return_value = {"user_time": 0.0, "read_bytes": 10, "write_bytes": 10}
         result = run_benchmark(**self.kwargs)
         self.assertEqual(result["method"], "template")
-        self.assertIsNotNone(result["run_time"])
-        self.assertTrue(mock_run.called)
+        self.assertEqual(result["status"], "failed")
+        self.assertEqual(result["usage"], {"user_time": 0.0, "read_bytes": 10, "write_bytes": 10})
+        self.assertTrue(mock_stream.called)
+        self.assertIsNotNone(result["wall_time"])
+        self.assertIsNone(result["result"])
+        # The procedure of the method is launched on the dataset
+        command = mock_popen.call_args[0][0]
+        self.assertEqual(command[0], "python")
+        self.assertTrue(command[1].endswith("/methods/template/procedure.py"))
+        self.assertEqual(command[2:], ["--data_path", "test.path"])
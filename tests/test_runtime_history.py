@@ -0,0 +1,64 @@
+import os
+import sys
+import shutil
+import pathlib
+import tempfile
+from unittest import TestCase
+
+# Method to test
+sys.path.append(os.path.join(os.path.dirname(__file__),'../'))
+from bench.utils.runtime_history import RuntimeHistory, dataset_shape, format_duration, log_plan, DEFAULT_COST
+
+PATH = pathlib.Path(__file__).parent.resolve()
+
+
+class TestRuntimeHistory(TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.mkdtemp()
+        self.history = RuntimeHistory(f"{self.directory}/history.db")
+
+    def tearDown(self) -> None:
+        self.history.close()
+        shutil.rmtree(self.directory)
+
+    def test_dataset_shape(self):
+        with open(f"{self.directory}/data.csv", "w") as data_file:
+            data_file.write("x0,x1,target\n1,2,3\n4,5,6")
+        self.assertEqual(dataset_shape(f"{self.directory}/data.csv"), (2, 2))
+
+    def test_dataset_shape_of_test_dataset(self):
+        rows, features = dataset_shape(f"{PATH}/utils/test_dataset.csv")
+        self.assertGreater(rows, 0)
+        self.assertGreater(features, 0)
+
+    def test_expected_time_without_history(self):
+        self.assertEqual(self.history.expected_time("pysr", 100, 2), DEFAULT_COST)
+        self.assertEqual(self.history.expected_time("pysr", 100, 2, 25200), 25200)
+
+    def test_expected_time_of_similar_datasets(self):
+        self.history.record("pysr", 100, 2, 10, "ok")
+        self.history.record("pysr", 120, 2, 12, "ok")
+        self.history.record("pysr", 90, 2, 11, "timeout")
+        self.history.record("pysr", 100000, 20, 1000, "ok")
+        self.assertEqual(self.history.expected_time("pysr", 100, 2), 11)
+        self.assertEqual(self.history.expected_time("pysr", 200000, 20), 12)
+        self.assertEqual(self.history.expected_time("pysr", 100, 2, 5), 5)
+
+    def test_failed_jobs_are_not_recorded(self):
+        self.history.record("pysr", 100, 2, 1, "failed")
+        self.history.record("pysr", 100, 2, None, "ok")
+        self.assertEqual(self.history.runs("pysr"), [])
+
+    def test_history_is_persisted(self):
+        self.history.record("ffx", 100, 2, 3, "ok")
+        history = RuntimeHistory(f"{self.directory}/history.db")
+        self.assertEqual(history.runs("ffx"), [(100, 2, 3.0)])
+        history.close()
+
+    def test_format_duration(self):
+        self.assertEqual(format_duration(3725.4), "1:02:05")
+
+    def test_log_plan(self):
+        specs = [{"method": "pysr", "expected": 10}, {"method": "ffx", "expected": 2}]
+        self.assertEqual(log_plan(specs, [(0, 10), (0, 2)]), 10)
@@ -0,0 +1,54 @@
+import os
+import sys
+import numpy as np
+from unittest import TestCase
+
+# Method to test
+sys.path.append(os.path.join(os.path.dirname(__file__),'../'))
+from bench.utils.sampling import parse_sample, sample_rows, train_sample, SAMPLERS
+
+
+class TestSampling(TestCase):
+
+    def setUp(self) -> None:
+        generator = np.random.RandomState(0)
+        self.x = generator.rand(1000, 3)
+        self.y = generator.randn(1000)
+
+    def test_parse_sample(self):
+        self.assertEqual(parse_sample("100"), (100, "random"))
+        self.assertEqual(parse_sample("100:coreset"), (100, "coreset"))
+        for sample in ["0", "a", "100:unknown", "-5:random"]:
+            with self.assertRaises(ValueError):
+                parse_sample(sample)
+
+    def test_sample_rows(self):
+        for sampler in SAMPLERS:
+            positions = sample_rows(self.x, self.y, 50, sampler, 1)
+            self.assertEqual(len(set(positions)), 50)
+            self.assertEqual(list(positions), sorted(positions))
+            self.assertEqual(list(positions), list(sample_rows(self.x, self.y, 50, sampler, 1)))
+            self.assertNotEqual(list(positions), list(sample_rows(self.x, self.y, 50, sampler, 2)))
+
+    def test_small_dataset_is_not_sampled(self):
+        self.assertEqual(list(sample_rows(self.x[:10], self.y[:10], 50, "coreset")), list(range(10)))
+
+    def test_stratified_sample_covers_target(self):
+        positions = sample_rows(self.x, self.y, 20, "stratified", 0)
+        ranks = np.argsort(np.argsort(self.y))[positions]
+        self.assertEqual(sorted(np.bincount(ranks // 100, minlength=10)), [2] * 10)
+
+    def test_coreset_sample_covers_target(self):
+        # The pool of candidates is the whole dataset, so the coreset spreads evenly over the target
+        y = np.arange(1000.0)
+        positions = sample_rows(np.zeros((1000, 1)), y, 250, "coreset", 0)
+        self.assertEqual(positions[0], 0)
+        self.assertEqual(positions[-1], 999)
+        self.assertLessEqual(np.diff(y[positions]).max(), 8)
+
+    def test_train_sample(self):
+        self.assertIsNone(train_sample({}))
+        self.assertEqual(train_sample({"max_train_samples": 100}), "100:random")
+        self.assertEqual(train_sample({"max_train_samples": 100, "sampler": "coreset"}), "100:coreset")
+        self.assertEqual(train_sample({"max_train_samples": 100}, 10, "stratified"), "10:stratified")
+        self.assertIsNone(train_sample({"max_train_samples": 100}, 0))
@@ -0,0 +1,119 @@
+import os
+import sys
+import time
+import asyncio
+from unittest import TestCase
+
+# Method to test
+sys.path.append(os.path.join(os.path.dirname(__file__),'../'))
+from bench.utils.scheduler import read_resources, machine_capacity, fit_budget, iter_jobs, run_jobs, simulate_jobs
+
+
+async def sleep_job(name: str, seconds: float, cores: int) -> tuple:
+    await asyncio.sleep(seconds)
+    return name, cores
+
+
+async def timed_job(name: str, cores: int) -> tuple:
+    start = time.time()
+    await asyncio.sleep(0.2)
+    return name, cores, start, time.time()
+
+
+async def failing_job(cores: int) -> None:
+    raise RuntimeError("Job failed")
+
+
+class TestScheduler(TestCase):
+
+    def setUp(self) -> None:
+        self.capacity = {"cores": 4, "memory": 10}
+
+    def test_read_resources(self):
+        result = read_resources("template")
+        self.assertEqual(result, {"cores": 1, "memory": 1})
+
+    def test_read_resources_invalid_method(self):
+        with self.assertRaises(FileNotFoundError):
+            read_resources("wrong")
+
+    def test_machine_capacity_override(self):
+        result = machine_capacity(3, 2.5)
+        self.assertEqual(result, {"cores": 3, "memory": 2.5})
+
+    def test_machine_capacity_default(self):
+        result = machine_capacity()
+        self.assertTrue(result["cores"] >= 1)
+        self.assertTrue(result["memory"] > 0)
+
+    def test_machine_capacity_invalid_cores(self):
+        with self.assertRaises(ValueError):
+            machine_capacity(0)
+
+    def test_fit_budget_all_cores(self):
+        result = fit_budget({"cores": -1, "memory": 1}, self.capacity)
+        self.assertEqual(result, {"cores": 4, "memory": 1})
+
+    def test_fit_budget_clamped(self):
+        result = fit_budget({"cores": 32, "memory": 1}, self.capacity)
+        self.assertEqual(result["cores"], 4)
+
+    def test_run_jobs_order_and_cores(self):
+        jobs = [(("a",), {"cores": 1, "memory": 0}), (("b",), {"cores": -1, "memory": 0})]
+        results = run_jobs(timed_job, jobs, self.capacity)
+        self.assertEqual([result[:2] for result in results], [("a", 1), ("b", 4)])
+
+    def test_run_jobs_within_capacity(self):
+        jobs = [((str(i),), {"cores": 2, "memory": 4}) for i in range(4)]
+        results = run_jobs(timed_job, jobs, self.capacity)
+
+        # At no point may more than the capacity be in use
+        for _, _, start, _ in results:
+            running = [result for result in results if result[2] <= start < result[3]]
+            self.assertTrue(sum(result[1] for result in running) <= self.capacity["cores"])
+            self.assertTrue(len(running) * 4 <= self.capacity["memory"])
+
+    def test_iter_jobs_as_completed(self):
+        async def collect():
+            jobs = [(("slow", 0.5), {"cores": 1, "memory": 0}), (("fast", 0), {"cores": 1, "memory": 0})]
+            return [(index, result[0]) async for index, result in iter_jobs(sleep_job, jobs, self.capacity)]
+
+        self.assertEqual(asyncio.run(collect()), [(1, "fast"), (0, "slow")])
+
+    def test_run_jobs_many_concurrent(self):
+        # Jobs without declared resources only wait for each other if they exceed the cores
+        jobs = [((str(i), 0.2), {"cores": 1, "memory": 0}) for i in range(200)]
+        start = time.time()
+        results = run_jobs(sleep_job, jobs, {"cores": 200, "memory": 10})
+        self.assertEqual(len(results), 200)
+        self.assertLess(time.time() - start, 2)
+
+    def test_iter_jobs_cancels_running_jobs(self):
+        async def consume_first():
+            jobs = [(("fast", 0), {"cores": 1, "memory": 0}), (("slow", 10), {"cores": 1, "memory": 0})]
+            generator = iter_jobs(sleep_job, jobs, self.capacity)
+            async for index, _ in generator:
+                break
+            await generator.aclose()
+            return index, [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+
+        index, tasks = asyncio.run(consume_first())
+        self.assertEqual(index, 0)
+        self.assertEqual(tasks, [])
+
+    def test_run_jobs_error(self):
+        with self.assertRaises(RuntimeError):
+            run_jobs(failing_job, [((), {"cores": 1, "memory": 0})], self.capacity)
+
+    def test_run_jobs_empty(self):
+        self.assertEqual(run_jobs(timed_job, [], self.capacity), [])
+
+    def test_simulate_jobs_within_capacity(self):
+        budgets = [{"cores": 2, "memory": 0}, {"cores": 2, "memory": 0}, {"cores": 2, "memory": 0}]
+        result = simulate_jobs([10, 5, 1], budgets, self.capacity)
+        self.assertEqual(result, [(0, 10), (0, 5), (5, 6)])
+
+    def test_simulate_jobs_first_fit(self):
+        budgets = [{"cores": 3, "memory": 0}, {"cores": 4, "memory": 0}, {"cores": 1, "memory": 0}]
+        result = simulate_jobs([10, 5, 2], budgets, self.capacity)
+        self.assertEqual(result, [(0, 10), (10, 15), (0, 2)])
@@ -0,0 +1,67 @@
+import os
+import sys
+import json
+import shutil
+import tempfile
+from unittest import TestCase
+
+# Method to test
+sys.path.append(os.path.join(os.path.dirname(__file__),'../'))
+from bench.utils.sharding import finish_shard, parse_shard, partition, shard_plan
+
+
+class TestSharding(TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.mkdtemp()
+        self.costs = {"pysr/a": 100, "pysr/b": 100, "gpzgd/a": 80, "ffx/a": 1, "ffx/b": 1, "template/a": 1}
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.directory)
+
+    def test_parse_shard(self):
+        self.assertEqual(parse_shard("2/4"), (2, 4))
+
+    def test_parse_shard_invalid(self):
+        for shard in ["0/4", "5/4", "1", "a/b", "1/0"]:
+            with self.assertRaises(ValueError):
+                parse_shard(shard)
+
+    def test_partition_is_disjoint_and_complete(self):
+        shards = partition(self.costs, 3)
+        jobs = [job for shard in shards for job in shard]
+        self.assertEqual(sorted(jobs), sorted(self.costs))
+
+    def test_partition_balances_cost(self):
+        shards = partition(self.costs, 3)
+        loads = sorted(sum(self.costs[job] for job in shard) for shard in shards)
+        self.assertEqual(loads, [83, 100, 100])
+
+    def test_partition_is_deterministic(self):
+        reordered = dict(reversed(list(self.costs.items())))
+        self.assertEqual(partition(self.costs, 4), partition(reordered, 4))
+
+    def test_shard_plan_is_saved_once(self):
+        first = shard_plan(self.directory, "test", self.costs, 2)
+        # Changed costs do not change the saved partition of the same jobs
+        second = shard_plan(self.directory, "test", dict(self.costs, **{"ffx/a": 1000}), 2)
+        self.assertEqual(first, second)
+        self.assertEqual(len(os.listdir(self.directory)), 1)
+        with open(first["path"], "r") as plan_file:
+            self.assertEqual(json.load(plan_file)["shards"], first["shards"])
+
+    def test_shard_plan_of_other_jobs(self):
+        shard_plan(self.directory, "test", self.costs, 2)
+        shard_plan(self.directory, "test", {"ffx/a": 1}, 2)
+        self.assertEqual(len(os.listdir(self.directory)), 2)
+
+    def test_finish_shard(self):
+        first = shard_plan(self.directory, "test", self.costs, 2)
+        self.assertFalse(finish_shard(first["path"], 2, 2))
+        self.assertTrue(os.path.exists(first["path"]))
+        self.assertTrue(finish_shard(first["path"], 1, 2))
+        self.assertEqual(os.listdir(self.directory), [])
+
+        # The next run partitions its jobs by the changed costs
+        second = shard_plan(self.directory, "test", dict(self.costs, **{"ffx/a": 1000}), 2)
+        self.assertNotEqual(first["shards"], second["shards"])
@@ -0,0 +1,74 @@
+import os
+import sys
+import shutil
+import pathlib
+import logging
+import tempfile
+from unittest import TestCase
+from unittest.mock import patch
+
+# Method to test
+sys.path.append(os.path.join(os.path.dirname(__file__),'../'))
+from bench.utils.dataset_reader import read_dataset
+from bench.utils.split_cache import SplitCache, attach_split, is_split, parse_fold, split_dataset, split_key
+
+logging.basicConfig(level=logging.CRITICAL)
+PATH = pathlib.Path(__file__).parent.resolve()
+
+
+class TestSplitCache(TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.mkdtemp()
+        self.dataset = f"{PATH}/utils/test_dataset.csv"
+        self.cache = SplitCache(self.directory)
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.directory)
+
+    def test_parse_fold(self):
+        self.assertEqual(parse_fold("2/5"), (2, 5))
+        for fold in ["0/5", "6/5", "1/1", "a/b", "1"]:
+            with self.assertRaises(ValueError):
+                parse_fold(fold)
+
+    def test_split_key(self):
+        self.assertEqual(split_key("digest"), split_key("digest", 42))
+        self.assertEqual(split_key("digest"), split_key("digest", dtype="float64"))
+        keys = {split_key("digest"), split_key("other"), split_key("digest", 1), split_key("digest", 1, "1/2"),
+                split_key("digest", columns=["x"]), split_key("digest", dtype="float32")}
+        self.assertEqual(len(keys), 6)
+
+    def test_materialise_and_attach(self):
+        splits = [(None, None, None), (1, "1/2", None), (1, "2/2", "float32")]
+        paths = self.cache.materialise(self.dataset, "digest", splits)
+        self.assertEqual(len(set(paths.values())), 3)
+        x, y = read_dataset(self.dataset)
+        for (seed, fold, dtype), path in paths.items():
+            self.assertTrue(is_split(path))
+            attached = attach_split(path)
+            self.assertEqual(attached[0].to_numpy().dtype, dtype or "float64")
+            for part, expected in zip(attached, split_dataset(x, y, seed, fold)):
+                self.assertEqual(part.astype("float32").to_dict(), expected.astype("float32").to_dict())
+                self.assertEqual(list(part.index), list(expected.index))
+
+        # The attached arrays are read-only maps of the cached files
+        train_x = attach_split(paths[(None, None, None)])[0]
+        self.assertFalse(train_x.values.flags.writeable)
+        with self.assertRaises(ValueError):
+            train_x.values[0, 0] = 1.0
+
+    def test_materialise_reads_dataset_once(self):
+        with patch("bench.utils.split_cache.read_dataset", wraps=read_dataset) as reader:
+            self.cache.materialise(self.dataset, "digest", [(1, None, None), (2, None, None)])
+            self.assertEqual(reader.call_count, 1)
+            self.cache.materialise(self.dataset, "digest", [(1, None, None), (2, None, None)])
+            self.assertEqual(reader.call_count, 1)
+        self.assertEqual(len(self.cache.entries()), 2)
+
+    def test_evict(self):
+        paths = self.cache.materialise(self.dataset, "digest", [(1, None, None), (2, None, None)])
+        os.utime(paths[(2, None, None)], (0, 0))
+        self.cache.max_size = self.cache.size() - 1
+        self.cache.evict(keep={paths[(2, None, None)]})
+        self.assertEqual(self.cache.entries(), [paths[(2, None, None)]])
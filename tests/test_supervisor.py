@@ -0,0 +1,92 @@
+import os
+import sys
+import time
+import asyncio
+import subprocess
+from unittest import TestCase
+
+# Method to test
+sys.path.append(os.path.join(os.path.dirname(__file__),'../'))
+from bench.utils.supervisor import process_tree, alive, tree_rss, kill_tree, check_limits, supervise, \
+    self_usage, usage_delta, peak_rss, LimitExceeded, USAGE_KEYS
+
+
+class TestSupervisor(TestCase):
+
+    def setUp(self) -> None:
+        # A shell in its own session with a child process
+        self.process = subprocess.Popen("sleep 30 & sleep 30; wait", shell=True, start_new_session=True)
+        time.sleep(0.2)
+
+    def tearDown(self) -> None:
+        kill_tree(self.process.pid, grace=1)
+        self.process.wait()
+
+    def test_process_tree(self):
+        tree = process_tree(self.process.pid)
+        self.assertEqual(tree[0], self.process.pid)
+        self.assertEqual(len(tree), 3)
+
+    def test_tree_rss(self):
+        self.assertGreater(tree_rss(self.process.pid), 0)
+
+    def test_kill_tree(self):
+        tree = process_tree(self.process.pid)
+        kill_tree(self.process.pid, grace=1)
+        self.process.wait(timeout=5)
+        for pid in tree:
+            self.assertFalse(alive(pid))
+
+    def test_check_limits_within(self):
+        self.assertIsNone(check_limits(self.process.pid, time.monotonic(), 10, 100))
+        self.assertIsNone(check_limits(self.process.pid, time.monotonic()))
+
+    def test_check_limits_timeout(self):
+        self.assertEqual(check_limits(self.process.pid, time.monotonic() - 2, time_limit=1), "timeout")
+
+    def test_check_limits_oom(self):
+        self.assertEqual(check_limits(self.process.pid, time.monotonic(), memory_limit=1e-9), "oom")
+
+
+class TestSupervise(TestCase):
+
+    def test_usage_of_process_tree(self):
+        # The CPU time of the child of the shell is included
+        process = subprocess.Popen(
+            "python -c 'sum(range(10 ** 7))' & wait", shell=True, start_new_session=True
+        )
+        usage = asyncio.run(supervise(process))
+        self.assertEqual(process.returncode, 0)
+        self.assertEqual(sorted(usage), sorted(USAGE_KEYS))
+        self.assertGreater(usage["user_time"], 0)
+        self.assertGreater(usage["peak_rss"], 0)
+
+    def test_limit_exceeded(self):
+        process = subprocess.Popen("sleep 30", shell=True, start_new_session=True)
+        with self.assertRaises(LimitExceeded) as context:
+            asyncio.run(supervise(process, time_limit=0))
+        self.assertEqual(context.exception.status, "timeout")
+        self.assertIn("user_time", context.exception.usage)
+        self.assertFalse(alive(process.pid))
+
+    def test_cancelled(self):
+        process = subprocess.Popen("sleep 30", shell=True, start_new_session=True)
+
+        async def cancel():
+            task = asyncio.ensure_future(supervise(process))
+            await asyncio.sleep(0.2)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(cancel())
+        self.assertIsNotNone(process.returncode)
+        with self.assertRaises(ChildProcessError):
+            os.waitpid(process.pid, os.WNOHANG)
+
+    def test_self_usage(self):
+        before = self_usage()
+        sum(range(10 ** 6))
+        delta = usage_delta(before, self_usage())
+        self.assertGreaterEqual(delta["user_time"], 0)
+        self.assertGreater(peak_rss(), 0)
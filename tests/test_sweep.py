@@ -0,0 +1,106 @@
+import os
+import sys
+import json
+import glob
+from unittest import TestCase
+
+# Method to test
+sys.path.append(os.path.join(os.path.dirname(__file__),'../'))
+from bench.utils.sweep import config_id, build_config, param_value, sample_configs, halving_rungs, rank_configs
+from bench.utils.result_sink import read_rows
+from tests.utils.helper_functions import isolate_bench, write_dataset
+import bench.sweep as sweep
+
+
+class TestSweep(TestCase):
+
+    def test_config_id(self):
+        self.assertEqual(config_id({"a": 1, "b": 2}), config_id({"b": 2, "a": 1}))
+        self.assertNotEqual(config_id({"a": 1}), config_id({"a": 2}))
+
+    def test_build_config(self):
+        self.assertEqual(build_config({"training.batch_size": 10, "training.epsilon": 0.1, "depth": 3}),
+                         {"training": {"batch_size": 10, "epsilon": 0.1}, "depth": 3})
+
+    def test_param_value(self):
+        self.assertEqual(param_value(["a", "b", "c"], 0.5), "b")
+        self.assertEqual(param_value(["a", "b", "c"], 0.999), "c")
+        self.assertEqual(param_value({"low": 0, "high": 10}, 0.25), 2.5)
+        self.assertAlmostEqual(param_value({"low": 1, "high": 100, "log": True}, 0.5), 10)
+        self.assertEqual(param_value({"low": 1, "high": 10, "integer": True}, 0.5), 6)
+
+    def test_grid_search(self):
+        configs = sample_configs({"search": "grid", "params": {"a": [1, 2], "b.c": [True, False, True]}})
+        self.assertEqual(len(configs), 4)
+        self.assertIn({"a": 2, "b": {"c": False}}, configs)
+        with self.assertRaises(ValueError):
+            sample_configs({"search": "grid", "params": {"a": {"low": 0, "high": 1}}})
+
+    def test_random_search(self):
+        space = {"search": "random", "samples": 8, "params": {"a": {"low": 0, "high": 1}, "b": [1, 2]}}
+        configs = sample_configs(space, seed=1)
+        self.assertEqual(len(configs), 8)
+        self.assertEqual(configs, sample_configs(space, seed=1))
+        self.assertNotEqual(configs, sample_configs(space, seed=2))
+        self.assertTrue(all(0 <= config["a"] <= 1 and config["b"] in [1, 2] for config in configs))
+
+    def test_sobol_search(self):
+        space = {"search": "sobol", "samples": 8, "params": {"a": {"low": 0, "high": 1}, "b": {"low": 0, "high": 1}}}
+        configs = sample_configs(space)
+        self.assertEqual(len(configs), 8)
+        # A Sobol sequence puts one point in every eighth of each dimension
+        self.assertEqual(sorted(int(config["a"] * 8) for config in configs), list(range(8)))
+
+    def test_invalid_search(self):
+        with self.assertRaises(ValueError):
+            sample_configs({"search": "bayes"})
+
+    def test_halving_rungs(self):
+        self.assertEqual(halving_rungs(10, 270, 3), [10, 30, 90, 270])
+        self.assertEqual(halving_rungs(10, 100, 3), [11, 33, 100])
+        self.assertEqual(halving_rungs(5, 5), [5])
+        with self.assertRaises(ValueError):
+            halving_rungs(10, 5)
+
+    def test_rank_configs(self):
+        scores = {
+            "a": {"x": 1.0, "y": 100.0},
+            "b": {"x": 2.0, "y": 50.0},
+            "c": {"x": None, "y": 10.0},
+            "d": {"x": 0.5, "y": None}
+        }
+        # A configuration failing on a dataset ranks last on it
+        self.assertEqual(rank_configs(scores), [("a", 2.5), ("b", 2.5), ("c", 2.5), ("d", 2.5)])
+        scores["d"]["y"] = 1.0
+        self.assertEqual(rank_configs(scores), [("d", 1.0), ("a", 3.0), ("b", 3.0), ("c", 3.0)])
+
+
+class TestRunSweep(TestCase):
+    """
+    End-to-end sweep of the template method with successive halving, see isolate_bench.
+    """
+
+    def setUp(self) -> None:
+        self.directory = isolate_bench(self, sweep, sys.modules["evaluate_dataset"])
+        self.space_path = f"{self.directory}/space.json"
+        with open(self.space_path, "w") as space_file:
+            json.dump({"template": {"search": "grid", "params": {"fit_intercept": [True, False]},
+                                    "halving": {"param": "n_jobs", "min": 1, "max": 3, "eta": 3}}}, space_file)
+        self.datasets = {"a.csv": write_dataset(f"{self.directory}/a.csv")}
+
+    def test_halving(self):
+        board = sweep.run_sweep(self.datasets, "test", self.space_path, "template", cores=2, memory=4,
+                                output_format="jsonl")
+        best = config_id({"fit_intercept": True})
+        self.assertEqual([(row["config"], row["rung"], row["resource"]) for row in board],
+                         [(best, 1, 3), (config_id({"fit_intercept": False}), 0, 1)])
+        self.assertLess(board[0]["median_mse"], 1e-10)
+        self.assertEqual(json.loads(board[0]["params"]), {"fit_intercept": True})
+
+        # Every configuration ran in the first rung, and only the best advanced
+        [path] = glob.glob(f"{self.directory}/results/sweep-test-*")
+        rows = list(read_rows(path))
+        self.assertEqual(sorted((row["rung"], row["config"]) for row in rows),
+                         sorted([(0, best), (0, config_id({"fit_intercept": False})), (1, best)]))
+        self.assertEqual({row["status"] for row in rows}, {"ok"})
+        self.assertEqual(len(glob.glob(f"{self.directory}/results/leaderboard-test-*")), 1)
@@ -0,0 +1,84 @@
+import os
+import sys
+import time
+import sqlite3
+import logging
+from unittest import TestCase
+from click.testing import CliRunner
+
+# Method to test
+sys.path.append(os.path.join(os.path.dirname(__file__), '../'))
+import bench.evaluate_dataset as evaluate_dataset
+import bench.worker as worker
+from bench.utils.job_queue import JobQueue
+from bench.utils.result_sink import read_rows
+from tests.utils.helper_functions import isolate_bench, write_dataset
+
+logging.basicConfig(level=logging.CRITICAL)
+
+
+class TestWorker(TestCase):
+    """
+    End-to-end runs of the template method through a shared job queue, see isolate_bench.
+    """
+
+    def setUp(self) -> None:
+        self.directory = isolate_bench(self, evaluate_dataset, worker, sys.modules["evaluate_dataset"])
+        self.queue = f"{self.directory}/queue.db"
+        self.datasets = {label: write_dataset(f"{self.directory}/{label}", seed=seed)
+                         for seed, label in enumerate(["a.csv", "b.csv"])}
+        evaluate_dataset.evaluate_datasets(self.datasets, "test", "template", queue=self.queue)
+
+    def attempts(self) -> dict:
+        connection = sqlite3.connect(self.queue)
+        try:
+            return dict(connection.execute("SELECT job, attempts FROM jobs").fetchall())
+        finally:
+            connection.close()
+
+    def test_run_and_export(self):
+        self.assertEqual(self.attempts(), {"template/a.csv": 0, "template/b.csv": 0})
+
+        # The leases are renewed while the jobs outlive them, so no job is claimed twice
+        self.assertEqual(worker.run_worker(self.queue, cores=4, memory=4, lease_time=0.6, poll_interval=0.1), 2)
+        self.assertEqual(self.attempts(), {"template/a.csv": 1, "template/b.csv": 1})
+
+        path = f"{self.directory}/results/export.jsonl"
+        self.assertEqual(worker.export_results(self.queue, path), 2)
+        rows = list(read_rows(path))
+        self.assertEqual(sorted(row["dataset"] for row in rows), ["a.csv", "b.csv"])
+        self.assertEqual({(row["method"], row["status"]) for row in rows}, {("template", "ok")})
+        self.assertFalse(os.path.exists(f"{self.directory}/results/export-summary.jsonl"))
+
+        # The results are cached, such that enqueueing the jobs again records them as done
+        evaluate_dataset.evaluate_datasets(self.datasets, "again", "template", queue=f"{self.directory}/again.db")
+        job_queue = JobQueue(f"{self.directory}/again.db")
+        try:
+            self.assertEqual(job_queue.counts(), {"done": 2})
+            self.assertTrue(all(row["cached"] for row in job_queue.rows()))
+        finally:
+            job_queue.close()
+
+    def test_local_options_rejected(self):
+        # Options that only apply to local runs are not silently dropped when the jobs are queued
+        for option in [["--budget", "60"], ["--shard", "1/2"], ["--plan", "true"], ["--split_cache", "false"]]:
+            result = CliRunner().invoke(evaluate_dataset.main, ["--data_path", self.datasets["a.csv"],
+                                                                "--queue", self.queue] + option)
+            self.assertEqual(result.exit_code, 2)
+            self.assertIn(option[0], result.output)
+
+    def test_expired_lease(self):
+        # A job claimed by a worker that died is run again once its lease expires
+        job_queue = JobQueue(self.queue, lease_time=0.1)
+        try:
+            job = job_queue.claim("dead-worker")["job"]
+        finally:
+            job_queue.close()
+        time.sleep(0.2)
+        self.assertEqual(worker.run_worker(self.queue, cores=2, memory=4, poll_interval=0.1), 2)
+        self.assertEqual(self.attempts()[job], 2)
+        job_queue = JobQueue(self.queue)
+        try:
+            self.assertEqual(job_queue.counts(), {"done": 2})
+        finally:
+            job_queue.close()
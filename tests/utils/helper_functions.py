@@ -1,5 +1,10 @@
+import shutil
 import pathlib
+import tempfile
+import functools
+import numpy as np
 import pandas as pd
+from unittest.mock import patch
 from sklearn.model_selection import train_test_split
 
 PATH = pathlib.Path(__file__).parent.resolve()
@@ -11,3 +16,50 @@ def load_dataset() -> tuple:
     y = df.loc[:, "target"]
     train_x, test_x, train_y, test_y = train_test_split(x, y, test_size=0.2, random_state=42)
     return train_x, test_x, train_y, test_y
+
+
+def write_dataset(path: str, rows: int = 40, seed: int = 0) -> str:
+    """
+    Write a linear dataset with two features to a csv file, large enough to be split and folded.
+    Returns the path of the dataset.
+
+    The function takes the following arguments:
+        path (string): Path of the csv file
+        rows (int):    The number of rows of the dataset
+        seed (int):    The seed of the features
+    """
+    rng = np.random.default_rng(seed)
+    frame = pd.DataFrame({"x0": rng.normal(size=rows), "x1": rng.normal(size=rows)})
+    frame["target"] = 2 * frame["x0"] - frame["x1"] + 1
+    frame.to_csv(path, index=False)
+    return path
+
+
+def isolate_bench(test_case, *modules) -> str:
+    """
+    Redirect the results, caches and runtime history of the given modules of the benchmark to a temporary
+    directory for the duration of a test, and select the template method as the only installed method,
+    such that end-to-end runs of the benchmark leave the repository untouched. Returns the directory.
+
+    The function takes the following arguments:
+        test_case (TestCase): The test to isolate, which removes the directory when it is cleaned up
+        modules (module):     The modules of the benchmark whose paths and caches are redirected
+    """
+    directory = tempfile.mkdtemp()
+    test_case.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+    # The replacement of every attribute of a module, given the attribute
+    replacements = {
+        "PATH": lambda path: directory,
+        "installed_methods": lambda function: lambda methods="all": ["template"],
+        "ResultCache": lambda cache: functools.partial(cache, f"{directory}/cache"),
+        "SplitCache": lambda cache: functools.partial(cache, f"{directory}/cache/splits"),
+        "RuntimeHistory": lambda history: functools.partial(history, f"{directory}/results/runtime_history.db"),
+        "decode_datasets": lambda function: functools.partial(function, cache_dir=f"{directory}/cache/datasets")
+    }
+    for module in modules:
+        for name, replacement in replacements.items():
+            if hasattr(module, name):
+                patcher = patch.object(module, name, replacement(getattr(module, name)))
+                patcher.start()
+                test_case.addCleanup(patcher.stop)
+    return directory